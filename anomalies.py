@@ -0,0 +1,162 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# --- Streaming outlier flags for amounts and hours ---
+# Each cleaned chunk builds small quantile sketches per campaign (amounts) and
+# per department (hours). Sketches from chunks or worker processes merge, and
+# the merged quantiles set the fences rows are flagged against. Rows are only
+# flagged, never dropped: a $100,000 gift may be real.
+
+SKETCH_K = 200  # items kept per sketch level; rank error is roughly 1/K
+ANOMALY_TARGETS = {"amount": "campaign", "hours": "dept"}
+ANOMALY_FENCE = 3.0  # Tukey "far out" fence, on a log scale
+ANOMALY_MIN_SPREAD = math.log(2)  # a group of identical gifts still allows 2x
+ANOMALY_MIN_COUNT = 20  # smaller groups are judged against the whole file
+ANOMALY_MAX_GROUPS = 50  # groups sketched per column; the rest use the file
+ANOMALY_MAX_ROWS = 20  # example row labels kept in the report
+
+
+class QuantileSketch:
+    # KLL-style compactor stack: level i holds items that each stand for 2**i
+    # values. Exact until a level overflows K, then memory stays O(K log n).
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved
+                keep = len(items) % 2
+                promoted = items[keep:][self._rng.integers(2) :: 2]
+                self.levels[level] = items[:keep]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        weights = np.concatenate(
+            [np.full(len(kept), 2**level) for level, kept in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        ranks = np.cumsum(weights[order])
+        targets = np.asarray(q, dtype=float) * ranks[-1]
+        at = np.minimum(np.searchsorted(ranks, targets), len(items) - 1)
+        return items[order][at]
+
+
+def build_sketches(df):
+    # {value column: {"by": group column, "all": sketch, "groups": {g: sketch}}}
+    sketches = {}
+    for col, by in ANOMALY_TARGETS.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        entry = {"by": by, "all": QuantileSketch().update(values), "groups": {}}
+        if by in df.columns:
+            codes, uniques = pd.factorize(df[by])
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # One sort splits every group; only the busiest get a sketch
+            order = np.argsort(codes, kind="stable")
+            ends = np.cumsum(counts) + np.count_nonzero(codes < 0)
+            for code in np.argsort(-counts, kind="stable")[:ANOMALY_MAX_GROUPS]:
+                rows = order[ends[code] - counts[code] : ends[code]]
+                entry["groups"][uniques[code]] = QuantileSketch().update(values[rows])
+        sketches[col] = entry
+    return sketches
+
+
+def merge_sketches(sketches):
+    merged = {}
+    for part in sketches:
+        for col, entry in part.items():
+            if col not in merged:
+                merged[col] = {"by": entry["by"], "all": QuantileSketch(), "groups": {}}
+            target = merged[col]
+            target["all"].merge(entry["all"])
+            for group, sketch in entry["groups"].items():
+                target["groups"].setdefault(group, QuantileSketch()).merge(sketch)
+    for entry in merged.values():
+        # Keep the busiest groups so memory stays bounded after many merges
+        busiest = sorted(entry["groups"].items(), key=lambda kv: -kv[1].count)
+        entry["groups"] = dict(busiest[:ANOMALY_MAX_GROUPS])
+    return merged
+
+
+def outlier_fences(sketch):
+    # Fences on log1p(value): gifts and hours are heavily right-skewed
+    if sketch.count == 0:
+        return np.nan, np.nan
+    q1, q3 = np.log1p(np.maximum(sketch.quantile([0.25, 0.75]), 0))
+    spread = max(q3 - q1, ANOMALY_MIN_SPREAD) * ANOMALY_FENCE
+    return float(np.expm1(q1 - spread)), float(np.expm1(q3 + spread))
+
+
+def flag_outliers(df, sketches):
+    # {value column: boolean mask of flagged rows}
+    flags = {}
+    for col, entry in sketches.items():
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        low, high = outlier_fences(entry["all"])
+        lows = np.full(len(values), low)
+        highs = np.full(len(values), high)
+        if entry["by"] in df.columns:
+            codes, uniques = pd.factorize(df[entry["by"]])
+            # Per-group fences, looked up by code; -1 (missing) keeps the file's
+            group_lows = np.full(len(uniques) + 1, low)
+            group_highs = np.full(len(uniques) + 1, high)
+            for code, group in enumerate(uniques):
+                sketch = entry["groups"].get(group)
+                if sketch is not None and sketch.count >= ANOMALY_MIN_COUNT:
+                    group_lows[code], group_highs[code] = outlier_fences(sketch)
+            lows, highs = group_lows[codes], group_highs[codes]
+        flags[col] = (values < lows) | (values > highs)
+    return flags
+
+
+def anomaly_report(df, sketches):
+    report = {}
+    for col, flagged in flag_outliers(df, sketches).items():
+        by = sketches[col]["by"]
+        entry = {"by": by, "flagged": int(np.count_nonzero(flagged))}
+        if by in df.columns:
+            by_group = df.loc[flagged, by].astype(object).value_counts()
+            entry["by_group"] = {str(g): int(n) for g, n in by_group.items()}
+        entry["rows"] = [
+            int(label) if isinstance(label, (int, np.integer)) else str(label)
+            for label in df.index[flagged][:ANOMALY_MAX_ROWS]
+        ]
+        report[col] = entry
+    return report
@@ -0,0 +1,76 @@
+import io
+from functools import lru_cache
+
+import pandas as pd
+
+CHART_TYPES = ("Bar", "Line", "Pie")
+DEFAULT_TOP_N = 12
+OTHER_LABEL = "Other"
+CHART_CACHE_SIZE = 64
+
+# --- Chart service ---
+# Charts are drawn from small aggregates (label -> total), never from raw rows.
+# Figures are built with matplotlib.figure.Figure rather than pyplot, so no
+# global figure registry keeps them alive between Streamlit reruns.
+
+
+def top_n_with_other(totals, n=DEFAULT_TOP_N, other_label=OTHER_LABEL):
+    # Keep the n largest groups and fold the long tail into one "Other" slice,
+    # so a chart never has more than n + 1 marks whatever the group count
+    totals = totals.dropna()
+    if len(totals) <= n:
+        return totals.sort_values()
+    top = totals.nlargest(n)
+    rest = float(totals.drop(top.index).sum())
+    folded = top.copy()
+    folded[other_label] = folded.get(other_label, 0) + rest
+    return folded.sort_values()
+
+
+def aggregate_totals(df, by, value):
+    return df.groupby(by, observed=True)[value].sum()
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _render_png(items, chart_type, title, color, palette):
+    # matplotlib takes ~0.4 s to import; pay that on the first chart, not at start-up
+    from matplotlib import colormaps
+    from matplotlib.figure import Figure
+
+    labels = [label for label, _ in items]
+    values = [value for _, value in items]
+
+    fig = Figure()
+    ax = fig.subplots()
+    if chart_type == "Bar":
+        ax.barh(labels, values, color=color)
+    elif chart_type == "Line":
+        ax.plot(labels, values, marker="o", color=color)
+        ax.tick_params(axis="x", labelrotation=45)
+    elif chart_type == "Pie":
+        colors = colormaps[palette].colors if palette else None
+        ax.pie(values, labels=labels, autopct="%.1f%%", startangle=90, colors=colors)
+    else:
+        raise ValueError(f"Unknown chart type: {chart_type}")
+    ax.set_title(title)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    # Drop the artists now instead of waiting for the garbage collector
+    fig.clear()
+    return buffer.getvalue()
+
+
+def render_chart(
+    totals,
+    chart_type,
+    title,
+    color=None,
+    palette=None,
+    top_n=DEFAULT_TOP_N,
+):
+    # Returns PNG bytes. Equal aggregates and options hit the cache, so
+    # reruns that don't change the data skip matplotlib entirely.
+    folded = top_n_with_other(pd.Series(totals, dtype="float64"), top_n)
+    items = tuple((str(label), float(value)) for label, value in folded.items())
+    return _render_png(items, chart_type, title, color, palette)
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from joins import normalize_name_key
+
+# --- Donor retention and cohort analytics ---
+# Built on cleaned donations (donor_name, date, amount). Every step is a sort
+# or a bincount over integer codes, so 10M gifts take seconds, not minutes:
+#     report = donor_cohorts(cleaned, fiscal_start_month=7)
+#     report["lybunt"], report["retention_rate"], cohort_summary(report)
+# LYBUNT: gave Last Year But Unfortunately Not This year.
+# SYBUNT: gave Some Year (before last) But Unfortunately Not This year.
+
+LIST_COLUMNS = [
+    "donor_name",
+    "first_year",
+    "last_year",
+    "gifts",
+    "lifetime_giving",
+    "last_gift_date",
+]
+
+
+def gift_years(dates, fiscal_start_month=1):
+    # Fiscal years are named for the calendar year they end in
+    years = dates.dt.year.to_numpy(dtype=np.int64)
+    if fiscal_start_month > 1:
+        years = years + (dates.dt.month.to_numpy() >= fiscal_start_month)
+    return years
+
+
+def donor_cohorts(df, as_of=None, fiscal_start_month=1):
+    gifts = df.loc[
+        df["donor_name"].notna() & df["date"].notna() & df["amount"].notna(),
+        ["donor_name", "date", "amount"],
+    ]
+    years = gift_years(gifts["date"], fiscal_start_month)
+    if as_of is not None:
+        # Report as of a past year: later gifts haven't happened yet
+        keep = years <= int(as_of)
+        gifts, years = gifts[keep], years[keep]
+    if not len(gifts):
+        return _empty_report(as_of)
+
+    # Same normalized key as the donor/volunteer merge
+    donor, _ = pd.factorize(normalize_name_key(gifts["donor_name"]))
+    amounts = gifts["amount"].to_numpy(dtype=float)
+    first_seen = int(years.min())
+    as_of = int(years.max()) if as_of is None else int(as_of)
+    span = as_of - first_seen + 1
+    year_index = years - first_seen
+
+    # One sorted array of distinct (donor, year) pairs drives everything below
+    # (a plain sort + diff; np.unique's hash path is several times slower here)
+    pairs = np.sort(donor.astype(np.int64) * span + year_index)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    pair_donor, pair_year = np.divmod(pairs, span)
+    starts = np.flatnonzero(np.r_[True, pair_donor[1:] != pair_donor[:-1]])
+    ends = np.r_[starts[1:], len(pairs)] - 1
+    first_year = pair_year[starts]  # indexed by donor code
+    last_year = pair_year[ends]
+
+    # Cohort x year counts of active donors
+    counts = np.bincount(
+        first_year[pair_donor] * span + pair_year, minlength=span * span
+    ).reshape(span, span)
+    labels = np.arange(first_seen, first_seen + span)
+    cohort_rows = np.flatnonzero(counts.diagonal())
+    retention = pd.DataFrame(
+        counts[cohort_rows], index=labels[cohort_rows], columns=labels
+    )
+    retention.index.name = "first_gift_year"
+    retention_rate = retention.div(counts.diagonal()[cohort_rows], axis=0).round(3)
+
+    # Year-over-year: donors active in year Y-1 who gave again in year Y
+    again = (pair_donor[1:] == pair_donor[:-1]) & (pair_year[1:] == pair_year[:-1] + 1)
+    active = np.bincount(pair_year, minlength=span)
+    retained = np.bincount(pair_year[:-1][again], minlength=span)
+    yoy = pd.Series(
+        np.divide(
+            retained[:-1],
+            active[:-1],
+            out=np.full(span - 1, np.nan),
+            where=active[:-1] > 0,
+        ),
+        index=labels[1:],
+        name="retention_rate",
+    ).round(3)
+    yoy.index.name = "year"
+
+    # factorize numbers donors in order of appearance: first gift = first code
+    first_gift = np.flatnonzero(
+        np.r_[True, donor[1:] > np.maximum.accumulate(donor)[:-1]]
+    )
+    donors = pd.DataFrame(
+        {
+            # First spelling seen for each donor
+            "donor_name": gifts["donor_name"].to_numpy()[first_gift],
+            "first_year": labels[first_year],
+            "last_year": labels[last_year],
+            "gifts": np.bincount(donor),
+            "lifetime_giving": np.bincount(donor, weights=amounts).round(2),
+            "last_gift_date": gifts["date"].groupby(donor).max().to_numpy(),
+        }
+    )
+    cohorts = pd.DataFrame(
+        {
+            "donors": np.bincount(first_year, minlength=span),
+            "first_year_giving": np.bincount(
+                first_year[donor],
+                weights=amounts * (year_index == first_year[donor]),
+                minlength=span,
+            ).round(2),
+            "lifetime_giving": np.bincount(
+                first_year, weights=donors["lifetime_giving"], minlength=span
+            ).round(2),
+        },
+        index=pd.Index(labels, name="first_gift_year"),
+    ).iloc[cohort_rows]
+
+    by_giving = donors.sort_values("lifetime_giving", ascending=False, kind="stable")
+    return {
+        "as_of": as_of,
+        "lybunt": by_giving[by_giving["last_year"] == as_of - 1].reset_index(drop=True),
+        "sybunt": by_giving[by_giving["last_year"] < as_of - 1].reset_index(drop=True),
+        "cohorts": cohorts,
+        "retention": retention,
+        "retention_rate": retention_rate,
+        "yoy_retention": yoy,
+    }
+
+
+def _empty_report(as_of):
+    empty = pd.DataFrame(columns=LIST_COLUMNS)
+    return {
+        "as_of": as_of,
+        "lybunt": empty,
+        "sybunt": empty.copy(),
+        "cohorts": pd.DataFrame(
+            columns=["donors", "first_year_giving", "lifetime_giving"]
+        ),
+        "retention": pd.DataFrame(),
+        "retention_rate": pd.DataFrame(),
+        "yoy_retention": pd.Series(dtype=float, name="retention_rate"),
+    }
+
+
+def cohort_summary(report):
+    # Plain values for st.json and the PDF
+    return {
+        "as_of_year": report["as_of"],
+        "lybunt_donors": len(report["lybunt"]),
+        "lybunt_lifetime_giving": float(report["lybunt"]["lifetime_giving"].sum()),
+        "sybunt_donors": len(report["sybunt"]),
+        "sybunt_lifetime_giving": float(report["sybunt"]["lifetime_giving"].sum()),
+        "first_gift_cohorts": {
+            str(year): int(n) for year, n in report["cohorts"]["donors"].items()
+        },
+        "retention_by_year": {
+            str(year): float(rate)
+            for year, rate in report["yoy_retention"].dropna().items()
+        },
+    }
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from pagination import index_digest
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_CACHE_FILES = 16
+GZIP_LEVEL = 6  # zlib's default; level 9 is ~3x slower for a few % smaller
+XLSX_MAX_ROWS = 1_048_575  # Excel's row limit, minus the header row
+
+EXPORT_FORMATS = {
+    "csv": {"extension": ".csv", "mime": "text/csv"},
+    "csv.gz": {"extension": ".csv.gz", "mime": "application/gzip"},
+    "zip": {"extension": ".zip", "mime": "application/zip"},
+    "xlsx": {
+        "extension": ".xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+}
+
+# --- Streaming export ---
+# Files are written chunk by chunk straight to disk, so no full-file string
+# is ever built. Each (dataset version, format) is written once and then
+# served from the cache directory.
+
+
+def _date_format(df):
+    # Chunks must agree: pandas picks a date-only format per chunk otherwise
+    dates = [
+        df[col].dropna()
+        for col in df.columns
+        if pd.api.types.is_datetime64_any_dtype(df[col])
+    ]
+    if any((d.dt.microsecond != 0).any() for d in dates):
+        return "%Y-%m-%d %H:%M:%S.%f"
+    if any((d != d.dt.normalize()).any() for d in dates):
+        return "%Y-%m-%d %H:%M:%S"
+    return "%Y-%m-%d"
+
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    # UTF-8 CSV bytes, one chunk of rows at a time; the header comes first
+    date_format = _date_format(df)
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        yield chunk.to_csv(
+            index=False, header=start == 0, date_format=date_format
+        ).encode("utf-8")
+
+
+def _write_csv(df, handle, chunk_rows):
+    for block in iter_csv_chunks(df, chunk_rows):
+        handle.write(block)
+
+
+def _excel_value(value):
+    if value is None or value is pd.NaT:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _write_xlsx(df, path, chunk_rows):
+    from openpyxl import Workbook
+
+    # Write-only mode streams rows to disk instead of holding cell objects
+    workbook = Workbook(write_only=True)
+    header = [str(col) for col in df.columns]
+    sheet = None
+    rows_on_sheet = XLSX_MAX_ROWS
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        for row in chunk.itertuples(index=False, name=None):
+            if rows_on_sheet == XLSX_MAX_ROWS:
+                # Past Excel's limit the export continues on a new sheet
+                sheet = workbook.create_sheet(f"Data {len(workbook.worksheets) + 1}")
+                sheet.append(header)
+                rows_on_sheet = 0
+            sheet.append([_excel_value(value) for value in row])
+            rows_on_sheet += 1
+    if sheet is None:
+        workbook.create_sheet("Data 1").append(header)
+    workbook.save(path)
+
+
+def write_export(df, path, fmt="csv", chunk_rows=EXPORT_CHUNK_ROWS, inner_name=None):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if fmt == "csv":
+        with open(path, "wb") as f:
+            _write_csv(df, f, chunk_rows)
+    elif fmt == "csv.gz":
+        with gzip.open(path, "wb", compresslevel=GZIP_LEVEL) as f:
+            _write_csv(df, f, chunk_rows)
+    elif fmt == "zip":
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open(inner_name or "data.csv", "w", force_zip64=True) as f:
+                _write_csv(df, f, chunk_rows)
+    else:
+        _write_xlsx(df, path, chunk_rows)
+    return path
+
+
+def export_version(df, dataset_key):
+    # Same upload, same rows, same columns -> same file
+    columns = "\x1f".join(map(str, df.columns))
+    return f"{dataset_key}|{len(df)}|{index_digest(df)}|{columns}"
+
+
+def _prune_cache(cache_dir, keep):
+    exports = [
+        os.path.join(cache_dir, name)
+        for name in os.listdir(cache_dir)
+        if not name.endswith(".tmp")
+    ]
+    exports.sort(key=os.path.getmtime, reverse=True)
+    for stale in exports[keep:]:
+        try:
+            os.remove(stale)
+        except FileNotFoundError:
+            pass
+
+
+def cached_export(df, fmt, dataset_key, cache_dir=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "data_laundry_exports")
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha1(export_version(df, dataset_key).encode("utf-8")).hexdigest()
+    path = os.path.join(cache_dir, digest + EXPORT_FORMATS[fmt]["extension"])
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    # Write-then-rename so a concurrent download never reads half a file
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        write_export(df, tmp_path, fmt, chunk_rows, inner_name=f"{dataset_key}.csv")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _prune_cache(cache_dir, EXPORT_CACHE_FILES)
+    return path
+
+
+def export_callable(df, fmt, dataset_key, **kwargs):
+    # For st.download_button(data=...): nothing runs until the click
+    def build():
+        with open(cached_export(df, fmt, dataset_key, **kwargs), "rb") as f:
+            return f.read()
+
+    return build
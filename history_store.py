@@ -0,0 +1,273 @@
+import hashlib
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from joins import normalize_name_key
+from recurring import CADENCES, STAT_COLUMNS, classify_gift_stats, revenue_summary
+
+DEFAULT_HISTORY_PATH = "data_laundry_history.db"
+
+# --- Typed tables for cleaned batches, indexed on the columns we filter by ---
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    source_name TEXT,
+    fingerprint TEXT NOT NULL UNIQUE,
+    row_count INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS donations (
+    batch_id INTEGER NOT NULL REFERENCES batches(batch_id),
+    donor_name TEXT,
+    donor_key TEXT,
+    method TEXT,
+    campaign TEXT,
+    amount REAL NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_donations_date ON donations(date);
+CREATE INDEX IF NOT EXISTS idx_donations_campaign ON donations(campaign, date);
+CREATE INDEX IF NOT EXISTS idx_donations_donor ON donations(donor_name);
+CREATE INDEX IF NOT EXISTS idx_donations_batch ON donations(batch_id);
+
+CREATE TABLE IF NOT EXISTS volunteers (
+    batch_id INTEGER NOT NULL REFERENCES batches(batch_id),
+    name TEXT,
+    dept TEXT,
+    phone TEXT,
+    hours REAL,
+    campaign TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_volunteers_campaign ON volunteers(campaign);
+CREATE INDEX IF NOT EXISTS idx_volunteers_name ON volunteers(name);
+CREATE INDEX IF NOT EXISTS idx_volunteers_batch ON volunteers(batch_id);
+"""
+
+HISTORY_COLUMNS = {
+    "donations": ["donor_name", "method", "campaign", "amount", "date"],
+    "volunteers": ["name", "dept", "phone", "hours", "campaign"],
+}
+
+
+def open_history_store(path=DEFAULT_HISTORY_PATH):
+    # check_same_thread=False so one cached connection can serve Streamlit reruns
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(HISTORY_SCHEMA)
+    return conn
+
+
+def frame_fingerprint(df):
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def append_cleaned_batch(conn, df, kind, source_name=None):
+    if kind not in HISTORY_COLUMNS:
+        raise ValueError(f"Unknown history table: {kind}")
+
+    columns = HISTORY_COLUMNS[kind]
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing expected column(s): {missing}")
+
+    batch = df[columns].copy()
+    fingerprint = frame_fingerprint(batch)
+
+    # 🧾 The same cleaned file uploaded twice is only stored once
+    existing = conn.execute(
+        "SELECT batch_id FROM batches WHERE fingerprint = ?", (fingerprint,)
+    ).fetchone()
+    if existing:
+        return existing[0], False
+
+    stored = columns
+    if kind == "donations":
+        batch["date"] = pd.to_datetime(batch["date"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+        # Keyed here, exactly as pandas keys donors, so SQL never has to
+        # re-create the normalization (its trim and lower are ASCII-only)
+        names = batch["donor_name"]
+        batch["donor_key"] = normalize_name_key(names).where(names.notna(), None)
+        stored = [*columns, "donor_key"]
+
+    with conn:
+        # 🔁 A re-upload of the same file replaces its earlier batch, so a
+        # corrected row is stored once instead of next to its old version
+        if source_name is not None:
+            replaced = conn.execute(
+                "SELECT batch_id FROM batches WHERE kind = ? AND source_name = ?",
+                (kind, source_name),
+            ).fetchall()
+            for (old_id,) in replaced:
+                conn.execute(f"DELETE FROM {kind} WHERE batch_id = ?", (old_id,))
+                conn.execute("DELETE FROM batches WHERE batch_id = ?", (old_id,))
+        cursor = conn.execute(
+            "INSERT INTO batches (kind, source_name, fingerprint, row_count, loaded_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (kind, source_name, fingerprint, len(batch), datetime.now().isoformat()),
+        )
+        batch_id = cursor.lastrowid
+        placeholders = ", ".join("?" for _ in range(len(stored) + 1))
+        conn.executemany(
+            f"INSERT INTO {kind} (batch_id, {', '.join(stored)}) VALUES ({placeholders})",
+            (
+                (batch_id, *row)
+                for row in batch[stored]
+                .astype(object)
+                .where(batch.notna(), None)
+                .itertuples(index=False, name=None)
+            ),
+        )
+    return batch_id, True
+
+
+def list_batches(conn):
+    return pd.read_sql_query(
+        "SELECT batch_id, kind, source_name, row_count, loaded_at"
+        " FROM batches ORDER BY batch_id",
+        conn,
+    )
+
+
+def _donation_filters(start=None, end=None, campaigns=None):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d %H:%M:%S"))
+    if end is not None:
+        # Inclusive end date: everything before midnight of the following day
+        end_exclusive = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        clauses.append("date < ?")
+        params.append(end_exclusive.strftime("%Y-%m-%d %H:%M:%S"))
+    if campaigns:
+        clauses.append(f"campaign IN ({', '.join('?' for _ in campaigns)})")
+        params.extend(campaigns)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def query_donation_date_range(conn):
+    low, high = conn.execute("SELECT MIN(date), MAX(date) FROM donations").fetchone()
+    if low is None:
+        return None, None
+    return pd.Timestamp(low), pd.Timestamp(high)
+
+
+def query_donation_summary(conn, start=None, end=None, campaigns=None):
+    where, params = _donation_filters(start, end, campaigns)
+
+    total, donors = conn.execute(
+        f"SELECT COALESCE(SUM(amount), 0), COUNT(DISTINCT donor_name) FROM donations{where}",
+        params,
+    ).fetchone()
+    campaign_totals = conn.execute(
+        f"SELECT campaign, SUM(amount) AS total FROM donations{where}"
+        " GROUP BY campaign ORDER BY total DESC",
+        params,
+    ).fetchall()
+    by_method = conn.execute(
+        f"SELECT method, COUNT(*) AS n FROM donations{where}"
+        " GROUP BY method ORDER BY n DESC",
+        params,
+    ).fetchall()
+    by_month = conn.execute(
+        f"SELECT substr(date, 1, 7) AS month, COUNT(*) FROM donations{where}"
+        " GROUP BY month ORDER BY month",
+        params,
+    ).fetchall()
+    classified = classify_gift_stats(query_donor_gift_stats(conn, where, params))
+
+    # Same shape as generate_donation_summary so views can use either source
+    return {
+        "total_donations": total,
+        "unique_donors": donors,
+        "campaign_totals": dict(campaign_totals),
+        "donations_by_method": dict(by_method),
+        "donations_by_month": dict(by_month),
+        "recurring_revenue": revenue_summary(classified),
+    }
+
+
+def query_donor_gift_stats(conn, where="", params=()):
+    # recurring.donor_gift_stats, computed in SQL: only one row per donor
+    # comes back, never the gifts themselves. One pass of window functions
+    # ranks every gift; one GROUP BY folds them (no joins, no MEDIAN needed).
+    named = f"{where} AND" if where else " WHERE"
+    bands = "".join(
+        f", COALESCE(SUM(gap BETWEEN {low} AND {high}), 0) AS {name}_gaps"
+        for name, (low, high, _, _) in CADENCES.items()
+    )
+    on_any = " OR ".join(
+        f"gap BETWEEN {low} AND {high}" for low, high, _, _ in CADENCES.values()
+    )
+    query = f"""
+    WITH gifts AS (
+        SELECT rowid AS seq, donor_name, amount, donor_key AS donor,
+            CAST(julianday(substr(date, 1, 10)) - 2440587.5 AS INTEGER) AS day
+        FROM donations{named} donor_key IS NOT NULL
+    ),
+    ordered AS (
+        SELECT *,
+            day - LAG(day) OVER by_day AS gap,
+            ROW_NUMBER() OVER by_day AS day_rank,
+            COUNT(*) OVER (PARTITION BY donor) AS n
+        FROM gifts
+        WINDOW by_day AS (PARTITION BY donor ORDER BY day, seq)
+    ),
+    ranked AS (
+        SELECT *,
+            -- NULL (first gift) sorts first, so gap ranks start at 2
+            ROW_NUMBER() OVER (PARTITION BY donor ORDER BY gap) - 1 AS gap_rank,
+            ROW_NUMBER() OVER (PARTITION BY donor ORDER BY amount) AS amount_rank
+        FROM ordered
+    )
+    SELECT
+        MAX(CASE WHEN day_rank = 1 THEN donor_name END) AS donor_name,
+        COUNT(*) AS gifts, MIN(day) AS first_day, MAX(day) AS last_day,
+        AVG(CASE WHEN gap IS NOT NULL AND gap_rank IN (n / 2, (n + 1) / 2)
+            THEN gap END) AS median_gap,
+        AVG(CASE WHEN amount_rank IN ((n + 1) / 2, (n + 2) / 2)
+            THEN amount END) AS typical_amount,
+        SUM(amount) AS total, SUM(amount * amount) AS total_squares{bands},
+        COALESCE(SUM({on_any}), 0) AS cadence_gaps
+    FROM ranked GROUP BY donor
+    """
+    return pd.read_sql_query(query, conn, params=list(params))[STAT_COLUMNS]
+
+
+def query_volunteer_summary(conn, campaigns=None):
+    where, params = "", []
+    if campaigns:
+        where = f" WHERE campaign IN ({', '.join('?' for _ in campaigns)})"
+        params = list(campaigns)
+
+    hours, volunteers, departments = conn.execute(
+        f"SELECT COALESCE(SUM(hours), 0), COUNT(DISTINCT name), COUNT(DISTINCT dept)"
+        f" FROM volunteers{where}",
+        params,
+    ).fetchone()
+    by_dept = conn.execute(
+        f"SELECT dept, SUM(hours) AS total FROM volunteers{where}"
+        " GROUP BY dept ORDER BY total DESC",
+        params,
+    ).fetchall()
+
+    return {
+        "total_hours": hours,
+        "volunteers_count": volunteers,
+        "departments_involved": departments,
+        "hours_by_department": dict(by_dept),
+    }
+
+
+def query_campaigns(conn, kind="donations"):
+    if kind not in HISTORY_COLUMNS:
+        raise ValueError(f"Unknown history table: {kind}")
+    rows = conn.execute(
+        f"SELECT DISTINCT campaign FROM {kind} WHERE campaign IS NOT NULL ORDER BY campaign"
+    ).fetchall()
+    return [row[0] for row in rows]
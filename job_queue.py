@@ -0,0 +1,322 @@
+import inspect
+import multiprocessing
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from non_profit import (
+    ROUTE_KINDS,
+    ProcessingCancelled,
+    DEFAULT_CHUNK_ROWS,
+    clean_data_chunked,
+    clean_data_partitioned,
+    clean_donations,
+    clean_file_spilled,
+    clean_volunteers,
+    finalize_cleaned_frame,
+    is_mixed_layout,
+    push_to_salesforce,
+    route_rows,
+    summarize_chunked,
+)
+from cohorts import donor_cohorts
+from quarantine import QuarantineSink
+from row_diff import diff_frames
+
+DEFAULT_MAX_WORKERS = 2
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class JobCancelled(ProcessingCancelled):
+    pass
+
+
+def clean_workers_per_job(max_workers, cpus=None):
+    # The queue runs max_workers jobs at once; each gets an equal share of the
+    # cores for partition-parallel cleaning, so the two pools never add up to
+    # more processes than cores
+    cpus = cpus or os.cpu_count() or 1
+    return max(1, cpus // max(1, max_workers))
+
+
+class JobContext:
+    # Handed to a running job so it can report progress and honour cancellation
+    def __init__(self, job_id, progress, cancel_flags, clean_workers=1):
+        self.job_id = job_id
+        self._progress = progress
+        self._cancel_flags = cancel_flags
+        self.clean_workers = clean_workers
+
+    def report(self, fraction, message=""):
+        self._progress[self.job_id] = {
+            "state": JOB_RUNNING,
+            "progress": max(0.0, min(1.0, float(fraction))),
+            "message": message,
+        }
+
+    def cancelled(self):
+        return self._cancel_flags.get(self.job_id, False)
+
+    def progress_callback(self, start=0.0, end=1.0):
+        # Adapts the library's progress(done, total, stage) protocol to this job,
+        # scaled into the [start, end] slice of the overall bar
+        def progress(done, total, stage):
+            fraction = done / total if total else 1.0
+            self.report(
+                start + (end - start) * fraction,
+                f"{stage.title()}: {done:,} of {total:,} rows",
+            )
+
+        return progress
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+
+
+def _accepts_job(fn):
+    try:
+        return "job" in inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        # Some builtins have no introspectable signature
+        return False
+
+
+def _run_job(job_id, progress, cancel_flags, fn, args, kwargs, clean_workers=1):
+    job = JobContext(job_id, progress, cancel_flags, clean_workers)
+    job.check_cancelled()
+    job.report(0.0, "Starting")
+    if _accepts_job(fn):
+        kwargs = {**kwargs, "job": job}
+    result = fn(*args, **kwargs)
+    job.report(1.0, "Finished")
+    return result
+
+
+class JobQueue:
+    # One queue per server process, shared by every Streamlit session.
+    # max_workers is the concurrency limit across all users.
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        # "spawn" keeps workers from inheriting the Streamlit server's threads
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._progress = self._manager.dict()
+        self._cancel_flags = self._manager.dict()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=context
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.clean_workers = clean_workers_per_job(max_workers)
+
+    def submit(self, fn, *args, label="", **kwargs):
+        job_id = uuid.uuid4().hex
+        self._progress[job_id] = {"state": JOB_QUEUED, "progress": 0.0, "message": ""}
+        future = self._executor.submit(
+            _run_job,
+            job_id,
+            self._progress,
+            self._cancel_flags,
+            fn,
+            args,
+            kwargs,
+            self.clean_workers,
+        )
+        with self._lock:
+            self._jobs[job_id] = {"label": label, "future": future}
+        return job_id
+
+    def __contains__(self, job_id):
+        with self._lock:
+            return job_id in self._jobs
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+
+        future = job["future"]
+        snapshot = dict(self._progress.get(job_id, {}))
+        snapshot.setdefault("progress", 0.0)
+        snapshot.setdefault("message", "")
+        snapshot["label"] = job["label"]
+        snapshot["error"] = None
+
+        if future.cancelled():
+            snapshot["state"] = JOB_CANCELLED
+        elif future.done():
+            error = future.exception()
+            if error is None:
+                snapshot["state"] = JOB_DONE
+                snapshot["progress"] = 1.0
+            elif isinstance(error, ProcessingCancelled):
+                snapshot["state"] = JOB_CANCELLED
+            else:
+                snapshot["state"] = JOB_FAILED
+                snapshot["error"] = "".join(
+                    traceback.format_exception_only(type(error), error)
+                ).strip()
+        elif snapshot.get("state") != JOB_RUNNING:
+            snapshot["state"] = JOB_QUEUED
+        return snapshot
+
+    def result(self, job_id):
+        with self._lock:
+            job = self._jobs[job_id]
+        try:
+            return job["future"].result(timeout=0)
+        except CancelledError as e:
+            raise JobCancelled(f"Job {job_id} was cancelled.") from e
+
+    def pop_result(self, job_id):
+        # The queue is shared by every session for the server's lifetime, so
+        # a collected result must not stay referenced here
+        result = self.result(job_id)
+        self.forget(job_id)
+        return result
+
+    def cancel(self, job_id):
+        # Queued jobs never start; running jobs stop at their next cancel check
+        self._cancel_flags[job_id] = True
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job["future"].cancel()
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        self._progress.pop(job_id, None)
+        self._cancel_flags.pop(job_id, None)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._manager.shutdown()
+
+
+# --- Job functions (top-level so worker processes can import them) ---
+CLEANERS = {
+    "auto": None,
+    "donations": clean_donations,
+    "volunteers": clean_volunteers,
+}
+
+
+def _callbacks(job, start=0.0, end=1.0):
+    if job is None:
+        return {}
+    return {
+        "progress": job.progress_callback(start, end),
+        "should_cancel": job.cancelled,
+    }
+
+
+def _finalize(cleaned):
+    # Compact in the worker so less data is pickled back to the app
+    compact, report = finalize_cleaned_frame(cleaned)
+    compact.attrs["memory_report"] = report
+    return compact
+
+
+def _run_cleaner(df, kind, quarantine, callbacks, chunk_rows=None, workers=1):
+    # chunk_rows comes from the memory governor's plan (memory_governor.py);
+    # a chunked plan means memory is tight, so those files clean inline.
+    # Otherwise big files are cleaned partition-parallel on this job's share
+    # of the cores (see clean_workers_per_job).
+    if workers > 1 and chunk_rows is None:
+        return clean_data_partitioned(
+            df,
+            workers=workers,
+            cleaner=CLEANERS[kind],
+            quarantine=quarantine,
+            **callbacks,
+        )
+    return clean_data_chunked(
+        df,
+        chunk_rows=chunk_rows or DEFAULT_CHUNK_ROWS,
+        cleaner=CLEANERS[kind],
+        quarantine=quarantine,
+        **callbacks,
+    )
+
+
+def _clean(df, kind, quarantine_path, job, callbacks, chunk_rows=None):
+    if kind in ROUTE_KINDS and is_mixed_layout(df):
+        # Mixed gift/shift files: each view cleans only the rows routed to it
+        df = df[(route_rows(df) & ROUTE_KINDS[kind]) != 0]
+    workers = job.clean_workers if job is not None else 1
+    if quarantine_path is None:
+        return _run_cleaner(df, kind, None, callbacks, chunk_rows, workers)
+    # The worker owns the sink, so rejected rows stream to disk, not back over IPC
+    with QuarantineSink(quarantine_path) as sink:
+        return _run_cleaner(df, kind, sink, callbacks, chunk_rows, workers)
+
+
+def clean_job(
+    df, kind="auto", finalize=True, quarantine_path=None, chunk_rows=None, job=None
+):
+    cleaned = _clean(df, kind, quarantine_path, job, _callbacks(job), chunk_rows)
+    return _finalize(cleaned) if finalize else cleaned
+
+
+def clean_file_job(path, plan, kind="auto", finalize=True, job=None):
+    # Spill mode: the worker streams the file from disk in plan["chunk_rows"]
+    cleaned = clean_file_spilled(
+        path, plan, cleaner=CLEANERS[kind], **_callbacks(job, 0.0, 0.9)
+    )
+    return _finalize(cleaned) if finalize else cleaned
+
+
+def clean_and_summarize_job(
+    df, kind, finalize=True, quarantine_path=None, chunk_rows=None, job=None
+):
+    cleaned = _clean(
+        df, kind, quarantine_path, job, _callbacks(job, 0.0, 0.7), chunk_rows
+    )
+    if finalize:
+        cleaned = _finalize(cleaned)
+    summary = summarize_chunked(
+        cleaned,
+        kind,
+        chunk_rows=chunk_rows or DEFAULT_CHUNK_ROWS,
+        **_callbacks(job, 0.7, 1.0),
+    )
+    return cleaned, summary
+
+
+def summarize_job(df, kind, job=None):
+    return summarize_chunked(df, kind, **_callbacks(job))
+
+
+def cohort_job(df, fiscal_start_month=1, job=None):
+    return donor_cohorts(df, fiscal_start_month=fiscal_start_month)
+
+
+def diff_job(old, new, key_columns, job=None):
+    return diff_frames(old, new, key_columns)
+
+
+def sync_job(df, object_type, token, sync_state=None, instance_url=None, job=None):
+    # sync_state is a path: the worker opens its own SQLite connection.
+    # Workers have no session state, so the instance URL is passed in too.
+    return push_to_salesforce(
+        df,
+        object_type=object_type,
+        token=token,
+        sync_state=sync_state,
+        instance_url=instance_url,
+        **_callbacks(job),
+    )
@@ -0,0 +1,209 @@
+import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+JOIN_HOWS = ("inner", "left")
+DEFAULT_PARTITIONS = 64
+PARTITION_CHUNK_ROWS = 500_000
+# A partition's two inputs plus the merged output, with headroom for copies
+JOIN_MEMORY_FACTOR = 4
+# Salts the hash when an oversized partition is split again (16 characters)
+REPARTITION_HASH_KEY = "data_laundry_rep"
+
+# --- Out-of-core hash-partitioned join ---
+# Both sides are split on a hash of the normalized key into temp files, so
+# every key lands in the same partition number on both sides. Each partition
+# is then joined on its own; only one partition per worker is in memory.
+# Chunked inputs can't be sized up front, so under a memory budget any
+# partition that comes out too big is split again on a salted hash.
+
+
+def normalize_name_key(series):
+    return series.astype(str).str.strip().str.lower()
+
+
+def estimate_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def partitions_for_budget(total_bytes, memory_budget_bytes, workers=1):
+    per_partition = memory_budget_bytes / (JOIN_MEMORY_FACTOR * max(1, workers))
+    return max(1, math.ceil(total_bytes / per_partition))
+
+
+def _as_chunks(data, chunk_rows):
+    # A DataFrame is sliced; anything else is taken as an iterable of chunks,
+    # e.g. pd.read_csv(..., chunksize=...) over a file too big to load
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start : start + chunk_rows]
+    else:
+        yield from data
+
+
+def _spill_partitions(chunks, key, n_partitions, directory, side, hash_key=None):
+    # {partition: [piece paths]} and {partition: bytes in memory}
+    template = None
+    pieces, sizes = {}, {}
+    hash_options = {"hash_key": hash_key} if hash_key else {}
+    for number, chunk in enumerate(chunks):
+        chunk = chunk.copy()
+        chunk[key] = normalize_name_key(chunk[key])
+        if template is None:
+            template = chunk.iloc[:0]
+        buckets = pd.util.hash_pandas_object(
+            chunk[key], index=False, **hash_options
+        ).to_numpy()
+        for partition, piece in chunk.groupby(buckets % n_partitions, sort=False):
+            partition = int(partition)
+            path = os.path.join(directory, f"{side}-{partition:05d}-{number:06d}.pkl")
+            piece.to_pickle(path)
+            pieces.setdefault(partition, []).append(path)
+            sizes[partition] = sizes.get(partition, 0) + estimate_bytes(piece)
+    return template, pieces, sizes
+
+
+def _split_oversized(parts, left_on, right_on, limit, directory):
+    # parts: [(left paths, right paths, bytes)]. Rows sharing one key can't be
+    # split, so a single very frequent name may still run over the limit.
+    result = []
+    for number, (left_paths, right_paths, size) in enumerate(parts):
+        if size <= limit:
+            result.append((left_paths, right_paths))
+            continue
+        n_partitions = math.ceil(size / limit)
+        split_dir = os.path.join(directory, f"split-{number:05d}")
+        os.mkdir(split_dir)
+        _, left_split, _ = _spill_partitions(
+            map(pd.read_pickle, left_paths),
+            left_on,
+            n_partitions,
+            split_dir,
+            "left",
+            REPARTITION_HASH_KEY,
+        )
+        _, right_split, _ = _spill_partitions(
+            map(pd.read_pickle, right_paths),
+            right_on,
+            n_partitions,
+            split_dir,
+            "right",
+            REPARTITION_HASH_KEY,
+        )
+        for path in [*left_paths, *right_paths]:
+            os.remove(path)
+        for partition in sorted(set(left_split) | set(right_split)):
+            result.append(
+                (left_split.get(partition, []), right_split.get(partition, []))
+            )
+    return result
+
+
+def _load(paths, template):
+    if not paths:
+        return template
+    return pd.concat([pd.read_pickle(path) for path in paths])
+
+
+def iter_partitioned_merge(
+    left,
+    right,
+    left_on,
+    right_on,
+    how="inner",
+    partitions=None,
+    memory_budget_bytes=None,
+    workers=1,
+    suffixes=("_x", "_y"),
+    temp_dir=None,
+    chunk_rows=PARTITION_CHUNK_ROWS,
+):
+    # Yields merged DataFrames one partition at a time. Row order follows the
+    # partitions, not the inputs. Keys are normalized like the in-memory merge.
+    if how not in JOIN_HOWS:
+        raise ValueError(f"Unsupported join type: {how}")
+    if partitions is None:
+        if memory_budget_bytes is not None and all(
+            isinstance(side, pd.DataFrame) for side in (left, right)
+        ):
+            partitions = partitions_for_budget(
+                estimate_bytes(left) + estimate_bytes(right),
+                memory_budget_bytes,
+                workers,
+            )
+        else:
+            partitions = DEFAULT_PARTITIONS
+
+    with tempfile.TemporaryDirectory(
+        prefix="data_laundry_join_", dir=temp_dir
+    ) as directory:
+        left_template, left_pieces, left_sizes = _spill_partitions(
+            _as_chunks(left, chunk_rows), left_on, partitions, directory, "left"
+        )
+        right_template, right_pieces, right_sizes = _spill_partitions(
+            _as_chunks(right, chunk_rows), right_on, partitions, directory, "right"
+        )
+        if left_template is None or right_template is None:
+            return
+
+        # Inner joins skip partitions with no matching side at all
+        todo = [
+            (
+                left_pieces[p],
+                right_pieces.get(p, []),
+                left_sizes[p] + right_sizes.get(p, 0),
+            )
+            for p in sorted(left_pieces)
+            if how == "left" or p in right_pieces
+        ]
+        if memory_budget_bytes is not None:
+            limit = memory_budget_bytes / (JOIN_MEMORY_FACTOR * max(1, workers))
+            todo = _split_oversized(todo, left_on, right_on, limit, directory)
+        else:
+            todo = [(left_paths, right_paths) for left_paths, right_paths, _ in todo]
+        # ...and the same again for partitions that were split
+        if how == "inner":
+            todo = [part for part in todo if part[0] and part[1]]
+        else:
+            todo = [part for part in todo if part[0]]
+
+        def join(part):
+            left_paths, right_paths = part
+            return pd.merge(
+                _load(left_paths, left_template),
+                _load(right_paths, right_template),
+                left_on=left_on,
+                right_on=right_on,
+                how=how,
+                suffixes=suffixes,
+            )
+
+        emitted = False
+        if workers <= 1:
+            results = map(join, todo)
+        else:
+            results = _bounded_map(join, todo, workers)
+        for merged in results:
+            if len(merged):
+                emitted = True
+                yield merged
+        if not emitted:
+            # Keep the column layout even when nothing matched
+            yield pd.merge(
+                left_template,
+                right_template,
+                left_on=left_on,
+                right_on=right_on,
+                how=how,
+                suffixes=suffixes,
+            )
+
+
+def _bounded_map(fn, items, workers):
+    # At most `workers` partitions are joined (and held) at a time, in order
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(items), workers):
+            yield from pool.map(fn, items[start : start + workers])
@@ -0,0 +1,198 @@
+import io
+import os
+
+import pandas as pd
+
+from joins import estimate_bytes
+from text_loader import iter_text_file, read_text_file
+
+# --- Memory governor: in-memory, chunked or spill-to-disk execution ---
+# Before an upload is parsed, a sample from its head gives the row width in
+# memory and on disk; with the file size that estimates the loaded frame. The
+# plan then fits the upload into what is left of the session's budget:
+#   in_memory  whole file loaded, cleaned in one pass
+#   chunked    whole file loaded, cleaned in chunks sized to the headroom
+#   spill      file streamed from disk, cleaned chunks spilled to temp files
+# and anything that can't fit is refused up front (MemoryBudgetExceeded)
+# instead of getting the shared server OOM-killed.
+# The app holds its own copies of a loaded upload besides the job's working
+# set, and finished results stay in the session until the next upload; the
+# caller passes those results in as held_bytes. A session runs its jobs one
+# at a time, so that keeps it within its ceiling; across sessions, the job
+# queue's max_workers caps how many clean at once.
+
+# Per-session ceiling; the hosted box shares its RAM among many users
+SESSION_MEMORY_CEILING = (
+    int(os.environ.get("DATA_LAUNDRY_SESSION_MEMORY_MB", "1024")) * 1024 * 1024
+)
+AVAILABLE_SHARE = 0.5  # plan for at most half of the RAM free right now
+# Raw chunk + coerced columns + masks + cleaned copy: measured ~4.2x the
+# parsed frame on a 300k-row donation file, plus headroom
+CLEAN_MEMORY_FACTOR = 5
+# Kept by the app while a job runs: the loaded upload, its mapped copy, the
+# pickled job payload and the collected cleaned result
+APP_FRAME_COPIES = 4
+# Kept by a chunked job besides the chunk: its unpickled frame and the
+# cleaned chunks so far
+CHUNKED_FRAME_COPIES = 2
+GOVERNOR_SAMPLE_BYTES = 1024 * 1024
+XLSX_EXPANSION = 10  # zipped XML: in-memory frames run ~10x the file size
+MIN_CHUNK_ROWS = 1_000
+# Spilled parts are read back and concatenated (parts + result), then
+# profiled: measured ~2.5x the cleaned rows
+SPILL_LOAD_FACTOR = 3
+EXECUTION_MODES = ("in_memory", "chunked", "spill")
+
+
+class MemoryBudgetExceeded(Exception):
+    pass
+
+
+def available_memory_bytes():
+    # Free RAM from sysconf, capped by a cgroup v2 limit inside containers
+    try:
+        free = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        free = None
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        with open("/sys/fs/cgroup/memory.current") as f:
+            used = int(f.read().strip())
+        if limit != "max":
+            headroom = max(int(limit) - used, 0)
+            free = headroom if free is None else min(free, headroom)
+    except (OSError, ValueError):
+        pass
+    return free
+
+
+def memory_budget(ceiling=None):
+    ceiling = SESSION_MEMORY_CEILING if ceiling is None else ceiling
+    free = available_memory_bytes()
+    if free is None:
+        return ceiling
+    return int(min(ceiling, free * AVAILABLE_SHARE))
+
+
+def file_size(source):
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if getattr(source, "size", None) is not None:
+        return source.size  # Streamlit uploads know their size
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def _read_head(source, limit):
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read(limit)
+    source.seek(0)
+    head = source.read(limit)
+    source.seek(0)
+    return head
+
+
+def upload_kind(name):
+    name = name.lower()
+    if name.endswith((".xls", ".xlsx")):
+        return "excel"
+    return "text" if name.endswith(".txt") else "csv"
+
+
+def estimate_working_set(source, name=None):
+    # source: a path or a binary file object; name picks the format
+    name = name or getattr(source, "name", None) or str(source)
+    file_bytes = file_size(source)
+    kind = upload_kind(name)
+    if kind == "excel":
+        # No cheap row sample inside a zip; Excel also caps out at ~1M rows
+        frame = file_bytes * XLSX_EXPANSION
+        return {
+            "kind": kind,
+            "file_bytes": file_bytes,
+            "rows": None,
+            "row_bytes": None,
+            "frame_bytes": frame,
+        }
+
+    head = _read_head(source, GOVERNOR_SAMPLE_BYTES)
+    if len(head) < file_bytes:
+        head = head[: head.rfind(b"\n") + 1] or head  # whole lines only
+    sample = (
+        read_text_file(io.BytesIO(head))
+        if kind == "text"
+        else pd.read_csv(io.BytesIO(head), encoding_errors="replace")
+    )
+    sampled_rows = max(len(sample), 1)
+    row_bytes = estimate_bytes(sample) / sampled_rows
+    rows = int(file_bytes * sampled_rows / max(len(head), 1))
+    return {
+        "kind": kind,
+        "file_bytes": file_bytes,
+        "rows": rows,
+        "row_bytes": row_bytes,
+        "frame_bytes": int(rows * row_bytes),
+    }
+
+
+def plan_execution(estimate, budget_bytes=None, held_bytes=0):
+    budget = memory_budget() if budget_bytes is None else budget_bytes
+    budget -= held_bytes
+    frame = estimate["frame_bytes"]
+    plan = {**estimate, "budget_bytes": budget, "chunk_rows": None}
+
+    if frame * (APP_FRAME_COPIES + CLEAN_MEMORY_FACTOR) <= budget:
+        return {**plan, "mode": "in_memory"}
+    if estimate["rows"] is None:
+        needed = frame * (APP_FRAME_COPIES + CLEAN_MEMORY_FACTOR)
+        raise MemoryBudgetExceeded(
+            f"This Excel file needs about {_mb(needed)} to clean, over the "
+            f"{_mb(budget)} available. Save it as CSV to have it streamed in "
+            "chunks instead."
+        )
+
+    per_row = estimate["row_bytes"] * CLEAN_MEMORY_FACTOR
+    # Chunked: the app's copies and the job's frame and cleaned chunks stay
+    # resident
+    headroom = budget - (APP_FRAME_COPIES + CHUNKED_FRAME_COPIES) * frame
+    if headroom >= MIN_CHUNK_ROWS * per_row:
+        return {**plan, "mode": "chunked", "chunk_rows": int(headroom // per_row)}
+    # Spill: only one raw chunk at a time, and a small one: the read-back at
+    # the end needs most of the budget
+    chunk_rows = int(budget / 8 // per_row)
+    if chunk_rows < MIN_CHUNK_ROWS:
+        raise MemoryBudgetExceeded(
+            f"Rows in this file are too wide to clean within {_mb(budget)}."
+        )
+    return {**plan, "mode": "spill", "chunk_rows": chunk_rows}
+
+
+def plan_upload(source, name=None, budget_bytes=None, held_bytes=0):
+    return plan_execution(estimate_working_set(source, name), budget_bytes, held_bytes)
+
+
+def iter_upload_chunks(source, plan, name=None):
+    # Raw chunks of a CSV or .txt file, parsed one at a time
+    name = name or getattr(source, "name", None) or str(source)
+    if not isinstance(source, str):
+        source.seek(0)
+    chunk_rows = plan["chunk_rows"] or MIN_CHUNK_ROWS
+    if upload_kind(name) == "text":
+        # Fixed-width blocks are cut by size: about chunk_rows lines each
+        disk_row = plan["file_bytes"] / max(plan["rows"] or 1, 1)
+        block_bytes = max(int(chunk_rows * disk_row), GOVERNOR_SAMPLE_BYTES)
+        yield from iter_text_file(
+            source, chunk_rows=chunk_rows, block_bytes=block_bytes
+        )
+    elif upload_kind(name) == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows)
+    else:
+        raise MemoryBudgetExceeded("Excel files can't be streamed; save as CSV.")
+
+
+def _mb(n):
+    return f"{n / 2**20:,.0f} MB"
@@ -0,0 +1,154 @@
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Local mock of the Salesforce sObject REST API ---
+# Enough of POST /sobjects/<type>/ and PATCH /sobjects/<type>/<id> to drive
+# push_to_salesforce offline, with knobs for latency, 429 rate limits and
+# failures. Usage:
+#     with MockSalesforce(latency=0.02, rate_limit_every=50) as mock:
+#         push_to_salesforce(df, token="test", instance_url=mock.url)
+
+SOBJECT_PATH = re.compile(r"^/services/data/v[\d.]+/sobjects/(\w+)/?(\w*)$")
+
+
+class MockSalesforce:
+    def __init__(
+        self,
+        latency=0.0,
+        jitter=0.0,
+        rate_limit_every=0,
+        retry_after=0,
+        failure_rate=0.0,
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.failure_rate = failure_rate
+        self.records = {}
+        self.counts = {"requests": 0, "created": 0, "updated": 0}
+        self.counts.update({"rate_limited": 0, "failed": 0, "rejected": 0})
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decide(self):
+        # One lock per request keeps the counters and the seeded dice in order
+        with self._lock:
+            self.counts["requests"] += 1
+            n = self.counts["requests"]
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            if self.rate_limit_every and n % self.rate_limit_every == 0:
+                self.counts["rate_limited"] += 1
+                return delay, "rate_limited"
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.counts["failed"] += 1
+                return delay, "failed"
+            return delay, "ok"
+
+    def handle(self, method, path, headers, body):
+        # Returns (status, extra headers, JSON body or None)
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            return 401, {}, [{"errorCode": "INVALID_SESSION_ID"}]
+        match = SOBJECT_PATH.match(path)
+        if match is None:
+            return 404, {}, [{"errorCode": "NOT_FOUND"}]
+
+        delay, outcome = self._decide()
+        if delay:
+            time.sleep(delay)
+        if outcome == "rate_limited":
+            return (
+                429,
+                {"Retry-After": str(self.retry_after)},
+                [{"errorCode": "REQUEST_LIMIT_EXCEEDED"}],
+            )
+        if outcome == "failed":
+            return 500, {}, [{"errorCode": "UNKNOWN_EXCEPTION"}]
+
+        try:
+            fields = json.loads(body or b"{}")
+        except ValueError:
+            with self._lock:
+                self.counts["rejected"] += 1
+            return 400, {}, [{"errorCode": "JSON_PARSER_ERROR"}]
+
+        object_type, record_id = match.groups()
+        with self._lock:
+            if method == "POST" and not record_id:
+                record_id = uuid.uuid4().hex[:18]
+                self.records[record_id] = {"type": object_type, **fields}
+                self.counts["created"] += 1
+                return 201, {}, {"id": record_id, "success": True, "errors": []}
+            if method == "PATCH" and record_id in self.records:
+                self.records[record_id].update(fields)
+                self.counts["updated"] += 1
+                return 204, {}, None
+        return 404, {}, [{"errorCode": "NOT_FOUND"}]
+
+
+def _handler_for(mock):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so a requests.Session reuses one connection
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out as separate writes; without this, Nagle
+            # plus delayed ACKs add ~40 ms to every kept-alive request
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            status, extra, payload = mock.handle(
+                self.command, self.path, self.headers, body
+            )
+            data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            for name, value in extra.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_POST = _serve
+        do_PATCH = _serve
+
+        def log_message(self, format, *args):
+            pass  # keep load tests quiet
+
+    return Handler
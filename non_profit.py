@@ -1,118 +1,246 @@
-import streamlit as st
+# streamlit, fpdf and requests are imported where they're used, so cleaning
+# jobs and worker processes start without loading the UI or PDF stacks
 import pandas as pd
-from fpdf import FPDF
+import numpy as np
 import difflib
+import multiprocessing
+import multiprocessing.util
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from rules import DONATION_RULES, GENERIC_RULES, VOLUNTEER_RULES, compile_rule_spec
+from functools import partial
+from sync_state import (
+    SYNC_ACTIONS,
+    content_hash,
+    load_sync_state,
+    open_sync_state,
+    plan_action,
+    record_keys,
+    record_synced,
+)
+from anomalies import anomaly_report, build_sketches, merge_sketches
+from recurring import recurring_revenue
+from memory_governor import (
+    SPILL_LOAD_FACTOR,
+    MemoryBudgetExceeded,
+    iter_upload_chunks,
+    plan_upload,
+)
+from joins import (
+    JOIN_MEMORY_FACTOR,
+    estimate_bytes,
+    iter_partitioned_merge,
+    normalize_name_key,
+)
+
+# --- Drop-reason bitmask (a row can carry several reasons) ---
+REASON_MISSING_NAME = 1
+REASON_BAD_AMOUNT = 2
+REASON_NONPOSITIVE_AMOUNT = 4
+REASON_BAD_DATE = 8
+REASON_BAD_HOURS = 16
+
+REASON_LABELS = {
+    REASON_MISSING_NAME: "missing name",
+    REASON_BAD_AMOUNT: "missing or unreadable amount",
+    REASON_NONPOSITIVE_AMOUNT: "zero or negative amount",
+    REASON_BAD_DATE: "missing or invalid date",
+    REASON_BAD_HOURS: "missing or unreadable hours",
+}
+
+
+def reason_bitmask(checks):
+    # checks: {reason_bit: boolean mask}; ORs them into one uint8 code per row
+    codes = None
+    for bit, failed in checks.items():
+        flags = np.asarray(failed, dtype=bool).astype(np.uint8) * np.uint8(bit)
+        codes = flags if codes is None else codes | flags
+    return codes
+
+
+def describe_reasons(code):
+    return ", ".join(label for bit, label in REASON_LABELS.items() if code & bit)
+
+
+def count_reasons(codes):
+    codes = np.asarray(codes, dtype=np.uint8)
+    return {
+        label: int(np.count_nonzero(codes & bit))
+        for bit, label in REASON_LABELS.items()
+        if np.count_nonzero(codes & bit)
+    }
 
 
-def clean_donations(df):
-    df = df.copy()
+def build_hygiene_profile(raw, coerced, codes, cleaned):
+    # raw: input after header normalization; coerced: {column: parsed Series}
+    nulls = raw.isna().sum()
+    distinct = cleaned.nunique(dropna=True)
+    columns = {}
+    for col in raw.columns:
+        invalid = 0
+        if col in coerced:
+            invalid = int((raw[col].notna() & coerced[col].isna()).sum())
+        columns[col] = {
+            "nulls": int(nulls[col]),
+            "invalid": invalid,
+            "distinct": int(distinct[col]) if col in distinct else None,
+        }
+    return {
+        "rows_in": len(raw),
+        "rows_out": len(cleaned),
+        "dropped_by_reason": count_reasons(codes),
+        "columns": columns,
+    }
+
+
+def merge_hygiene_profiles(profiles, cleaned, sketches=None):
+    # Counts add up exactly across chunks; distinct values and outlier flags
+    # are recounted once on the combined output
+    merged = {"rows_in": 0, "rows_out": 0, "dropped_by_reason": {}, "columns": {}}
+    for profile in profiles:
+        merged["rows_in"] += profile["rows_in"]
+        merged["rows_out"] += profile["rows_out"]
+        for label, count in profile["dropped_by_reason"].items():
+            merged["dropped_by_reason"][label] = (
+                merged["dropped_by_reason"].get(label, 0) + count
+            )
+        for col, stats in profile["columns"].items():
+            totals = merged["columns"].setdefault(col, {"nulls": 0, "invalid": 0})
+            totals["nulls"] += stats["nulls"]
+            totals["invalid"] += stats["invalid"]
+    distinct = cleaned.nunique(dropna=True)
+    for col, totals in merged["columns"].items():
+        totals["distinct"] = int(distinct[col]) if col in distinct else None
+    if sketches:
+        merged["anomalies"] = anomaly_report(cleaned, merge_sketches(sketches))
+    return merged
+
+
+def _report_drops(codes):
+    dropped = int(np.count_nonzero(codes))
+    if dropped > 0:
+        reasons = ", ".join(f"{n} {label}" for label, n in count_reasons(codes).items())
+        print(f"🧽 Dropped {dropped} row(s): {reasons}.")
 
-    # --- Normalize column names ---
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    print("🧪 Columns after normalization:", df.columns.tolist())
-
-    # --- Dynamic donor name aliasing ---
-    name_aliases = ["donor_name", "name", "full_name"]
-    for alias in name_aliases:
-        if alias in df.columns:
-            df = df.rename(columns={alias: "donor_name"})
-            break
-
-    # --- Use 'dept' as fallback for campaign if needed ---
-    if "campaign" not in df.columns and "dept" in df.columns:
-        df["campaign"] = df["dept"]
-
-    # --- Fill missing optional columns ---
-    if "campaign" not in df.columns:
-        df["campaign"] = "Uncategorized"
-    if "method" not in df.columns:
-        df["method"] = "unspecified"
-
-    # ✅ Require only essential columns now
-    required_columns = ["donor_name", "amount", "date"]
-    missing = [col for col in required_columns if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing expected column(s): {missing}")
-
-    # --- Standardize text fields ---
-    df["donor_name"] = df["donor_name"].astype(str).str.strip().str.title()
-    df["method"] = df["method"].astype(str).str.strip().str.lower()
-    df["campaign"] = (
-        df["campaign"].astype(str).str.strip().str.title().fillna("Uncategorized")
-    )
 
-    # --- Clean and convert 'amount' ---
-    df["amount"] = (
-        df["amount"]
-        .astype(str)
-        .str.replace("$", "", regex=False)
-        .str.replace(",", "", regex=False)
-        .str.strip()
+# Reason names used by rule specs
+REASON_BITS = {
+    "missing_name": REASON_MISSING_NAME,
+    "bad_amount": REASON_BAD_AMOUNT,
+    "nonpositive_amount": REASON_NONPOSITIVE_AMOUNT,
+    "bad_date": REASON_BAD_DATE,
+    "bad_hours": REASON_BAD_HOURS,
+}
+
+
+def clean_with_rules(df, spec, quarantine=None):
+    # spec: a rule spec dict, a built-in name, or a JSON file (see rules.py)
+    plan = compile_rule_spec(spec)
+    unknown = [reason for reason in plan.reasons if reason not in REASON_BITS]
+    if unknown:
+        raise ValueError(f"Unknown reject reason(s): {unknown}")
+
+    df, raw, coerced, checks = plan.run(df)
+
+    print("🧪 Columns after normalization:", raw.columns.tolist())
+
+    # --- Drop invalid rows, remembering why ---
+    codes = reason_bitmask(
+        {REASON_BITS[reason]: failed for reason, failed in checks.items()}
     )
-    df["amount"] = pd.to_numeric(df["amount"], errors="coerce")
+    cleaned = df
+    if codes is not None:
+        _report_drops(codes)
+        if quarantine is not None:
+            rejected = codes != 0
+            quarantine.write(raw[rejected], codes[rejected], describe_reasons)
+        cleaned = df[codes == 0]
 
-    # --- Parse dates ---
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    if plan.row_numbers:
+        cleaned.insert(0, plan.row_numbers, range(1, len(cleaned) + 1))
+        cleaned.reset_index(drop=True, inplace=True)
 
-    # --- Drop invalid rows ---
-    initial_rows = len(df)
-    df = df.dropna(subset=["donor_name", "amount", "date"])
-    df = df[df["amount"] > 0]
-    dropped = initial_rows - len(df)
-    if dropped > 0:
-        print(
-            f"🧽 Dropped {dropped} row(s) due to missing or zero amounts, donor names, or invalid dates."
-        )
+    if codes is not None:
+        profile = build_hygiene_profile(raw, coerced, codes, cleaned)
+        # 📈 Sketches ride along so chunks can be merged (see _combine_parts)
+        sketches = build_sketches(cleaned)
+        profile["anomalies"] = anomaly_report(cleaned, sketches)
+        cleaned.attrs["hygiene"] = profile
+        cleaned.attrs["sketches"] = sketches
+    return cleaned
 
-    return df
 
+def clean_donations(df, quarantine=None):
+    return clean_with_rules(df, DONATION_RULES, quarantine=quarantine)
+
+
+def clean_volunteers(df, quarantine=None):
+    return clean_with_rules(df, VOLUNTEER_RULES, quarantine=quarantine)
 
-def clean_volunteers(df):
-    df = df.copy()
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    print("🧪 Columns after normalization:", df.columns.tolist())
-
-    # --- Dynamic column alias mapping ---
-    col_map = {}
-
-    for col in df.columns:
-        col_clean = col.lower().strip()
-        if col_clean in ["name", "volunteer_name", "full_name"]:
-            col_map[col] = "name"
-        elif col_clean in ["dept", "department", "division"]:
-            col_map[col] = "dept"
-        elif col_clean in ["phone", "phone_number", "contact"]:
-            col_map[col] = "phone"
-        elif col_clean in ["hours", "volunteer_hours", "time"]:
-            col_map[col] = "hours"
-
-    df = df.rename(columns=col_map)
-
-    # ✅ Check for required columns
-    required_columns = ["name", "dept", "phone", "hours"]
-    missing = [col for col in required_columns if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing expected column(s): {missing}")
-
-    # --- Standardize fields ---
-    df["name"] = df["name"].astype(str).str.strip().str.title()
-    df["dept"] = df["dept"].astype(str).str.strip().str.title()
-    df["phone"] = df["phone"].astype(str).str.replace(r"\D", "", regex=True)
-    df["hours"] = pd.to_numeric(df["hours"], errors="coerce")
-
-    # ✅ Map department to campaign for charting
-    df["campaign"] = df["dept"].fillna("Unassigned").astype(str).str.strip().str.title()
-
-    # --- Drop rows missing key info ---
-    initial_rows = len(df)
-    df = df.dropna(subset=["name", "hours"])
-    dropped = initial_rows - len(df)
-    if dropped > 0:
-        print(f"🧽 Dropped {dropped} row(s) due to missing volunteer names or hours.")
 
-    return df
+# --- Compact finalization of cleaned frames ---
+CATEGORY_MAX_RATIO = 0.5
+# Money stays float64: float32 group totals drift once sums pass ~$100k
+FLOAT64_COLUMNS = {"amount"}
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def _compact_text(series, max_ratio):
+    distinct = series.nunique(dropna=True)
+    if distinct <= max(1, len(series) * max_ratio):
+        return series.astype("category")
+    if pd.api.types.is_object_dtype(series):
+        try:
+            return series.astype("string[pyarrow]")
+        except ImportError:
+            return series
+    return series
+
+
+def _compact_number(series, column):
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series) and column not in FLOAT64_COLUMNS:
+        narrowed = series.astype("float32")
+        # Only keep float32 when every value survives the round trip exactly
+        if narrowed.astype(series.dtype).equals(series):
+            return narrowed
+    return series
+
+
+def finalize_cleaned_frame(df, max_category_ratio=CATEGORY_MAX_RATIO):
+    memory_before = int(df.memory_usage(deep=True).sum())
+    compact = df.copy()
+
+    for col in compact.columns:
+        series = compact[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if _is_text(series):
+            # Phones stay E.164 text ("+15551234567"): as numbers they lose the
+            # "+" that tells valid numbers from invalid bare digits
+            compact[col] = _compact_text(series, max_category_ratio)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(
+            series
+        ):
+            compact[col] = _compact_number(series, col)
+
+    memory_after = int(compact.memory_usage(deep=True).sum())
+    report = {
+        "memory_before_bytes": memory_before,
+        "memory_after_bytes": memory_after,
+        "reduction_ratio": (
+            round(memory_before / memory_after, 2) if memory_after else None
+        ),
+        "dtypes": {col: str(dtype) for col, dtype in compact.dtypes.items()},
+    }
+    return compact, report
 
 
 def generate_hygiene_report(original_df, cleaned_df, name):
@@ -128,13 +256,36 @@ def generate_hygiene_report(original_df, cleaned_df, name):
         "Rows Removed": removed_rows,
         "Missing Values (by column)": null_counts[null_counts > 0].to_dict(),
     }
+    profile = cleaned_df.attrs.get("hygiene")
+    if profile:
+        report["Rows Removed (by reason)"] = profile["dropped_by_reason"]
+        report["Unreadable Values (by column)"] = {
+            col: stats["invalid"]
+            for col, stats in profile["columns"].items()
+            if stats["invalid"]
+        }
+        report["Distinct Values (by column)"] = {
+            col: stats["distinct"]
+            for col, stats in profile["columns"].items()
+            if stats["distinct"] is not None
+        }
+        report["Possible Outliers (flagged, not removed)"] = {
+            col: {
+                "flagged": stats["flagged"],
+                f"by {stats['by']}": stats.get("by_group", {}),
+            }
+            for col, stats in profile.get("anomalies", {}).items()
+            if stats["flagged"]
+        }
+    if "phone_valid" in cleaned_df.columns:
+        report["Invalid Phone Numbers"] = int((~cleaned_df["phone_valid"]).sum())
     return report
 
 
 def generate_donation_summary(df):
     df = df.copy()
     summary = {
-        "total_donations": df["amount"].sum(),
+        "total_donations": float(df["amount"].sum()),
         "unique_donors": df["donor_name"].nunique(),
         "campaign_totals": df.groupby("campaign")["amount"]
         .sum()
@@ -147,47 +298,96 @@ def generate_donation_summary(df):
                 df["date"].dt.to_period("M").value_counts().sort_index().items()
             )
         },
+        "recurring_revenue": recurring_revenue(df),
     }
     return summary
 
 
+def _phone_validity_counts(df):
+    if "phone_valid" not in df.columns:
+        return {}
+    valid = int(df["phone_valid"].sum())
+    return {"valid": valid, "invalid": len(df) - valid}
+
+
 def generate_volunteer_summary(df):
     df = df.copy()
     summary = {
-        "total_hours": df["hours"].sum(),
+        "total_hours": float(df["hours"].sum()),
         "volunteers_count": df["name"].nunique(),
         "departments_involved": df["dept"].nunique(),
         "hours_by_department": df.groupby("dept")["hours"]
         .sum()
         .sort_values(ascending=False)
         .to_dict(),
-        "volunteers_by_phone_length": df["phone"]
-        .str.len()
-        .value_counts()
-        .sort_index()
-        .to_dict(),
+        "phone_numbers": _phone_validity_counts(df),
     }
     return summary
 
 
-def merge_donor_volunteer_data(donors_df, volunteers_df):
-    donors = donors_df.copy()
-    volunteers = volunteers_df.copy()
+def merge_donor_volunteer_data(
+    donors_df,
+    volunteers_df,
+    how="inner",  # use "left" if you want all donors with volunteer info where available
+    memory_budget_bytes=None,
+    workers=1,
+    output=None,
+):
+    # Small inputs merge in memory. Past memory_budget_bytes (or for
+    # chunk iterables) both sides are hash-partitioned to disk and joined
+    # partition by partition; output="merged.csv" streams the result to a file
+    # instead of returning one DataFrame.
+    in_memory = all(
+        isinstance(side, pd.DataFrame) for side in (donors_df, volunteers_df)
+    ) and (
+        memory_budget_bytes is None
+        or (estimate_bytes(donors_df) + estimate_bytes(volunteers_df))
+        * JOIN_MEMORY_FACTOR
+        <= memory_budget_bytes
+    )
+
+    if in_memory:
+        donors = donors_df.copy()
+        volunteers = volunteers_df.copy()
+
+        donors["donor_name"] = normalize_name_key(donors["donor_name"])
+        volunteers["name"] = normalize_name_key(volunteers["name"])
+
+        parts = [
+            pd.merge(
+                donors,
+                volunteers,
+                left_on="donor_name",
+                right_on="name",
+                how=how,
+                suffixes=("_donor", "_volunteer"),
+            )
+        ]
+    else:
+        parts = iter_partitioned_merge(
+            donors_df,
+            volunteers_df,
+            left_on="donor_name",
+            right_on="name",
+            how=how,
+            memory_budget_bytes=memory_budget_bytes,
+            workers=workers,
+            suffixes=("_donor", "_volunteer"),
+        )
+
+    if output is None:
+        parts = list(parts)
+        return parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
 
-    donors["donor_name"] = donors["donor_name"].astype(str).str.strip().str.lower()
-    volunteers["name"] = volunteers["name"].astype(str).str.strip().str.lower()
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        for number, part in enumerate(parts):
+            part.to_csv(f, index=False, header=number == 0)
+    return output
 
-    return pd.merge(
-        donors,
-        volunteers,
-        left_on="donor_name",
-        right_on="name",
-        how="inner",  # use "left" if you want all donors with volunteer info where available
-        suffixes=("_donor", "_volunteer"),
-    )
 
+def create_pdf_report(donation_summary, volunteer_summary, cohort_summary=None):
+    from fpdf import FPDF
 
-def create_pdf_report(donation_summary, volunteer_summary):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -209,23 +409,34 @@ def create_pdf_report(donation_summary, volunteer_summary):
         pdf.set_font("Arial", size=11)
         for key, value in volunteer_summary.items():
             pdf.multi_cell(0, 10, f"{key}: {value}")
+        pdf.ln(5)
+
+    if cohort_summary:
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 10, "Donor Retention", ln=True)
+        pdf.set_font("Arial", size=11)
+        for key, value in cohort_summary.items():
+            pdf.multi_cell(0, 10, f"{key}: {value}")
 
     return pdf.output(dest="S").encode("latin1")
 
 
+# Built once at import, not on every guess_columns call
+GUESS_FIELDS = {
+    "name": ("name", "full_name", "volunteer_name", "donor_name", "supporter"),
+    "hours": ("hours", "time", "duration", "volunteer_hours", "logged_hours"),
+    "amount": ("amount", "donation", "gift", "contribution", "value"),
+    "department": ("department", "program", "ministry", "campaign", "area"),
+    "date": ("date", "timestamp", "entry_date", "donation_date", "served_on"),
+}
+
+
 def guess_columns(df):
     if df is None:
         return {}
-    expected_fields = {
-        "name": ["name", "full_name", "volunteer_name", "donor_name", "supporter"],
-        "hours": ["hours", "time", "duration", "volunteer_hours", "logged_hours"],
-        "amount": ["amount", "donation", "gift", "contribution", "value"],
-        "department": ["department", "program", "ministry", "campaign", "area"],
-        "date": ["date", "timestamp", "entry_date", "donation_date", "served_on"],
-    }
 
     mapping = {}
-    for field, candidates in expected_fields.items():
+    for field, candidates in GUESS_FIELDS.items():
         matches = difflib.get_close_matches(field, df.columns, n=1, cutoff=0.6)
         if matches:
             mapping[field] = matches[0]
@@ -239,6 +450,8 @@ def guess_columns(df):
 
 
 def load_and_clean_structured_sales(uploaded_file):
+    import streamlit as st
+
     if uploaded_file is None:
         return None
 
@@ -275,8 +488,24 @@ def load_and_clean_dataframe(uploaded_file):
     if uploaded_file is None:
         return None
 
+    # 🐘 Too big to load whole? Stream it under the memory governor instead
+    try:
+        plan = plan_upload(uploaded_file)
+    except MemoryBudgetExceeded as e:
+        st.error(f"⚠️ {e}")
+        return None
+    except Exception:
+        plan = None  # unreadable sample: let the loaders below report it
+    if plan is not None and plan["mode"] == "spill":
+        try:
+            return clean_file_spilled(uploaded_file, plan, cleaner=safe_clean_dataframe)
+        except MemoryBudgetExceeded as e:
+            st.error(f"⚠️ {e}")
+            return None
+
     try:
         # Try loading as comma CSV
+        uploaded_file.seek(0)
         df = pd.read_csv(uploaded_file, encoding="utf-8")
         if df.shape[1] == 1:
             sample = df.iloc[:, 0].dropna().astype(str)
@@ -313,7 +542,12 @@ def load_and_clean_dataframe(uploaded_file):
     st.dataframe(df.head(3))
 
     try:
-        df_clean = safe_clean_dataframe(df)
+        if plan is not None and plan["mode"] == "chunked":
+            df_clean = clean_data_chunked(
+                df, chunk_rows=plan["chunk_rows"], cleaner=safe_clean_dataframe
+            )
+        else:
+            df_clean = safe_clean_dataframe(df)
         if df_clean is None or df_clean.empty:
             st.warning("⚠️ Cleaning completed, but no usable data remained.")
             return None
@@ -323,68 +557,16 @@ def load_and_clean_dataframe(uploaded_file):
         return None
 
 
-def safe_clean_dataframe(df):
-    import pandas as pd
-    import streamlit as st
-
+def safe_clean_dataframe(df, drop_empty_columns=True, quarantine=None):
+    # The generic spec never rejects a row, so quarantine stays empty here
     if df is None:
         raise ValueError("No data to clean.")
 
-    df_clean = df.copy()
-
-    # ✅ Normalize column names
-    df_clean.columns = [
-        col.strip().lower().replace(" ", "_") for col in df_clean.columns
-    ]
-
-    # 🧹 Drop fully empty columns
-    df_clean.dropna(axis=1, how="all", inplace=True)
-
-    # 🧾 Clean 'amount' values
-
-    if "amount" in df_clean.columns and "category" in df_clean.columns:
-        contains_pipe = df_clean["amount"].astype(str).str.contains(r"\|").any()
-
-        if contains_pipe:
-            df_clean = df_clean.assign(
-                amount=df_clean["amount"].astype(str).str.split("|"),
-                category=df_clean["category"].astype(str).str.split("|"),
-            ).explode(["amount", "category"])
-
-        # 🧼 Now clean up the amount column
-        df_clean["amount"] = (
-            df_clean["amount"]
-            .astype(str)
-            .str.extract(r"([0-9]+(?:\.[0-9]+)?)")[0]
-            .replace("", None)
-        )
-        df_clean["amount"] = pd.to_numeric(df_clean["amount"], errors="coerce")
-
-    # 📆 Clean 'date' if present
-    if "date" in df_clean.columns:
-        df_clean["date"] = pd.to_datetime(df_clean["date"], errors="coerce")
-
-    # ⏱️ Clean 'hours' if present
-    if "hours" in df_clean.columns:
-        df_clean["hours"] = pd.to_numeric(df_clean["hours"], errors="coerce")
-
-    # 🪪 Map 'dept' to 'campaign' if needed
-    if "dept" in df_clean.columns and "campaign" not in df_clean.columns:
-        df_clean["campaign"] = df_clean["dept"]
-
-    # 🧼 Standardize 'campaign' values
-    if "campaign" in df_clean.columns:
-        df_clean["campaign"] = (
-            df_clean["campaign"]
-            .astype(str)
-            .str.strip()
-            .str.title()
-            .replace("", "Uncategorized")
-            .fillna("Uncategorized")
-        )
-    df_clean.insert(0, "row", range(1, len(df_clean) + 1))
-    df_clean.reset_index(drop=True, inplace=True)
-    return df_clean
+    # 🧹 Chunked runs drop empty columns once for the whole file instead
+    spec = GENERIC_RULES
+    if not drop_empty_columns:
+        spec = {**GENERIC_RULES, "drop_empty_columns": False}
+    return clean_with_rules(df, spec, quarantine=quarantine)
 
 
 # def flatten_invoice_dataset(uploaded_file):
@@ -429,20 +611,87 @@ def safe_clean_dataframe(df):
 
 
 def debug_invoice_file(uploaded_file):
+    import streamlit as st
+
     df = pd.read_excel(uploaded_file, header=None)
     st.write("🧾 Raw Excel Preview (first 15 rows):")
     st.dataframe(df.head(15))
 
 
 # --- Salesforce Push (Beta Stub) ---
-def push_to_salesforce(df, object_type="Opportunity"):
-    import requests
+SYNC_CHECK_EVERY = 50
+DEFAULT_SALESFORCE_URL = "https://your_instance.salesforce.com"
+SALESFORCE_API_VERSION = "v52.0"
+SYNC_MAX_RETRIES = 4
+SYNC_MAX_BACKOFF = 30.0
+
+
+def salesforce_instance_url(instance_url=None):
+    # Explicit argument (the app passes its sidebar value), then the
+    # environment; no session state here, this also runs in job workers
+    if not instance_url:
+        instance_url = os.environ.get("SALESFORCE_INSTANCE_URL")
+    return (instance_url or DEFAULT_SALESFORCE_URL).rstrip("/")
+
+
+def _salesforce_payload(row):
+    payload = {
+        "Name": row.get("name", row.get("donor_name")),
+        "Amount__c": row.get("amount"),
+        "Campaign__c": row.get("campaign"),
+        "Hours__c": row.get("hours"),
+        "Email__c": row.get("contact"),
+    }
+    # JSON has no NaN; blanks go out as null
+    return {
+        field: (None if value is not None and pd.isna(value) else value)
+        for field, value in payload.items()
+    }
+
+
+def _retry_delay(response, attempt):
+    # Salesforce (and most gateways) say how long to wait; otherwise back off
+    try:
+        delay = float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        delay = 0.5 * 2**attempt
+    return min(max(delay, 0.0), SYNC_MAX_BACKOFF)
+
+
+def _send_with_retry(send, url, headers, body, sleep=time.sleep):
+    # 429 means "slow down", not "failed": wait and resend the same request
+    for attempt in range(SYNC_MAX_RETRIES + 1):
+        response = send(url, headers=headers, data=body)
+        if response.status_code != 429 or attempt == SYNC_MAX_RETRIES:
+            return response
+        sleep(_retry_delay(response, attempt))
+
+
+def _response_id(response):
+    try:
+        return response.json().get("id")
+    except ValueError:
+        return None
+
+
+def push_to_salesforce(
+    df,
+    object_type="Opportunity",
+    token=None,
+    progress=None,
+    should_cancel=None,
+    sync_state=None,
+    session=None,
+    key_columns=None,
+    instance_url=None,
+):
     import json
     import streamlit as st
     from datetime import datetime
-    import pandas as pd  # If you plan to return/display/export the log
 
-    token = st.session_state.get("sf_token")
+    # Background jobs pass the token explicitly; the app falls back to session state
+    if token is None:
+        token = st.session_state.get("sf_token")
     if not token:
         return (
             False,
@@ -450,71 +699,472 @@ def push_to_salesforce(df, object_type="Opportunity"):
             [],
         )
 
-    instance_url = "https://your_instance.salesforce.com"
+    # Anything with requests.Session's post/patch works, e.g. a fake in tests
+    if session is None:
+        import requests
+
+        session = requests.Session()
+
+    endpoint = (
+        f"{salesforce_instance_url(instance_url)}"
+        f"/services/data/{SALESFORCE_API_VERSION}/sobjects/{object_type}/"
+    )
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
-    try:
-        synced = 0
-        errors = []
-        log = []
-
-        for _, row in df.iterrows():
-            payload = {
-                "Name": row.get("name"),
-                "Amount__c": row.get("amount"),
-                "Campaign__c": row.get("campaign"),
-                "Hours__c": row.get("hours"),
-                "Email__c": row.get("contact"),
-            }
+    # 🔁 With a sync_state store (path or connection) only new or changed
+    # rows are sent; without one every row is created, as before
+    conn = sync_state
+    if isinstance(sync_state, str):
+        conn = open_sync_state(sync_state)
+    state = load_sync_state(conn, object_type) if conn is not None else {}
+    keys = record_keys(df, key_columns) if conn is not None else None
 
-            response = requests.post(
-                f"{instance_url}/services/data/v52.0/sobjects/{object_type}/",
-                headers=headers,
-                data=json.dumps(payload),
-            )
+    counts = dict.fromkeys(SYNC_ACTIONS, 0)
+    errors = []
+    log = []
+    pending = []
+    total = len(df)
 
-            timestamp = datetime.now().isoformat()
-
-            if response.ok:
-                synced += 1
-                log.append(
-                    {
-                        "name": row.get("name", "Unknown"),
-                        "status": "Synced",
-                        "message": "Success",
-                        "timestamp": timestamp,
-                    }
+    try:
+        for position, row in enumerate(df.to_dict("records")):
+            if should_cancel and position % SYNC_CHECK_EVERY == 0 and should_cancel():
+                pushed = counts["create"] + counts["update"]
+                summary = (
+                    f"✋ Sync cancelled after {position} rows. ✅ Pushed {pushed} rows."
                 )
+                return False, summary, log
+
+            payload = _salesforce_payload(row)
+            digest = content_hash(payload)
+            action = "create"
+            if conn is not None:
+                action = plan_action(state, keys[position], digest)
+
+            if action != "skip":
+                body = json.dumps(payload, default=str)
+                if action == "create":
+                    response = _send_with_retry(session.post, endpoint, headers, body)
+                else:
+                    remote_id = state[keys[position]][1]
+                    response = _send_with_retry(
+                        session.patch, f"{endpoint}{remote_id}", headers, body
+                    )
+
+                timestamp = datetime.now().isoformat()
+                name = row.get("name", row.get("donor_name", "Unknown"))
+                if response.ok:
+                    counts[action] += 1
+                    if conn is not None:
+                        if action == "create":
+                            remote_id = _response_id(response)
+                        pending.append((keys[position], digest, remote_id))
+                    log.append(
+                        {
+                            "name": name,
+                            "status": "Synced" if action == "create" else "Updated",
+                            "message": "Success",
+                            "timestamp": timestamp,
+                        }
+                    )
+                else:
+                    errors.append(name)
+                    log.append(
+                        {
+                            "name": name,
+                            "status": "Failed",
+                            "message": response.text,
+                            "timestamp": timestamp,
+                        }
+                    )
             else:
-                errors.append(row.get("name", "Unknown"))
-                log.append(
-                    {
-                        "name": row.get("name", "Unknown"),
-                        "status": "Failed",
-                        "message": response.text,
-                        "timestamp": timestamp,
-                    }
-                )
-
-        summary = f"✅ Pushed {synced} rows. 🚧 {len(errors)} errors."
+                counts["skip"] += 1
+
+            if (position + 1) % SYNC_CHECK_EVERY == 0:
+                if conn is not None:
+                    record_synced(conn, object_type, pending)
+                    pending = []
+                if progress:
+                    progress(position + 1, total, "sync")
+
+        if progress:
+            progress(total, total, "sync")
+        if conn is None:
+            summary = f"✅ Pushed {counts['create']} rows. 🚧 {len(errors)} errors."
+        else:
+            summary = (
+                f"✅ Pushed {counts['create']} new and {counts['update']} changed rows, "
+                f"skipped {counts['skip']} unchanged. 🚧 {len(errors)} errors."
+            )
         return True, summary, log
 
     except Exception as e:
         return False, f"Sync error: {e}", []
 
+    finally:
+        # Rows that went through are remembered even if the run stops early
+        if conn is not None:
+            record_synced(conn, object_type, pending)
+            if isinstance(sync_state, str):
+                conn.close()
+
 
 def run_column_mapper(df):
     return df.copy()  # Placeholder for any mapping logic you'd like
 
 
-def clean_data(df):
-    df_std = run_column_mapper(df)
+def select_cleaner(df_std):
     if "amount" in df_std.columns and "date" in df_std.columns:
-        return clean_donations(df_std)
+        return clean_donations
     elif "hours" in df_std.columns and "name" in df_std.columns:
-        return clean_volunteers(df_std)
+        return clean_volunteers
     else:
-        return safe_clean_dataframe(df_std)
+        return safe_clean_dataframe
+
+
+def clean_data(df, quarantine=None):
+    df_std = run_column_mapper(df)
+    cleaned = select_cleaner(df_std)(df_std, quarantine=quarantine)
+    cleaned.attrs.pop("sketches", None)
+    return cleaned
+
+
+# --- Chunked execution with progress + cancellation ---
+# progress(done, total, stage) is called after every chunk;
+# should_cancel() is checked before every chunk.
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+class ProcessingCancelled(Exception):
+    pass
+
+
+def iter_chunks(
+    df, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, should_cancel=None, stage="clean"
+):
+    total = len(df)
+    for start in range(0, max(total, 1), chunk_rows):
+        if should_cancel and should_cancel():
+            raise ProcessingCancelled(
+                f"Cancelled during {stage} at row {start:,} of {total:,}."
+            )
+        chunk = df.iloc[start : start + chunk_rows]
+        yield chunk
+        if progress:
+            progress(min(start + chunk_rows, total), total, stage)
+
+
+def _prepare_cleaner(df, cleaner):
+    df_std = run_column_mapper(df)
+    if cleaner is None:
+        cleaner = select_cleaner(df_std)
+    is_fallback = cleaner is safe_clean_dataframe
+
+    if is_fallback:
+        # Empty columns are judged on the whole file, not per chunk
+        df_std = df_std.loc[:, df_std.notna().any().to_numpy()]
+        cleaner = partial(safe_clean_dataframe, drop_empty_columns=False)
+    return df_std, cleaner, is_fallback
+
+
+def _combine_parts(parts, is_fallback):
+    cleaned = pd.concat(parts)
+    profiles = [part.attrs["hygiene"] for part in parts if "hygiene" in part.attrs]
+    sketches = [part.attrs["sketches"] for part in parts if "sketches" in part.attrs]
+    cleaned.attrs.pop("sketches", None)
+    if profiles:
+        cleaned.attrs["hygiene"] = merge_hygiene_profiles(profiles, cleaned, sketches)
+
+    if is_fallback:
+        # Row numbers restart in every chunk; renumber across the whole file
+        cleaned = cleaned.reset_index(drop=True)
+        cleaned["row"] = range(1, len(cleaned) + 1)
+    return cleaned
+
+
+def clean_data_chunked(
+    df,
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    progress=None,
+    should_cancel=None,
+    cleaner=None,
+    quarantine=None,
+):
+    df_std, cleaner, is_fallback = _prepare_cleaner(df, cleaner)
+    parts = [
+        cleaner(chunk, quarantine=quarantine)
+        for chunk in iter_chunks(df_std, chunk_rows, progress, should_cancel)
+    ]
+    return _combine_parts(parts, is_fallback)
+
+
+def clean_file_spilled(
+    source,
+    plan,
+    cleaner=None,
+    quarantine=None,
+    progress=None,
+    should_cancel=None,
+    name=None,
+):
+    # Spill mode of the memory governor (see memory_governor.py): the file is
+    # parsed one chunk at a time and each cleaned chunk goes to a temp file.
+    # Parts are only read back once their measured size fits the budget.
+    is_fallback = False
+    done, spilled_bytes = 0, 0
+    with tempfile.TemporaryDirectory(prefix="data_laundry_spill_") as spill_dir:
+        paths = []
+        for chunk in iter_upload_chunks(source, plan, name):
+            if should_cancel and should_cancel():
+                raise ProcessingCancelled(f"Cancelled during clean at row {done:,}.")
+            df_std = run_column_mapper(chunk)
+            if cleaner is None:
+                # The first chunk picks the workflow for the whole file
+                cleaner = select_cleaner(df_std)
+            if cleaner is safe_clean_dataframe:
+                # Empty columns can't be judged from a stream; keep them
+                is_fallback = True
+                cleaner = partial(safe_clean_dataframe, drop_empty_columns=False)
+            part = cleaner(df_std, quarantine=quarantine)
+
+            spilled_bytes += estimate_bytes(part)
+            if spilled_bytes * SPILL_LOAD_FACTOR > plan["budget_bytes"]:
+                raise MemoryBudgetExceeded(
+                    f"Cleaned rows passed the {plan['budget_bytes'] / 2**20:,.0f} MB "
+                    f"memory limit after {done + len(chunk):,} rows. Split the file "
+                    "and upload the parts separately."
+                )
+            paths.append(os.path.join(spill_dir, f"part-{len(paths):06d}.pkl"))
+            part.to_pickle(paths[-1])
+            done += len(chunk)
+            if progress:
+                progress(done, max(done, plan["rows"] or done), "clean")
+        if not paths:
+            raise ValueError("The file has a header but no rows.")
+        return _combine_parts([pd.read_pickle(path) for path in paths], is_fallback)
+
+
+# --- Partition-parallel execution ---
+# The file is split into one row range per worker; each range is cleaned on
+# its own and the parts are combined exactly as the chunked path does.
+# backend is anything with an order-preserving map(fn, items): a
+# concurrent.futures executor, or an adapter over a cluster client.
+PARALLEL_MIN_ROWS = 50_000
+
+# One pool per process, shared by every caller; it only grows (up to the
+# CPU count) when a caller asks for more workers than it has
+PARALLEL_MAX_WORKERS = os.cpu_count() or 1
+_process_pool = {"executor": None, "workers": 0}
+
+
+def _process_backend(workers):
+    # Kept warm between calls so worker start-up is paid once per process
+    workers = max(1, min(workers, PARALLEL_MAX_WORKERS))
+    if _process_pool["executor"] is None or _process_pool["workers"] < workers:
+        if _process_pool["executor"] is not None:
+            _process_pool["executor"].shutdown(wait=False)
+        # "spawn", as in job_queue: workers don't inherit the server's threads
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        # Inside a job worker, exit joins child processes without stopping
+        # them first; shut the pool down before its queues close (priority 10)
+        multiprocessing.util.Finalize(executor, executor.shutdown, exitpriority=100)
+        _process_pool.update(executor=executor, workers=workers)
+    return _process_pool["executor"]
+
+
+class _RejectCollector:
+    # Stands in for a quarantine sink inside a worker; the caller's sink
+    # replays the batches in partition order
+    def __init__(self):
+        self.batches = []
+
+    def write(self, rows, codes, describe):
+        self.batches.append((rows, codes))
+
+
+def _clean_partition(cleaner, part, collect_rejects=False):
+    sink = _RejectCollector() if collect_rejects else None
+    cleaned = cleaner(part, quarantine=sink)
+    return cleaned, sink.batches if sink else []
+
+
+def clean_data_partitioned(
+    df,
+    workers=None,
+    partitions=None,
+    backend=None,
+    cleaner=None,
+    quarantine=None,
+    progress=None,
+    should_cancel=None,
+):
+    df_std, cleaner, is_fallback = _prepare_cleaner(df, cleaner)
+    workers = workers or os.cpu_count() or 1
+    if partitions is None:
+        # Small files aren't worth shipping to other processes
+        partitions = max(1, min(workers, -(-len(df_std) // PARALLEL_MIN_ROWS)))
+    bounds = np.linspace(0, len(df_std), partitions + 1).astype(int)
+    pieces = [df_std.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    task = partial(_clean_partition, cleaner, collect_rejects=quarantine is not None)
+    if backend is None and partitions > 1:
+        backend = _process_backend(workers)
+    results = map(task, pieces) if backend is None else backend.map(task, pieces)
+
+    parts = []
+    done = 0
+    try:
+        for piece, (cleaned, rejects) in zip(pieces, results):
+            if should_cancel and should_cancel():
+                raise ProcessingCancelled(
+                    f"Cancelled during clean at row {done:,} of {len(df_std):,}."
+                )
+            for rows, codes in rejects:
+                quarantine.write(rows, codes, describe_reasons)
+            parts.append(cleaned)
+            done += len(piece)
+            if progress:
+                progress(done, len(df_std), "clean")
+    except BrokenProcessPool:
+        # A crashed worker poisons the pool; start a fresh one next time
+        if _process_pool["executor"] is backend:
+            _process_pool.update(executor=None, workers=0)
+        raise
+    finally:
+        # Closing an executor's result iterator cancels partitions not yet started
+        if hasattr(results, "close"):
+            results.close()
+    return _combine_parts(parts, is_fallback)
+
+
+# --- Row routing for mixed donation/volunteer files ---
+# Engagement exports interleave gifts and volunteer shifts. Each row gets a
+# route bitmask in one vectorized pass: a row with an amount is a gift, a row
+# with hours is a shift. Rows with both or neither go to both cleaners, as a
+# whole-file clean would, so they are judged (and quarantined) by each.
+ROUTE_DONATION = 1
+ROUTE_VOLUNTEER = 2
+ROUTE_KINDS = {"donations": ROUTE_DONATION, "volunteers": ROUTE_VOLUNTEER}
+# An explicit row-type column, when present, overrides the value test
+ROUTE_TYPE_COLUMNS = ("type", "record_type", "row_type", "activity", "activity_type")
+ROUTE_KEYWORDS = {
+    ROUTE_DONATION: ("gift", "donat", "pledge", "contribution", "payment"),
+    ROUTE_VOLUNTEER: ("shift", "volunteer", "service"),
+}
+
+
+def is_mixed_layout(df_std):
+    return "amount" in df_std.columns and "hours" in df_std.columns
+
+
+def _filled(series):
+    filled = series.notna()
+    if not pd.api.types.is_numeric_dtype(series):
+        filled &= series.astype(str).str.strip().ne("")
+    return filled.to_numpy(dtype=bool)
+
+
+def route_rows(df_std):
+    n = len(df_std)
+    has_amount = _filled(df_std["amount"]) if "amount" in df_std else np.zeros(n, bool)
+    has_hours = _filled(df_std["hours"]) if "hours" in df_std else np.zeros(n, bool)
+    routes = has_amount * np.uint8(ROUTE_DONATION) | has_hours * np.uint8(
+        ROUTE_VOLUNTEER
+    )
+    routes[routes == 0] = ROUTE_DONATION | ROUTE_VOLUNTEER
+
+    type_col = next((c for c in ROUTE_TYPE_COLUMNS if c in df_std.columns), None)
+    if type_col is not None:
+        text = df_std[type_col].astype(str).str.lower()
+        for route, words in ROUTE_KEYWORDS.items():
+            matched = text.str.contains("|".join(words), regex=True, na=False)
+            routes[matched.to_numpy()] = route
+    return routes.astype(np.uint8)
+
+
+def _add_counts(total, partial):
+    return partial if total is None else total.add(partial, fill_value=0)
+
+
+def summarize_chunked(
+    df, kind, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, should_cancel=None
+):
+    # Same output as generate_donation_summary / generate_volunteer_summary,
+    # built from per-chunk partial aggregates
+    if kind == "donations":
+        totals = {
+            "amount": 0.0,
+            "donors": [],
+            "campaign": None,
+            "method": None,
+            "month": None,
+        }
+        for chunk in iter_chunks(
+            df, chunk_rows, progress, should_cancel, stage="summary"
+        ):
+            totals["amount"] += chunk["amount"].sum()
+            totals["donors"].append(chunk["donor_name"].dropna().unique())
+            totals["campaign"] = _add_counts(
+                totals["campaign"], chunk.groupby("campaign")["amount"].sum()
+            )
+            totals["method"] = _add_counts(
+                totals["method"], chunk["method"].value_counts()
+            )
+            totals["month"] = _add_counts(
+                totals["month"], chunk["date"].dt.to_period("M").value_counts()
+            )
+        return {
+            "total_donations": float(totals["amount"]),
+            "unique_donors": pd.Series(
+                np.concatenate(totals["donors"]) if totals["donors"] else []
+            ).nunique(),
+            "campaign_totals": totals["campaign"]
+            .sort_values(ascending=False)
+            .to_dict(),
+            "donations_by_method": totals["method"]
+            .astype(int)
+            .sort_values(ascending=False)
+            .to_dict(),
+            "donations_by_month": {
+                str(k): v for k, v in totals["month"].astype(int).sort_index().items()
+            },
+            # A donor's gifts span chunks, so cadence is read from the whole frame
+            "recurring_revenue": recurring_revenue(df),
+        }
+
+    if kind == "volunteers":
+        totals = {
+            "hours": 0.0,
+            "names": [],
+            "depts": [],
+            "dept_hours": None,
+            "phones": {},
+        }
+        for chunk in iter_chunks(
+            df, chunk_rows, progress, should_cancel, stage="summary"
+        ):
+            totals["hours"] += chunk["hours"].sum()
+            totals["names"].append(chunk["name"].dropna().unique())
+            totals["depts"].append(chunk["dept"].dropna().unique())
+            totals["dept_hours"] = _add_counts(
+                totals["dept_hours"], chunk.groupby("dept")["hours"].sum()
+            )
+            for status, count in _phone_validity_counts(chunk).items():
+                totals["phones"][status] = totals["phones"].get(status, 0) + count
+        return {
+            "total_hours": float(totals["hours"]),
+            "volunteers_count": pd.Series(np.concatenate(totals["names"])).nunique(),
+            "departments_involved": pd.Series(
+                np.concatenate(totals["depts"])
+            ).nunique(),
+            "hours_by_department": totals["dept_hours"]
+            .sort_values(ascending=False)
+            .to_dict(),
+            "phone_numbers": totals["phones"],
+        }
+
+    raise ValueError(f"Unknown summary kind: {kind}")
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from rules import normalize_header
+
+DEFAULT_PROFILE_DIR = "data_laundry_profiles"
+PROFILE_KINDS = ("auto", "donations", "volunteers")
+
+# --- Saved org profiles ---
+# One JSON file per header signature, named by the signature itself, so a
+# lookup is a single file open however many profiles are saved.
+
+
+def header_signature(columns):
+    # Same set of normalized headers -> same signature, in any column order
+    headers = sorted({normalize_header(col) for col in columns})
+    return hashlib.sha1("\n".join(headers).encode("utf-8")).hexdigest()
+
+
+def profile_path(store_dir, signature):
+    return os.path.join(store_dir, f"{signature}.json")
+
+
+def find_profile(store_dir, columns):
+    try:
+        with open(
+            profile_path(store_dir, header_signature(columns)), encoding="utf-8"
+        ) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_profile(store_dir, columns, name, mapping, kind="auto"):
+    # mapping: {upload header: standard column}; headers are stored normalized
+    headers = sorted({normalize_header(col) for col in columns})
+    mapping = {normalize_header(src): dst for src, dst in mapping.items() if dst}
+    unknown = [src for src in mapping if src not in headers]
+    if unknown:
+        raise ValueError(f"Mapped column(s) not in the upload: {unknown}")
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"Unknown profile kind: {kind}")
+
+    options = json.dumps({"mapping": mapping, "kind": kind}, sort_keys=True)
+    profile = {
+        "name": name.strip() or "Unnamed org",
+        "signature": header_signature(columns),
+        "headers": headers,
+        "mapping": mapping,
+        "kind": kind,
+        # Changes whenever the mapping or options do; keys cached results
+        "version": hashlib.sha1(options.encode("utf-8")).hexdigest()[:8],
+        "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+    os.makedirs(store_dir, exist_ok=True)
+    # Write-then-rename so a reader never sees half a profile
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, profile_path(store_dir, profile["signature"]))
+    return profile
+
+
+def delete_profile(store_dir, signature):
+    try:
+        os.remove(profile_path(store_dir, signature))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def list_profiles(store_dir):
+    if not os.path.isdir(store_dir):
+        return []
+    profiles = []
+    for entry in sorted(os.listdir(store_dir)):
+        if entry.endswith(".json"):
+            with open(os.path.join(store_dir, entry), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+    return sorted(profiles, key=lambda p: p["name"].lower())
+
+
+def apply_profile(df, profile):
+    mapping = profile["mapping"]
+    renames = {
+        col: mapping[normalize_header(col)]
+        for col in df.columns
+        if normalize_header(col) in mapping
+    }
+    return df.rename(columns=renames)
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 50
+ORDER_CACHE_SIZE = 8
+
+# --- Paginated previews ---
+# A page is always an iloc slice of at most page_size rows, so only the rows
+# on screen get serialized. Sorting costs one argsort per (dataset, column,
+# direction); every later page of that sort is a constant-time lookup.
+
+_order_cache = OrderedDict()
+_order_lock = threading.Lock()
+
+
+def page_count(n_rows, page_size=DEFAULT_PAGE_SIZE):
+    return max(1, -(-n_rows // page_size))
+
+
+def index_digest(df):
+    # Filtered views keep the cleaned frame's row labels, so the labels tell
+    # two filters of the same upload apart without hashing any values
+    if isinstance(df.index, pd.RangeIndex):
+        return (df.index.start, df.index.stop, df.index.step)
+    hashed = pd.util.hash_pandas_object(df.index, index=False).to_numpy()
+    return int(hashed.sum(dtype=np.uint64))
+
+
+def _argsort(series, descending):
+    try:
+        ordered = series.reset_index(drop=True).sort_values(
+            ascending=not descending, kind="stable", na_position="last"
+        )
+    except TypeError:
+        # Mixed types in one column can't be compared; fall back to text order
+        ordered = (
+            series.astype(str)
+            .where(series.notna())
+            .reset_index(drop=True)
+            .sort_values(ascending=not descending, kind="stable", na_position="last")
+        )
+    positions = ordered.index.to_numpy()
+    return positions.astype(np.int32 if len(positions) < 2**31 else np.int64)
+
+
+def sort_positions(df, column, descending=False, cache_key=None):
+    # Row positions of df in sorted order. With a cache_key (one per upload),
+    # the order is reused across reruns until the rows or the sort change.
+    if cache_key is None:
+        return _argsort(df[column], descending)
+
+    key = (cache_key, column, descending, len(df), index_digest(df))
+    with _order_lock:
+        if key in _order_cache:
+            _order_cache.move_to_end(key)
+            return _order_cache[key]
+    positions = _argsort(df[column], descending)
+    with _order_lock:
+        _order_cache[key] = positions
+        while len(_order_cache) > ORDER_CACHE_SIZE:
+            _order_cache.popitem(last=False)
+    return positions
+
+
+def page_slice(df, page, page_size=DEFAULT_PAGE_SIZE, positions=None):
+    # page is 0-based; out-of-range pages clamp to the last one
+    page = min(max(page, 0), page_count(len(df), page_size) - 1)
+    start = page * page_size
+    stop = min(start + page_size, len(df))
+    if positions is None:
+        return df.iloc[start:stop]
+    return df.iloc[positions[start:stop]]
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DEFAULT_COUNTRY_CODE = "1"
+NATIONAL_NUMBER_LENGTH = 10  # NANP: 3-digit area code + 7-digit number
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+EXTENSION_PATTERN = r"(?i)\s*(?:ext\.?|extension|x|#)\s*(?P<extension>\d{1,6})\s*$"
+
+
+def _as_arrow_text(phones):
+    if pd.api.types.is_numeric_dtype(phones) and not pd.api.types.is_bool_dtype(phones):
+        # Spreadsheets often load phone columns as floats: 5551234567.0
+        phones = phones.round().astype("Int64")
+    elif pd.api.types.is_object_dtype(phones):
+        # Mixed columns put numbers next to text; drop a float's trailing ".0"
+        phones = phones.astype(str).str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+    text = pc.cast(pa.array(phones, from_pandas=True), pa.string())
+    if isinstance(text, pa.ChunkedArray):
+        text = text.combine_chunks()
+    return text
+
+
+def _keep_ascii_digits(text):
+    # Filter the UTF-8 byte buffer directly: digits are single bytes 0x30-0x39
+    # and every byte of a multi-byte character is >= 0x80, so none slip through
+    _, offset_buffer, data_buffer = text.buffers()
+    offsets = np.frombuffer(offset_buffer, dtype=np.int32)[
+        text.offset : text.offset + len(text) + 1
+    ]
+    data = (
+        np.frombuffer(data_buffer, dtype=np.uint8)[offsets[0] : offsets[-1]]
+        if data_buffer is not None and len(text)
+        else np.empty(0, dtype=np.uint8)
+    )
+    is_digit = (data >= ord("0")) & (data <= ord("9"))
+    kept_before = np.concatenate([[0], np.cumsum(is_digit, dtype=np.int64)])
+    digits = pa.StringArray.from_buffers(
+        len(text),
+        pa.py_buffer(kept_before[offsets - offsets[0]].astype(np.int32)),
+        pa.py_buffer(data[is_digit].tobytes()),
+    )
+    return pc.if_else(pc.is_valid(text), digits, None)
+
+
+def _as_pandas(arrow_array):
+    return pd.arrays.ArrowStringArray(arrow_array)
+
+
+def normalize_phone_numbers(
+    phones,
+    default_country_code=DEFAULT_COUNTRY_CODE,
+    national_length=NATIONAL_NUMBER_LENGTH,
+):
+    # Whole-column normalization with Arrow string kernels; no per-row Python
+    phones = pd.Series(phones)
+    text = _as_arrow_text(phones)
+    present = pc.is_valid(text)
+
+    # ☎️ Split off extensions: "x12", "ext. 4", "#7"
+    extension = pc.struct_field(pc.extract_regex(text, EXTENSION_PATTERN), "extension")
+    number = pc.replace_substring_regex(text, EXTENSION_PATTERN, "")
+    has_plus = pc.fill_null(
+        pc.starts_with(pc.utf8_ltrim_whitespace(number), "+"), False
+    )
+    raw_digits = _keep_ascii_digits(number)
+    digits = raw_digits
+
+    # 🌍 International dialling prefixes: "+", "00", and "011" inside NANP
+    international = has_plus
+    prefixes = ["011", "00"] if default_country_code == "1" else ["00"]
+    for prefix in prefixes:
+        dialled = pc.and_(
+            pc.invert(international),
+            pc.fill_null(pc.starts_with(digits, prefix), False),
+        )
+        digits = pc.if_else(
+            dialled, pc.utf8_slice_codeunits(digits, len(prefix)), digits
+        )
+        international = pc.or_(international, dialled)
+
+    national = pc.invert(international)
+    if default_country_code != "1":
+        # Most non-NANP plans dial a trunk "0" before national numbers
+        trunk = pc.and_(national, pc.fill_null(pc.starts_with(digits, "0"), False))
+        digits = pc.if_else(trunk, pc.utf8_slice_codeunits(digits, 1), digits)
+
+    length = pc.utf8_length(digits)
+    needs_country = pc.and_(national, pc.equal(length, national_length))
+    already_prefixed = pc.and_(
+        pc.and_(
+            national,
+            pc.equal(length, national_length + len(default_country_code)),
+        ),
+        pc.starts_with(digits, default_country_code),
+    )
+    full_digits = pc.if_else(
+        needs_country,
+        pc.binary_join_element_wise(default_country_code, digits, ""),
+        digits,
+    )
+    length = pc.utf8_length(full_digits)
+
+    valid = pc.and_(
+        present,
+        pc.or_(pc.or_(international, needs_country), already_prefixed),
+    )
+    valid = pc.and_(valid, pc.greater_equal(length, E164_MIN_DIGITS))
+    valid = pc.and_(valid, pc.less_equal(length, E164_MAX_DIGITS))
+    # Country codes never start with 0, and +1 (NANP) is always 11 digits
+    valid = pc.and_(valid, pc.invert(pc.starts_with(full_digits, "0")))
+    valid = pc.and_(
+        valid,
+        pc.or_(pc.invert(pc.starts_with(full_digits, "1")), pc.equal(length, 11)),
+    )
+    valid = pc.fill_null(valid, False)
+
+    e164 = pc.if_else(valid, pc.binary_join_element_wise("+", full_digits, ""), None)
+    return pd.DataFrame(
+        {
+            "e164": _as_pandas(e164),
+            "digits": _as_pandas(raw_digits),
+            "extension": _as_pandas(extension),
+            "valid": valid.to_numpy(zero_copy_only=False),
+        },
+        index=phones.index,
+    )
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+QUARANTINE_FORMATS = ("csv", "parquet")
+
+
+def source_row_numbers(df):
+    # 1-based row numbers in the original upload. Chunks keep the upload's
+    # RangeIndex labels, so the index is the stable reference when it's numeric.
+    if pd.api.types.is_integer_dtype(df.index):
+        return np.asarray(df.index, dtype=np.int64) + 1
+    return np.arange(1, len(df) + 1, dtype=np.int64)
+
+
+class QuarantineSink:
+    # Collects rejected rows with their source row number and reason code.
+    # Each write() is one bulk append, so chunked cleans add one write per chunk.
+    def __init__(self, target, format=None):
+        if format is None:
+            name = target if isinstance(target, (str, os.PathLike)) else ""
+            format = "parquet" if str(name).endswith(".parquet") else "csv"
+        if format not in QUARANTINE_FORMATS:
+            raise ValueError(f"Unsupported quarantine format: {format}")
+        self.target = target
+        self.format = format
+        self.rows_written = 0
+        self._handle = None
+        self._parquet_writer = None
+        self._columns = None
+
+    def write(self, rows, codes, describe):
+        if len(rows) == 0:
+            return
+
+        codes = np.asarray(codes, dtype=np.uint8)
+        # Raw values are kept as text so every batch shares one schema
+        batch = rows.astype("string").astype(object).where(rows.notna(), None)
+        batch.insert(0, "source_row", source_row_numbers(rows))
+        batch.insert(1, "reason_code", codes.astype(np.int64))
+        labels = {code: describe(code) for code in np.unique(codes)}
+        batch.insert(2, "reason", pd.Series(codes, index=batch.index).map(labels))
+
+        if self._columns is None:
+            self._columns = list(batch.columns)
+        else:
+            # Later chunks may lack a column the first one had (or vice versa)
+            for col in batch.columns:
+                if col not in self._columns:
+                    raise ValueError(f"Quarantine column appeared mid-stream: {col}")
+            batch = batch.reindex(columns=self._columns)
+
+        if self.format == "csv":
+            self._write_csv(batch)
+        else:
+            self._write_parquet(batch)
+        self.rows_written += len(batch)
+
+    def _write_csv(self, batch):
+        first = self._handle is None
+        if first:
+            if isinstance(self.target, (str, os.PathLike)):
+                self._handle = open(self.target, "w", newline="", encoding="utf-8")
+            else:
+                self._handle = self.target
+        batch.to_csv(self._handle, index=False, header=first)
+
+    def _write_parquet(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+        if self._parquet_writer is None:
+            schema = pa.schema(
+                [
+                    pa.field(
+                        name,
+                        (
+                            pa.int64()
+                            if name in ("source_row", "reason_code")
+                            else pa.string()
+                        ),
+                    )
+                    for name in table.column_names
+                ]
+            )
+            self._parquet_writer = pq.ParquetWriter(self.target, schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if self._handle is not None:
+            # Caller-owned buffers are flushed, files we opened are closed
+            if self._handle is self.target:
+                self._handle.flush()
+            else:
+                self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
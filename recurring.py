@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+
+from joins import normalize_name_key
+
+# --- Recurring-gift detection ---
+# Gifts are sorted once by (donor, date); inter-gift gaps and amount spread
+# come from diff + bincount/groupby over donor codes, never a per-donor loop.
+# A donor's cadence is read from the median gap, so one skipped month lowers
+# the confidence instead of breaking the pattern.
+
+CADENCES = {
+    # cadence: (shortest, longest median gap in days, fewest gifts, gifts/year)
+    "monthly": (25, 36, 3, 12),
+    "quarterly": (80, 100, 3, 4),
+    "annual": (340, 390, 2, 1),
+}
+ONE_TIME = "one-time"
+IRREGULAR = "irregular"  # repeat donor with no steady cadence
+CADENCE_LABELS = [*CADENCES, ONE_TIME, IRREGULAR]
+MIN_ON_CADENCE = 0.5  # share of a donor's gaps that must fall in the band
+MAX_AMOUNT_CV = 0.3  # sustainers give (nearly) the same amount each time
+LAPSE_PERIODS = 2  # a sustainer two cycles overdue no longer counts as active
+
+DONOR_COLUMNS = [
+    "donor_name",
+    "gifts",
+    "first_gift",
+    "last_gift",
+    "median_gap_days",
+    "typical_amount",
+    "amount_cv",
+    "total_given",
+    "cadence",
+    "confidence",
+    "active",
+    "annual_value",
+]
+
+
+# Per-donor gift statistics: everything the classification needs, one row
+# per donor. history_store builds the same frame in SQL.
+STAT_COLUMNS = [
+    "donor_name",
+    "gifts",
+    "first_day",
+    "last_day",
+    "median_gap",
+    "typical_amount",
+    "total",
+    "total_squares",
+    *(f"{name}_gaps" for name in CADENCES),
+    "cadence_gaps",
+]
+
+
+def _in_band(gaps, shortest, longest):
+    return (gaps >= shortest) & (gaps <= longest)
+
+
+def donor_gift_stats(df):
+    gifts = df.loc[
+        df["donor_name"].notna() & df["date"].notna() & df["amount"].notna(),
+        ["donor_name", "date", "amount"],
+    ]
+    if not len(gifts):
+        return pd.DataFrame(columns=STAT_COLUMNS)
+
+    donor, _ = pd.factorize(normalize_name_key(gifts["donor_name"]))
+    days = gifts["date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    order = np.lexsort((days, donor))
+    donor, days = donor[order], days[order]
+    amounts = gifts["amount"].to_numpy(dtype=float)[order]
+    donors = int(donor.max()) + 1
+
+    counts = np.bincount(donor, minlength=donors)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    ends = starts + counts - 1
+
+    # Gaps between consecutive gifts of the same donor
+    same = donor[1:] == donor[:-1]
+    gaps = np.diff(days)[same]
+    gap_donor = donor[1:][same]
+    stats = {
+        # Spelling from each donor's first gift
+        "donor_name": gifts["donor_name"].to_numpy()[order[starts]],
+        "gifts": counts,
+        "first_day": days[starts],
+        "last_day": days[ends],
+        "median_gap": (
+            pd.Series(gaps, dtype=float)
+            .groupby(gap_donor)
+            .median()
+            .reindex(range(donors))
+            .to_numpy()
+        ),
+        "typical_amount": pd.Series(amounts).groupby(donor).median().to_numpy(),
+        "total": np.bincount(donor, weights=amounts, minlength=donors),
+        "total_squares": np.bincount(donor, weights=amounts**2, minlength=donors),
+    }
+    in_any = np.zeros(len(gaps), dtype=bool)
+    for name, (shortest, longest, _, _) in CADENCES.items():
+        in_band = _in_band(gaps, shortest, longest)
+        in_any |= in_band
+        stats[f"{name}_gaps"] = np.bincount(
+            gap_donor, weights=in_band, minlength=donors
+        )
+    stats["cadence_gaps"] = np.bincount(gap_donor, weights=in_any, minlength=donors)
+    return pd.DataFrame(stats, columns=STAT_COLUMNS)
+
+
+def classify_donors(df, as_of=None):
+    return classify_gift_stats(donor_gift_stats(df), as_of=as_of)
+
+
+def classify_gift_stats(stats, as_of=None):
+    if not len(stats):
+        return pd.DataFrame(columns=DONOR_COLUMNS)
+    donors = len(stats)
+    counts = stats["gifts"].to_numpy(dtype=np.int64)
+    median_gap = stats["median_gap"].to_numpy(dtype=float)
+    last_day = stats["last_day"].to_numpy(dtype=np.int64)
+    totals = stats["total"].to_numpy(dtype=float)
+    typical = stats["typical_amount"].to_numpy(dtype=float)
+
+    # Amount stability: coefficient of variation from running sums
+    mean = totals / counts
+    variance = stats["total_squares"].to_numpy(dtype=float) / counts
+    amount_cv = np.sqrt(np.maximum(variance - mean**2, 0)) / mean
+
+    # A cadence needs its median gap in band, most gaps on beat and a steady
+    # amount; random repeat gifts rarely manage all three
+    cadence = np.where(counts == 1, ONE_TIME, IRREGULAR).astype(object)
+    intervals = counts - 1
+    hit_rate = np.zeros(donors)
+    per_year = np.zeros(donors)
+    for name, (shortest, longest, fewest, yearly) in CADENCES.items():
+        with np.errstate(invalid="ignore"):
+            hits = stats[f"{name}_gaps"].to_numpy(dtype=float) / intervals
+        match = (
+            _in_band(median_gap, shortest, longest)
+            & (counts >= fewest)
+            & (hits >= MIN_ON_CADENCE)
+            & (amount_cv <= MAX_AMOUNT_CV)
+        )
+        cadence[match] = name
+        hit_rate[match], per_year[match] = hits[match], yearly
+
+    # Confidence: share of gaps on cadence x amount steadiness x evidence
+    evidence = intervals / (intervals + 1)
+    with np.errstate(invalid="ignore"):
+        off_rate = 1 - stats["cadence_gaps"].to_numpy(dtype=float) / intervals
+    recurring = per_year > 0
+    confidence = np.where(
+        recurring,
+        hit_rate / (1 + np.nan_to_num(amount_cv)) * evidence,
+        np.where(counts == 1, 1.0, off_rate * evidence),
+    )
+
+    # Active sustainers: last gift no more than LAPSE_PERIODS cycles ago
+    as_of = last_day.max() if as_of is None else _as_day(as_of)
+    cycle_days = np.divide(365.25, per_year, out=np.zeros(donors), where=recurring)
+    active = recurring & (last_day >= as_of - LAPSE_PERIODS * cycle_days)
+
+    return pd.DataFrame(
+        {
+            "donor_name": stats["donor_name"].to_numpy(),
+            "gifts": counts,
+            "first_gift": stats["first_day"]
+            .to_numpy(dtype=np.int64)
+            .astype("datetime64[D]"),
+            "last_gift": last_day.astype("datetime64[D]"),
+            "median_gap_days": median_gap,
+            "typical_amount": typical.round(2),
+            "amount_cv": amount_cv.round(3),
+            "total_given": totals.round(2),
+            "cadence": cadence,
+            "confidence": np.round(confidence, 3),
+            "active": active,
+            "annual_value": (typical * per_year).round(2),
+        }
+    )
+
+
+def _as_day(value):
+    return pd.Timestamp(value).to_datetime64().astype("datetime64[D]").astype(np.int64)
+
+
+def recurring_revenue(df, as_of=None):
+    # The "recurring_revenue" section of the donation summary
+    return revenue_summary(classify_donors(df, as_of=as_of))
+
+
+def revenue_summary(donors):
+    by_cadence = donors["cadence"].value_counts()
+    recurring = donors["cadence"].isin(list(CADENCES))
+    annual = float(donors.loc[donors["active"].astype(bool), "annual_value"].sum())
+    total = float(donors["total_given"].sum())
+    return {
+        "donors_by_cadence": {
+            label: int(by_cadence.get(label, 0)) for label in CADENCE_LABELS
+        },
+        "active_recurring_donors": int(donors["active"].astype(bool).sum()),
+        "monthly_recurring_revenue": round(annual / 12, 2),
+        "annualized_recurring_revenue": round(annual, 2),
+        "recurring_share_of_giving": (
+            round(float(donors.loc[recurring, "total_given"].sum()) / total, 3)
+            if total
+            else 0.0
+        ),
+    }
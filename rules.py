@@ -0,0 +1,337 @@
+import json
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from phones import normalize_phone_numbers
+
+# --- Declarative cleaning rules ---
+# A rule spec is plain JSON. Steps run in this order:
+#   drop_empty_columns  drop columns with no values at all
+#   aliases             {target: [header, ...]}; the first header present wins
+#   required            columns that must exist after aliasing
+#   copy_if_missing     {target: source}; copy a column the file doesn't have
+#   defaults            {column: value}; constant for a column the file doesn't have
+#   explode             {"columns": [...], "separator": "|"}; one row per split value
+#   fields              {column: {"type": ..., options}}; coercions, in order
+#   reject              [{"column", "if", "reason"}]; rows dropped and why
+#   row_numbers         name of a 1-based row counter column to add
+# Rows are only ever judged by "reject"; everything else is column-wise.
+
+SPEC_KEYS = {
+    "name",
+    "drop_empty_columns",
+    "aliases",
+    "required",
+    "copy_if_missing",
+    "defaults",
+    "explode",
+    "fields",
+    "reject",
+    "row_numbers",
+}
+TEXT_CASES = ("title", "lower", "upper")
+# Coerce distinct values once when a text column repeats itself this much,
+# judged first on an evenly spaced sample so unique columns skip factorizing
+DISTINCT_MAX_RATIO = 0.5
+DISTINCT_SAMPLE_ROWS = 10_000
+REJECT_CONDITIONS = ("missing", "nonpositive")
+
+DONATION_RULES = {
+    "name": "donations",
+    "aliases": {"donor_name": ["donor_name", "name", "full_name"]},
+    "required": ["donor_name", "amount", "date"],
+    "copy_if_missing": {"campaign": "dept"},
+    "defaults": {"campaign": "Uncategorized", "method": "unspecified"},
+    "fields": {
+        "donor_name": {"type": "text", "case": "title"},
+        "method": {"type": "text", "case": "lower"},
+        "campaign": {"type": "text", "case": "title", "fill": "Uncategorized"},
+        "amount": {"type": "currency"},
+        "date": {"type": "date"},
+    },
+    "reject": [
+        {"column": "donor_name", "if": "missing", "reason": "missing_name"},
+        {"column": "amount", "if": "missing", "reason": "bad_amount"},
+        {"column": "amount", "if": "nonpositive", "reason": "nonpositive_amount"},
+        {"column": "date", "if": "missing", "reason": "bad_date"},
+    ],
+}
+
+VOLUNTEER_RULES = {
+    "name": "volunteers",
+    "aliases": {
+        "name": ["name", "volunteer_name", "full_name"],
+        "dept": ["dept", "department", "division"],
+        "phone": ["phone", "phone_number", "contact"],
+        "hours": ["hours", "volunteer_hours", "time"],
+    },
+    "required": ["name", "dept", "phone", "hours"],
+    "fields": {
+        "name": {"type": "text", "case": "title"},
+        "dept": {"type": "text", "case": "title"},
+        "phone": {"type": "phone"},
+        "hours": {"type": "number"},
+        # ✅ Department doubles as campaign for charting
+        "campaign": {
+            "type": "text",
+            "source": "dept",
+            "case": "title",
+            "fill": "Unassigned",
+        },
+    },
+    "reject": [
+        {"column": "name", "if": "missing", "reason": "missing_name"},
+        {"column": "hours", "if": "missing", "reason": "bad_hours"},
+    ],
+}
+
+# Unknown layouts: tidy what is recognisable, never drop a row
+GENERIC_RULES = {
+    "name": "generic",
+    "drop_empty_columns": True,
+    "copy_if_missing": {"campaign": "dept"},
+    # Invoice exports pack several line items into one cell: "10|20.5"
+    "explode": {"columns": ["amount", "category"], "separator": "|"},
+    "fields": {
+        "amount": {"type": "number_in_text", "requires": ["category"]},
+        "date": {"type": "date"},
+        "hours": {"type": "number"},
+        "campaign": {
+            "type": "text",
+            "case": "title",
+            "fill": "Uncategorized",
+            "fill_blank": True,
+        },
+    },
+    "row_numbers": "row",
+}
+
+BUILTIN_RULES = {
+    spec["name"]: spec for spec in (DONATION_RULES, VOLUNTEER_RULES, GENERIC_RULES)
+}
+
+
+def load_rule_spec(source):
+    # A spec dict, a built-in name, a path to a .json file, or JSON text
+    if isinstance(source, dict):
+        return source
+    if source in BUILTIN_RULES:
+        return BUILTIN_RULES[source]
+    if os.path.exists(source):
+        with open(source, encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(source)
+
+
+# --- Field coercions: (series, options) -> Series, or (Series, {suffix: extra}) ---
+def _text(series, options):
+    text = series.astype(str).str.strip()
+    case = options.get("case")
+    if case:
+        text = getattr(text.str, case)()
+    fill = options.get("fill")
+    if fill is not None:
+        if options.get("fill_blank"):
+            text = text.replace("", fill)
+        text = text.fillna(fill)
+    return text
+
+
+def _number(series, options):
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _currency(series, options):
+    # "$1,200.50" -> 1200.5
+    return pd.to_numeric(
+        series.astype(str)
+        .str.replace("$", "", regex=False)
+        .str.replace(",", "", regex=False)
+        .str.strip(),
+        errors="coerce",
+    )
+
+
+def _number_in_text(series, options):
+    # First number found anywhere in the cell: "USD 12.50 (paid)" -> 12.5
+    found = series.astype(str).str.extract(r"([0-9]+(?:\.[0-9]+)?)")[0]
+    return pd.to_numeric(found.replace("", None), errors="coerce")
+
+
+def _date(series, options):
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _phone(series, options):
+    # ☎️ E.164 where the number is valid, bare digits otherwise
+    phones = normalize_phone_numbers(series)
+    return phones["e164"].fillna(phones["digits"]), {
+        "extension": phones["extension"],
+        "valid": phones["valid"],
+    }
+
+
+FIELD_TYPES = {
+    "text": _text,
+    "number": _number,
+    "currency": _currency,
+    "number_in_text": _number_in_text,
+    "date": _date,
+    "phone": _phone,
+}
+# Types that parse values, so unreadable input shows up in the hygiene profile
+PARSED_TYPES = {"number", "currency", "number_in_text", "date"}
+
+
+def _coerce_distinct(coerce, series, options):
+    # Campaigns, methods, dates and amounts repeat heavily, so each distinct
+    # value is parsed once and the results are broadcast back by position
+    if not isinstance(series.dtype, pd.StringDtype):
+        return coerce(series, options)
+    sample = series.iloc[:: max(1, len(series) // DISTINCT_SAMPLE_ROWS)]
+    if sample.nunique(dropna=False) > len(sample) * DISTINCT_MAX_RATIO:
+        return coerce(series, options)
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    if len(uniques) > len(series) * DISTINCT_MAX_RATIO:
+        return coerce(series, options)
+
+    def expand(values):
+        return values.take(codes).set_axis(series.index)
+
+    result = coerce(pd.Series(uniques), options)
+    if isinstance(result, tuple):
+        result, extras = result
+        return expand(result), {k: expand(v) for k, v in extras.items()}
+    return expand(result)
+
+
+def normalize_header(col):
+    return str(col).strip().lower().replace(" ", "_")
+
+
+class RulePlan:
+    # A validated spec with its lookups precomputed; build via compile_rule_spec
+    def __init__(self, spec):
+        unknown = set(spec) - SPEC_KEYS
+        if unknown:
+            raise ValueError(f"Unknown rule spec key(s): {sorted(unknown)}")
+
+        self.name = spec.get("name", "custom")
+        self.drop_empty_columns = bool(spec.get("drop_empty_columns", False))
+        self.aliases = [
+            (target, [normalize_header(a) for a in candidates])
+            for target, candidates in spec.get("aliases", {}).items()
+        ]
+        self.required = list(spec.get("required", []))
+        self.copy_if_missing = dict(spec.get("copy_if_missing", {}))
+        self.defaults = dict(spec.get("defaults", {}))
+        self.explode = spec.get("explode")
+        self.row_numbers = spec.get("row_numbers")
+
+        self.fields = []
+        for column, options in spec.get("fields", {}).items():
+            kind = options.get("type")
+            if kind not in FIELD_TYPES:
+                raise ValueError(f"Unknown field type for '{column}': {kind}")
+            if options.get("case") not in (None,) + TEXT_CASES:
+                raise ValueError(f"Unknown text case for '{column}': {options['case']}")
+            self.fields.append((column, FIELD_TYPES[kind], options))
+        self.parsed = [
+            column
+            for column, options in spec.get("fields", {}).items()
+            if options["type"] in PARSED_TYPES
+        ]
+
+        self.reject = []
+        for rule in spec.get("reject", []):
+            if rule.get("if") not in REJECT_CONDITIONS:
+                raise ValueError(f"Unknown reject condition: {rule.get('if')}")
+            self.reject.append((rule["column"], rule["if"], rule["reason"]))
+        self.reasons = list(dict.fromkeys(reason for _, _, reason in self.reject))
+
+    def run(self, df):
+        # Returns (df, raw, coerced, checks): the transformed frame, the input
+        # after header mapping, {column: parsed values}, {reason: failed mask}
+        df = df.copy()
+        df.columns = [normalize_header(col) for col in df.columns]
+
+        if self.drop_empty_columns:
+            df = df.loc[:, df.notna().any().to_numpy()]
+
+        renames = {}
+        for target, candidates in self.aliases:
+            for alias in candidates:
+                if alias in df.columns:
+                    renames[alias] = target
+                    break
+        if renames:
+            df = df.rename(columns=renames)
+
+        missing = [col for col in self.required if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing expected column(s): {missing}")
+
+        # Copy-on-write snapshot of the input values for hygiene and quarantine
+        raw = df.copy(deep=False)
+
+        for target, source in self.copy_if_missing.items():
+            if target not in df.columns and source in df.columns:
+                df[target] = df[source]
+        for column, value in self.defaults.items():
+            if column not in df.columns:
+                df[column] = value
+
+        if self.explode:
+            columns = self.explode["columns"]
+            separator = self.explode.get("separator", "|")
+            if all(col in df.columns for col in columns):
+                first = df[columns[0]].astype(str)
+                if first.str.contains(separator, regex=False).any():
+                    df = df.assign(
+                        **{
+                            col: df[col].astype(str).str.split(separator, regex=False)
+                            for col in columns
+                        }
+                    ).explode(columns)
+
+        for column, coerce, options in self.fields:
+            source = options.get("source", column)
+            if source not in df.columns:
+                continue
+            if any(col not in df.columns for col in options.get("requires", [])):
+                continue
+            result = _coerce_distinct(coerce, df[source], options)
+            if isinstance(result, tuple):
+                result, extras = result
+                df[column] = result
+                for suffix, values in extras.items():
+                    df[f"{column}_{suffix}"] = values
+            else:
+                df[column] = result
+
+        coerced = {col: df[col] for col in self.parsed if col in df.columns}
+
+        # Reject columns may come from coercions or defaults, so check them last
+        missing = [col for col, _, _ in self.reject if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing expected column(s): {sorted(set(missing))}")
+
+        checks = {}
+        for column, condition, reason in self.reject:
+            values = df[column]
+            failed = values.isna() if condition == "missing" else values <= 0
+            checks[reason] = checks[reason] | failed if reason in checks else failed
+        return df, raw, coerced, checks
+
+
+@lru_cache(maxsize=64)
+def _compile(spec_json):
+    return RulePlan(json.loads(spec_json))
+
+
+def compile_rule_spec(spec):
+    # Plans are cached by the spec's JSON text, so a spec compiles once.
+    # Keys aren't sorted: field order is the order coercions run in.
+    return _compile(json.dumps(load_rule_spec(spec)))
@@ -0,0 +1,174 @@
+import io
+import math
+
+import numpy as np
+import pandas as pd
+
+from joins import normalize_name_key
+from memory_governor import file_size, upload_kind
+from text_loader import read_text_file
+
+# --- Fast preview from a random sample of rows ---
+# Instead of loading and cleaning the whole upload, seek to PREVIEW_SAMPLE_ROWS
+# random byte offsets (one per equal slice of the file, i.e. stratified) and
+# take the line under each. A line is hit in proportion to its length in
+# bytes, so each sampled row is weighted by 1/length: totals are estimated as
+#     file bytes x mean(value / line bytes)
+# (Hansen-Hurwitz), with a normal-approximation confidence interval. The cost
+# is bounded by the sample size, not the file size:
+#     preview = fast_preview(uploaded_file, cleaner)
+#     preview["cleaned"], preview["totals"]["amount"], preview["distinct"]
+# Quoted fields spanning several lines can't be sampled by seeking; those
+# files raise ValueError and the caller cleans the whole file instead.
+
+PREVIEW_SAMPLE_ROWS = 2_000
+FAST_PREVIEW_MIN_BYTES = 1024 * 1024  # smaller files are cleaned in full
+CONFIDENCE_Z = 1.96  # 95% intervals
+MAX_LINE_BYTES = 64 * 1024  # a longer line under an offset is skipped
+PREVIEW_TOTAL_COLUMNS = ("amount", "hours")
+PREVIEW_DISTINCT_COLUMNS = ("donor_name", "name")
+# Rides through the cleaner so each cleaned row is traced to its sampled row,
+# even when the cleaner explodes one row into several and renumbers them
+SAMPLE_ROW_COLUMN = "_sample_row"
+
+
+def _line_at(source, offset, data_start, file_bytes):
+    # The whole line containing byte `offset`, or None if it is too long
+    start = max(data_start, offset - MAX_LINE_BYTES)
+    source.seek(start)
+    window = source.read(min(file_bytes, offset + MAX_LINE_BYTES) - start)
+    at = offset - start
+    begin = window.rfind(b"\n", 0, at) + 1
+    if begin == 0 and start > data_start:
+        return None
+    end = window.find(b"\n", at)
+    if end < 0:
+        if start + len(window) < file_bytes:
+            return None
+        end = len(window) - 1  # last line, no trailing newline
+    return window[begin : end + 1]
+
+
+def sample_lines(source, rows=PREVIEW_SAMPLE_ROWS, seed=0):
+    # (header line, sampled lines, bytes after the header); one random offset
+    # per stratum, so every part of the file is represented
+    file_bytes = file_size(source)
+    source.seek(0)
+    header = source.readline()
+    data_start = len(header)
+    data_bytes = file_bytes - data_start
+    rng = np.random.default_rng(seed)
+    offsets = data_start + (
+        (np.arange(rows) + rng.random(rows)) * data_bytes / rows
+    ).astype(np.int64)
+    lines = [_line_at(source, int(at), data_start, file_bytes) for at in offsets]
+    source.seek(0)
+    return header, [line for line in lines if line is not None], data_bytes
+
+
+def sample_upload(source, name=None, rows=PREVIEW_SAMPLE_ROWS, seed=0):
+    # (parsed sample rows, design): the design holds what scales them up
+    name = name or getattr(source, "name", None) or str(source)
+    if upload_kind(name) == "excel":
+        raise ValueError("Excel files can't be sampled by seeking; save as CSV.")
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return sample_upload(f, name, rows, seed)
+
+    header, lines, data_bytes = sample_lines(source, rows, seed)
+    draws = len(lines)
+    lines = [line for line in lines if line.strip()]  # blank lines are no rows
+    blob = header + b"".join(
+        line if line.endswith(b"\n") else line + b"\n" for line in lines
+    )
+    try:
+        if upload_kind(name) == "text":
+            sample = read_text_file(io.BytesIO(blob))
+        else:
+            sample = pd.read_csv(io.BytesIO(blob), encoding_errors="replace")
+    except pd.errors.ParserError:
+        sample = None
+    if sample is None or len(sample) != len(lines):
+        raise ValueError("Rows span several lines; this file can't be sampled.")
+    design = {
+        "line_bytes": np.array([len(line) for line in lines], dtype=float),
+        "draws": draws,
+        "data_bytes": data_bytes,
+    }
+    return sample, design
+
+
+def _interval(values, design):
+    # Total over the file from per-row values of the sampled rows (0 for
+    # dropped rows and blank lines). Each stratum is treated as an independent
+    # draw, which slightly overstates the variance: intervals err wide.
+    draws = design["draws"]
+    scaled = np.zeros(draws)
+    scaled[: len(values)] = np.asarray(values, dtype=float) / design["line_bytes"]
+    estimate = design["data_bytes"] * scaled.mean()
+    margin = 0.0
+    if draws > 1:
+        error = design["data_bytes"] * scaled.std(ddof=1) / math.sqrt(draws)
+        margin = CONFIDENCE_Z * error
+    return {
+        "estimate": estimate,
+        "low": max(estimate - margin, 0.0),
+        "high": estimate + margin,
+    }
+
+
+def estimate_distinct(values, total_rows):
+    # GEE (Charikar et al.): values seen once in the sample stand for up to
+    # total/sample values each; the estimate is the geometric middle of the
+    # bounds and is within a factor sqrt(total/sample) of the true count
+    keys = normalize_name_key(values.dropna())
+    sampled = len(keys)
+    if not sampled:
+        return {"estimate": 0.0, "low": 0.0, "high": 0.0}
+    frequency = keys.value_counts().value_counts()
+    once = int(frequency.get(1, 0))
+    repeated = int(frequency.sum()) - once
+    scale = max(total_rows / sampled, 1.0)
+    return {
+        "estimate": math.sqrt(scale) * once + repeated,
+        "low": float(once + repeated),
+        "high": min(scale * once + repeated, max(total_rows, once + repeated)),
+    }
+
+
+def fast_preview(source, cleaner, name=None, rows=PREVIEW_SAMPLE_ROWS, seed=0):
+    # cleaner: raw sample -> cleaned rows, keeping the SAMPLE_ROW_COLUMN column
+    sample, design = sample_upload(source, name, rows, seed)
+    sampled = len(sample)
+    cleaned = cleaner(sample.assign(**{SAMPLE_ROW_COLUMN: np.arange(sampled)}))
+    if SAMPLE_ROW_COLUMN not in cleaned.columns:
+        raise ValueError("The cleaner dropped the sampled row numbers.")
+    positions = cleaned[SAMPLE_ROW_COLUMN].to_numpy(dtype=np.int64)
+    cleaned = cleaned.drop(columns=SAMPLE_ROW_COLUMN)
+    # Per sampled row: how many cleaned rows it became, and their sums
+    rows_out = _interval(np.bincount(positions, minlength=sampled), design)
+
+    totals = {}
+    for col in PREVIEW_TOTAL_COLUMNS:
+        if col in cleaned.columns:
+            amounts = pd.to_numeric(cleaned[col], errors="coerce").fillna(0)
+            values = np.bincount(
+                positions, weights=amounts.to_numpy(dtype=float), minlength=sampled
+            )
+            totals[col] = _interval(values, design)
+    distinct = {
+        col: estimate_distinct(
+            cleaned[col],
+            rows_out["estimate"] * cleaned[col].notna().mean(),
+        )
+        for col in PREVIEW_DISTINCT_COLUMNS
+        if col in cleaned.columns and len(cleaned)
+    }
+    return {
+        "sampled_rows": sampled,
+        "cleaned": cleaned,
+        "rows_in": _interval(np.ones(sampled), design),
+        "rows_out": rows_out,
+        "totals": totals,
+        "distinct": distinct,
+    }
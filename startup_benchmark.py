@@ -0,0 +1,75 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# --- Start-up and rerun timing ---
+# Each measurement runs in a fresh interpreter, so module caches are cold:
+#     python startup_benchmark.py --repeat 5
+
+HEAVY_MODULES = ("matplotlib", "fpdf", "requests", "openpyxl")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import non_profit, job_queue, charts, exporter, history_store, text_loader
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy_loaded": heavy}}))
+"""
+
+APP_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("streamlit_app.py", default_timeout=120)
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+reruns = []
+for _ in range(5):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": first, "rerun": min(reruns), "heavy_loaded": heavy}}))
+"""
+
+
+def _probe(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code.format(heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(repeat=3):
+    results = {}
+    for name, code in (("library import", IMPORT_PROBE), ("app first run", APP_PROBE)):
+        runs = [_probe(code) for _ in range(repeat)]
+        results[name] = {
+            "median_ms": round(statistics.median(r["seconds"] for r in runs) * 1000),
+            "heavy_loaded": runs[-1]["heavy_loaded"],
+        }
+        if "rerun" in runs[0]:
+            results["app rerun"] = {
+                "median_ms": round(statistics.median(r["rerun"] for r in runs) * 1000),
+                "heavy_loaded": runs[-1]["heavy_loaded"],
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time app start-up and reruns.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for name, result in measure(args.repeat).items():
+        heavy = ", ".join(result["heavy_loaded"]) or "none"
+        print(f"{name:>15}: {result['median_ms']:>6} ms  heavy modules loaded: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
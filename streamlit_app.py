@@ -35,26 +35,64 @@ PREVIEW_LIMIT = 10
 
 # --- Core App Variables ---
 import pandas as pd
-import matplotlib.pyplot as plt
 import io
-from fpdf import FPDF
+import os
+import tempfile
+import time
+from functools import lru_cache
 
 from non_profit import (
-    clean_donations,
-    clean_volunteers,
     generate_hygiene_report,
-    generate_donation_summary,
     generate_volunteer_summary,
     merge_donor_volunteer_data,
     create_pdf_report,
-    push_to_salesforce,
     safe_clean_dataframe,
-    push_to_salesforce,
     safe_clean_dataframe,
-    clean_data,
     load_and_clean_structured_sales,
     load_and_clean_dataframe,
     debug_invoice_file,
+    ROUTE_DONATION,
+    ROUTE_VOLUNTEER,
+    is_mixed_layout,
+    route_rows,
+)
+from job_queue import (
+    JobQueue,
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    clean_job,
+    clean_file_job,
+    clean_and_summarize_job,
+    cohort_job,
+    diff_job,
+    sync_job,
+)
+from history_store import (
+    open_history_store,
+    append_cleaned_batch,
+    query_campaigns,
+    query_donation_date_range,
+    query_donation_summary,
+    query_volunteer_summary,
+)
+from pagination import DEFAULT_PAGE_SIZE, page_count, page_slice, sort_positions
+from exporter import EXPORT_FORMATS, export_callable
+from text_loader import read_text_file
+from sync_state import DEFAULT_SYNC_STATE_PATH
+from cohorts import cohort_summary
+from row_diff import default_key_columns, diff_summary
+from joins import estimate_bytes
+from memory_governor import MemoryBudgetExceeded, plan_upload
+from sampling import FAST_PREVIEW_MIN_BYTES, fast_preview
+from charts import CHART_TYPES, aggregate_totals, render_chart
+from org_profiles import (
+    DEFAULT_PROFILE_DIR,
+    PROFILE_KINDS,
+    apply_profile,
+    delete_profile,
+    find_profile,
+    save_profile,
 )
 
 df_std = None
@@ -91,6 +129,7 @@ with status_col2:
 st.sidebar.markdown("## 🔗 CRM Integration (Optional)")
 
 enable_crm = st.sidebar.checkbox("Enable Salesforce Sync", value=False)
+selected_object = "Opportunity"
 
 if enable_crm:
     st.sidebar.success("📡 CRM Sync Enabled")
@@ -112,6 +151,14 @@ if enable_crm:
 
     if salesforce_token:
         st.session_state["sf_token"] = salesforce_token
+    instance_url = st.sidebar.text_input(
+        "🌐 Salesforce Instance URL",
+        value=os.environ.get("SALESFORCE_INSTANCE_URL", ""),
+        placeholder="https://yourorg.my.salesforce.com",
+        key="salesforce_instance_url_input",
+    )
+    if instance_url:
+        st.session_state["sf_instance_url"] = instance_url.strip()
     # --- R Markdown Support ---
     st.sidebar.markdown("## 📄 R Markdown Report")
     st.sidebar.markdown(
@@ -125,6 +172,210 @@ if enable_crm:
         "No R experience needed—perfect for grant writers and CRM assistants."
     )
 
+# --- Local History Store ---
+st.sidebar.markdown("## 🗄️ Cleaned History")
+save_history = st.sidebar.checkbox(
+    "Save cleaned batches to local history",
+    value=False,
+    key="save_history",
+    help="Saving a file with the same name again replaces its earlier batch.",
+)
+
+
+@st.cache_resource
+def get_history_store():
+    return open_history_store()
+
+
+# --- Background Jobs (shared by every session on this server) ---
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+
+def run_background_job(job_key, label, fn, *args, start=True, **kwargs):
+    queue = get_job_queue()
+    job_id = st.session_state.get(job_key)
+    if isinstance(job_id, dict):
+        # Finished: the result is kept by this session, not the shared queue
+        return job_id["result"]
+
+    if job_id is None or job_id not in queue:
+        if not start:
+            return None
+        job_id = queue.submit(fn, *args, label=label, **kwargs)
+        st.session_state[job_key] = job_id
+
+    status = queue.status(job_id)
+
+    if status["state"] == JOB_DONE:
+        st.session_state[job_key] = {"result": queue.pop_result(job_id)}
+        return st.session_state[job_key]["result"]
+
+    if status["state"] == JOB_CANCELLED:
+        st.warning(f"✋ {label} was cancelled.")
+        if st.button("🔁 Run again", key=f"retry_{job_key}"):
+            queue.forget(job_id)
+            del st.session_state[job_key]
+            st.rerun()
+        st.stop()
+
+    if status["state"] == JOB_FAILED:
+        queue.forget(job_id)
+        del st.session_state[job_key]
+        raise RuntimeError(status["error"])
+
+    # ⏳ Still queued or running: show progress, offer cancel, poll again shortly
+    st.progress(
+        status["progress"], text=f"⏳ {label} — {status['message'] or status['state']}"
+    )
+    if st.button("✋ Cancel", key=f"cancel_{job_key}"):
+        queue.cancel(job_id)
+    time.sleep(0.5)
+    st.rerun()
+
+
+def held_result_bytes():
+    # Collected job results count against this session's memory ceiling
+    held = 0
+    for value in list(st.session_state.values()):
+        if not (isinstance(value, dict) and "result" in value):
+            continue
+        result = value["result"]
+        if isinstance(result, dict):
+            result = result.values()
+        elif not isinstance(result, tuple):
+            result = [result]
+        held += sum(estimate_bytes(r) for r in result if isinstance(r, pd.DataFrame))
+    return held
+
+
+def release_results(file_id):
+    # A new upload (or none) drops the results collected for the previous one
+    if st.session_state.get("results_file_id") == file_id:
+        return
+    for key in [
+        key
+        for key, value in st.session_state.items()
+        if isinstance(value, dict) and "result" in value
+    ]:
+        del st.session_state[key]
+    st.session_state["results_file_id"] = file_id
+
+
+def show_memory_report(cleaned):
+    report = cleaned.attrs.get("memory_report")
+    if report and report["reduction_ratio"]:
+        st.caption(
+            f"🗜️ Compacted in memory: {report['memory_before_bytes'] / 1e6:,.2f} MB → "
+            f"{report['memory_after_bytes'] / 1e6:,.2f} MB "
+            f"({report['reduction_ratio']}× smaller)"
+        )
+
+
+def quarantine_path(file_id, kind):
+    # One rejected-rows file per upload and workflow, written by the job worker
+    return os.path.join(
+        tempfile.gettempdir(), f"data_laundry_quarantine_{file_id}_{kind}.csv"
+    )
+
+
+def spill_path(uploaded_file):
+    # Big uploads are written out once so the job worker can stream them.
+    # They live in a temp dir owned by the session: it is deleted when the
+    # session ends, and only the current upload is kept in it.
+    if "spill_dir" not in st.session_state:
+        st.session_state["spill_dir"] = tempfile.TemporaryDirectory(
+            prefix="data_laundry_uploads_"
+        )
+    spill_dir = st.session_state["spill_dir"].name
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    name = f"upload_{uploaded_file.file_id}{extension}"
+    path = os.path.join(spill_dir, name)
+    if not os.path.exists(path):
+        for old in os.listdir(spill_dir):
+            os.remove(os.path.join(spill_dir, old))
+        with open(path, "wb") as f:
+            f.write(uploaded_file.getbuffer())
+    return path
+
+
+def show_quarantine_download(path, kind):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+
+    def read_rejected():
+        with open(path, "rb") as f:
+            return f.read()
+
+    st.download_button(
+        "🚧 Download Rejected Rows",
+        read_rejected,
+        file_name=f"rejected_{kind}.csv",
+        mime="text/csv",
+        key=f"download_{kind}_rejected",
+        help="Rows removed during cleaning, with their original row number and reason",
+    )
+
+
+EXPORT_CHOICES = {
+    "CSV": "csv",
+    "CSV (gzip)": "csv.gz",
+    "ZIP": "zip",
+    "Excel (.xlsx)": "xlsx",
+}
+
+
+def export_download(df, label, base_name, dataset_key, key):
+    # The file is only written when the button is clicked, then reused
+    # for every later click on the same rows and format
+    fmt = EXPORT_CHOICES[
+        st.selectbox("File format", list(EXPORT_CHOICES), key=f"{key}_format")
+    ]
+    st.download_button(
+        label,
+        export_callable(df, fmt, dataset_key),
+        file_name=base_name + EXPORT_FORMATS[fmt]["extension"],
+        mime=EXPORT_FORMATS[fmt]["mime"],
+        key=key,
+    )
+
+
+def paginated_preview(df, key, page_size=DEFAULT_PAGE_SIZE):
+    # Only the visible page is sent to the browser, however big the frame is
+    total = len(df)
+    pages = page_count(total, page_size)
+    page_key = f"{key}_page"
+    # The widget is driven by its key alone; passing value= as well warns
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+
+    sort_col, desc_col, page_col = st.columns([2, 1, 1])
+    sort_by = sort_col.selectbox(
+        "Sort by", ["(file order)"] + list(df.columns), key=f"{key}_sort"
+    )
+    descending = desc_col.checkbox("Descending", key=f"{key}_desc")
+    page = page_col.number_input(
+        "Page", min_value=1, max_value=pages, step=1, key=page_key
+    )
+
+    positions = None
+    if sort_by != "(file order)":
+        positions = sort_positions(df, sort_by, descending, cache_key=key)
+    st.dataframe(page_slice(df, page - 1, page_size, positions))
+    start = (page - 1) * page_size
+    st.caption(
+        f"Rows {min(start + 1, total):,}–{min(start + page_size, total):,} "
+        f"of {total:,} · page {page:,} of {pages:,}"
+    )
+
+
+def show_preview(df, key, is_pro_user):
+    if is_pro_user:
+        paginated_preview(df, key)
+    else:
+        st.dataframe(df.head(PREVIEW_LIMIT))
+
+
 # --- Upgrade Call-to-Action (shown only if not Pro) ---
 if not is_pro_user:
     st.info(
@@ -136,187 +387,192 @@ if not is_pro_user:
         )
 
 
-def render_volunteer_view(cleaned_volunteers, is_pro_user, preview_limit=10):
-    if cleaned_volunteers.empty:
-        st.warning("⚠️ No valid volunteer data available for preview.")
-        return
-
-    st.subheader("🧼 Cleaned Volunteer Data Preview")
-    if is_pro_user:
-        st.dataframe(cleaned_volunteers)
-    else:
-        st.dataframe(cleaned_volunteers.head(preview_limit))
-
-
-def guess_columns(df):
-    expected = {
-        "id": [
-            "id",
-            "identifier",
-            "unique_id",
-            "case_number",
-            "client_id",
-            "volunteer_id",
-            "donor_id",
-            "supporter_id",
-            "client_identifier",
-        ],
-        "name": [
-            "name",
-            "person" "volunteer",
-            "full_name",
-            "identity",
-            "donor_name",
-            "supporter",
-            "id",
-            "unique_id",
-            "volunteer_name",
-            "volunteer_full_name",
-            "volunteer_identity",
-            "volunteer_person",
-            "volunteer_full_name",
-            "volunteer_identity",
-            "volunteer_person",
-        ],
-        "donor_name": [
-            "donor",
-            "supporter",
-            "giver",
-            "contributor",
-            "donation_name",
-        ],
-        "amount": [
-            "amount",
-            "donation",
-            "gift",
-            "contribution",
-            "value",
-            "price",
-            "donation_amount",
-            "donation_value",
-            "donation_total",
-            "totals",
-        ],
-        "hours": [
-            "hours",
-            "time",
-            "duration",
-            "logged",
-            "length",
-            "volunteer_hours",
-            "time_spent",
-            "volunteer_time",
-            "volunteer_duration",
-        ],
-        "department": [
-            "department",
-            "program",
-            "campaign",
-            "ministry",
-            "area",
-            "track",
-            "initiative",
-            "project",
-            "service_area",
-            "service_department",
-            "service_program",
-            "church",
-            "organization",
-            "nonprofit",
-            "nonprofit_name",
-            "organization_name",
-            "nonprofit_department",
-            "nonprofit_program",
-            "nonprofit_campaign",
-            "nonprofit_ministry",
-            "nonprofit_area",
-            "nonprofit_track",
-            "nonprofit_initiative",
-            "nonprofit_project",
-            "nonprofit_service_area",
-            "nonprofit_service_department",
-            "nonprofit_service_program",
-            "nonprofit_service_campaign",
-        ],
-        "campaign": [
-            "campaign",
-            "initiative",
-            "project",
-            "program",
-            "funding_program",
-            "funding_initiative",
-            "fundraiser",
-            "event",
-            "funding",
-            "funding_campaign",
-            "funding_initiative",
-            "funding_project",
-            "funding_event",
-            "funding_fundraiser",
-            "funding_source",
-            "category",
-            "subcategory",
-            "fund",
-            "funding_source",
-            "funding_source_name",
-            "funding_source_type",
-            "funding_source_category",
-            "funding_source_subcategory",
-            "funding_source_project",
-            "funding_source_initiative",
-            "funding_source_event",
-        ],
-        "date": ["date", "timestamp", "donation_date", "served"],
-        "client_id": ["id", "case_number", "client_identifier"],
-        "service_type": ["program", "track", "service"],
-        "contact": ["email", "phone", "contact_info"],
-        "gender": [
-            "gender",
-            "sex",
-            "identity",
-            "gender_identity",
-            "prefix",
-            "pronouns",
-            "Mr",
-            "Mrs",
-            "Ms",
-            "Mx",
-            "Dr",
-            "male",
-            "female",
-            "non_binary",
-            "genderqueer",
-            "genderfluid",
-            "agender",
-            "bigender",
-            "two_spirit",
-        ],
-        "ethnicity": ["race", "ethnicity", "background"],
-        "notes": ["notes", "remarks", "comments"],
-        "location": ["location", "address", "site"],
-        "age": ["age", "years", "birth_year"],
-        "status": ["status", "case_status", "volunteer_status"],
-        "volunteer_status": ["volunteer_status", "engagement", "participation"],
-        "service_date": [
-            "service_date",
-            "visit_date",
-            "appointment_date",
-            "project_date",
-        ],
-    }
+# --- Column guessing ---
+# The alias table is built once at import; guesses are cached per header set,
+# since the same upload is guessed again on every rerun
+COLUMN_ALIASES = {
+    "id": [
+        "id",
+        "identifier",
+        "unique_id",
+        "case_number",
+        "client_id",
+        "volunteer_id",
+        "donor_id",
+        "supporter_id",
+        "client_identifier",
+    ],
+    "name": [
+        "name",
+        "person" "volunteer",
+        "full_name",
+        "identity",
+        "donor_name",
+        "supporter",
+        "id",
+        "unique_id",
+        "volunteer_name",
+        "volunteer_full_name",
+        "volunteer_identity",
+        "volunteer_person",
+        "volunteer_full_name",
+        "volunteer_identity",
+        "volunteer_person",
+    ],
+    "donor_name": [
+        "donor",
+        "supporter",
+        "giver",
+        "contributor",
+        "donation_name",
+    ],
+    "amount": [
+        "amount",
+        "donation",
+        "gift",
+        "contribution",
+        "value",
+        "price",
+        "donation_amount",
+        "donation_value",
+        "donation_total",
+        "totals",
+    ],
+    "hours": [
+        "hours",
+        "time",
+        "duration",
+        "logged",
+        "length",
+        "volunteer_hours",
+        "time_spent",
+        "volunteer_time",
+        "volunteer_duration",
+    ],
+    "department": [
+        "department",
+        "program",
+        "campaign",
+        "ministry",
+        "area",
+        "track",
+        "initiative",
+        "project",
+        "service_area",
+        "service_department",
+        "service_program",
+        "church",
+        "organization",
+        "nonprofit",
+        "nonprofit_name",
+        "organization_name",
+        "nonprofit_department",
+        "nonprofit_program",
+        "nonprofit_campaign",
+        "nonprofit_ministry",
+        "nonprofit_area",
+        "nonprofit_track",
+        "nonprofit_initiative",
+        "nonprofit_project",
+        "nonprofit_service_area",
+        "nonprofit_service_department",
+        "nonprofit_service_program",
+        "nonprofit_service_campaign",
+    ],
+    "campaign": [
+        "campaign",
+        "initiative",
+        "project",
+        "program",
+        "funding_program",
+        "funding_initiative",
+        "fundraiser",
+        "event",
+        "funding",
+        "funding_campaign",
+        "funding_initiative",
+        "funding_project",
+        "funding_event",
+        "funding_fundraiser",
+        "funding_source",
+        "category",
+        "subcategory",
+        "fund",
+        "funding_source",
+        "funding_source_name",
+        "funding_source_type",
+        "funding_source_category",
+        "funding_source_subcategory",
+        "funding_source_project",
+        "funding_source_initiative",
+        "funding_source_event",
+    ],
+    "date": ["date", "timestamp", "donation_date", "served"],
+    "client_id": ["id", "case_number", "client_identifier"],
+    "service_type": ["program", "track", "service"],
+    "contact": ["email", "phone", "contact_info"],
+    "gender": [
+        "gender",
+        "sex",
+        "identity",
+        "gender_identity",
+        "prefix",
+        "pronouns",
+        "Mr",
+        "Mrs",
+        "Ms",
+        "Mx",
+        "Dr",
+        "male",
+        "female",
+        "non_binary",
+        "genderqueer",
+        "genderfluid",
+        "agender",
+        "bigender",
+        "two_spirit",
+    ],
+    "ethnicity": ["race", "ethnicity", "background"],
+    "notes": ["notes", "remarks", "comments"],
+    "location": ["location", "address", "site"],
+    "age": ["age", "years", "birth_year"],
+    "status": ["status", "case_status", "volunteer_status"],
+    "volunteer_status": ["volunteer_status", "engagement", "participation"],
+    "service_date": [
+        "service_date",
+        "visit_date",
+        "appointment_date",
+        "project_date",
+    ],
+}
+# Repeated aliases only cost time in the substring scan
+COLUMN_ALIASES = {
+    key: tuple(dict.fromkeys(aliases)) for key, aliases in COLUMN_ALIASES.items()
+}
+
+
+@lru_cache(maxsize=32)
+def _guess_for_headers(headers):
     result = {}
-    for key, aliases in expected.items():
-        for col in df.columns:
-            if any(alias in col.lower() for alias in aliases):
+    lowered = [(col, str(col).lower()) for col in headers]
+    for key, aliases in COLUMN_ALIASES.items():
+        for col, lower in lowered:
+            if any(alias in lower for alias in aliases):
                 result[key] = col
                 break
     return result
 
 
+def guess_columns(df):
+    return dict(_guess_for_headers(tuple(df.columns)))
+
+
 def decode_file(uploaded_file):
     try:
         if uploaded_file.name.endswith(".csv"):
             return pd.read_csv(uploaded_file)
+        elif uploaded_file.name.endswith(".txt"):
+            return read_text_file(uploaded_file)
         elif uploaded_file.name.endswith((".xls", ".xlsx")):
             return pd.read_excel(uploaded_file)
         else:
@@ -330,12 +586,12 @@ def decode_file(uploaded_file):
 # Sidebar branding
 with st.sidebar:
     st.markdown("## 🧼 File Types")
-    st.markdown("- CSV (.csv)\n- Excel (.xlsx)")
+    st.markdown(
+        "- CSV (.csv)\n- Excel (.xlsx)\n- Text (.txt, delimited or fixed-width)"
+    )
     st.sidebar.markdown("## 🧪 Coming Soon")
 
-    st.sidebar.markdown(
-        "- PDF/Scanner cleanup\n- Multi-file merge\n- Saved org profiles"
-    )
+    st.sidebar.markdown("- PDF/Scanner cleanup\n- Multi-file merge")
 
     st.sidebar.markdown("## 🏢 Who Uses This?")
     st.sidebar.markdown(
@@ -377,11 +633,14 @@ with st.sidebar.expander("📄 R Markdown & Sample Output"):
 st.title("🧺 Data_Laundry: Mission to Clean")
 
 
-def run_column_mapper(df):
+def run_column_mapper(df, org_profile=None):
     import streamlit as st
 
     if df is None:
         raise ValueError("run_column_mapper received None instead of a DataFrame.")
+    # 🏢 A saved profile for this exact header set skips guessing entirely
+    if org_profile is not None:
+        return apply_profile(df, org_profile)
     return df.copy()
 
     # Remove duplicate columns
@@ -421,6 +680,64 @@ def run_column_mapper(df):
         return None
 
 
+PROFILE_FIELDS = [
+    "donor_name",
+    "amount",
+    "date",
+    "campaign",
+    "method",
+    "name",
+    "department",
+    "phone",
+    "hours",
+]
+
+
+def render_org_profile_sidebar(df, org_profile):
+    st.sidebar.markdown("## 🏢 Org Profile")
+    if org_profile is not None:
+        st.sidebar.success(f"Using saved profile: {org_profile['name']}")
+        st.sidebar.caption(
+            f"Saved {org_profile['saved_at']} · "
+            f"{len(org_profile['mapping'])} mapped column(s) · "
+            f"workflow: {org_profile['kind']}"
+        )
+        if st.sidebar.button("🗑️ Forget this profile", key="forget_org_profile"):
+            delete_profile(DEFAULT_PROFILE_DIR, org_profile["signature"])
+            st.rerun()
+        return
+
+    with st.sidebar.expander("💾 Save this layout as an org profile"):
+        st.caption(
+            "Next time a file with these exact headers is uploaded, "
+            "this mapping is applied automatically."
+        )
+        org_name = st.text_input("Organization name", key="org_profile_org_name")
+        guesses = guess_columns(df)
+        options = ["—"] + list(df.columns)
+        chosen = {}
+        for field in PROFILE_FIELDS:
+            guess = guesses.get(field, field)
+            chosen[field] = st.selectbox(
+                f"Column for `{field}`",
+                options,
+                index=options.index(guess) if guess in options else 0,
+                key=f"org_profile_field_{field}",
+            )
+        kind = st.selectbox("Cleaning workflow", PROFILE_KINDS, key="org_profile_kind")
+
+        picked = [col for col in chosen.values() if col != "—"]
+        duplicates = sorted({col for col in picked if picked.count(col) > 1})
+        if duplicates:
+            st.warning(f"⚠️ Each column can map to one field only: {duplicates}")
+        if st.button(
+            "💾 Save Profile", key="save_org_profile", disabled=bool(duplicates)
+        ):
+            mapping = {col: field for field, col in chosen.items() if col != "—"}
+            save_profile(DEFAULT_PROFILE_DIR, df.columns, org_name, mapping, kind)
+            st.rerun()
+
+
 def detect_workflow(df_std):
     donation_required = {"amount", "date"}
     donation_optional = {"campaign", "donor_name", "method"}
@@ -436,46 +753,169 @@ def detect_workflow(df_std):
 
 
 def missing_value_report(df, key_fields=None):
+    # One isna() pass over the whole frame instead of one per column
     total = len(df)
-    missing_report = {}
+    missing = df.isna().sum()
+    key_fields = set(key_fields or [])
+
+    return {
+        col: {
+            "missing_rows": int(count),
+            "percent_missing": f"{(count / total) * 100:.1f}%",
+            "important": col in key_fields,
+        }
+        for col, count in missing[missing > 0].items()
+    }
+
+
+def preview_cleaner(sample):
+    # The sample is mapped and cleaned exactly as a full upload would be
+    profile = find_profile(DEFAULT_PROFILE_DIR, sample.columns)
+    return clean_job(
+        run_column_mapper(sample, profile), profile["kind"] if profile else "auto"
+    )
+
 
-    for col in df.columns:
-        missing = df[col].isna().sum()
-        if missing > 0:
-            pct = (missing / total) * 100
-            critical = col in key_fields if key_fields else False
-            missing_report[col] = {
-                "missing_rows": missing,
-                "percent_missing": f"{pct:.1f}%",
-                "important": critical,
-            }
+def estimate_metric(column, label, entry, prefix=""):
+    column.metric(
+        label,
+        f"~{prefix}{entry['estimate']:,.0f}",
+        help=f"Range: {prefix}{entry['low']:,.0f} – {prefix}{entry['high']:,.0f}",
+    )
+
+
+def show_fast_preview(uploaded_file, is_pro_user):
+    # ⚡ Cleans a random sample only; None when the file can't be sampled
+    cache_key = f"fast_preview_{uploaded_file.file_id}"
+    if cache_key not in st.session_state:
+        try:
+            st.session_state[cache_key] = fast_preview(uploaded_file, preview_cleaner)
+        except ValueError as e:
+            st.caption(f"⚡ No fast preview for this file: {e}")
+            return None
+    preview = st.session_state[cache_key]
 
-    return missing_report
+    st.subheader("⚡ Fast Preview")
+    st.caption(
+        f"Cleaned from {preview['sampled_rows']:,} rows sampled across the whole "
+        "file. Figures are estimates; hover for the 95% range (distinct counts: "
+        "the possible range)."
+    )
+    estimates = [("🧾 Clean rows", preview["rows_out"], "")]
+    if "amount" in preview["totals"]:
+        estimates.append(("💵 Total Donations", preview["totals"]["amount"], "$"))
+    if "hours" in preview["totals"]:
+        estimates.append(("⏱️ Total Hours", preview["totals"]["hours"], ""))
+    if "donor_name" in preview["distinct"]:
+        estimates.append(("🙋 Donors", preview["distinct"]["donor_name"], ""))
+    if "name" in preview["distinct"]:
+        estimates.append(("🙋 Volunteers", preview["distinct"]["name"], ""))
+    for column, (label, entry, prefix) in zip(st.columns(len(estimates)), estimates):
+        estimate_metric(column, label, entry, prefix)
+    show_preview(
+        preview["cleaned"], f"fast_preview_{uploaded_file.file_id}", is_pro_user
+    )
+    return preview
 
 
 # --- Upload & Safeguard ---
 # --- Upload & Safeguard ---
 # --- File Upload and Column Mapping ---
-uploaded_file = st.file_uploader("Upload your CSV or Excel file", type=["csv", "xlsx"])
+uploaded_file = st.file_uploader(
+    "Upload your CSV, Excel or text file", type=["csv", "xlsx", "txt"]
+)
 
 df_std = None
 cleaned_df = None
+upload_key = None
+memory_plan = {"chunk_rows": None}
 is_donation = False
 is_volunteer = False
 
+release_results(uploaded_file.file_id if uploaded_file else None)
+
 if uploaded_file:
     filename = uploaded_file.name.lower()
 
     try:
-        # 🔄 Load CSV or Excel file
-        df = (
-            pd.read_csv(uploaded_file)
-            if filename.endswith(".csv")
-            else pd.read_excel(uploaded_file)
-        )
+        # 🐘 Memory governor: in-memory, chunked or streamed from disk
+        # Planned once per upload, so free-RAM swings can't flip modes on rerun
+        plan_key = f"memory_plan_{uploaded_file.file_id}"
+        try:
+            if plan_key not in st.session_state:
+                st.session_state[plan_key] = plan_upload(
+                    uploaded_file, held_bytes=held_result_bytes()
+                )
+            memory_plan = st.session_state[plan_key]
+        except MemoryBudgetExceeded as e:
+            st.error(f"🐘 {e}")
+            st.stop()
+        # ⚡ Big CSV/text files open on a sampled preview; the full clean
+        # waits until it is asked for
+        full_clean_key = f"full_clean_{uploaded_file.file_id}"
+        if (
+            memory_plan["rows"] is not None
+            and memory_plan["file_bytes"] > FAST_PREVIEW_MIN_BYTES
+            and not st.session_state.get(full_clean_key)
+        ):
+            if show_fast_preview(uploaded_file, is_pro_user) is not None:
+                if st.button("🧼 Clean the Full File", key="clean_full_file"):
+                    st.session_state[full_clean_key] = True
+                    st.rerun()
+                st.stop()
+
+        budget_mb = memory_plan["budget_bytes"] / 2**20
+        if memory_plan["mode"] == "spill":
+            st.warning(
+                f"🐘 Large file (~{memory_plan['rows']:,} rows): streamed from disk "
+                f"in chunks of {memory_plan['chunk_rows']:,} rows to stay within "
+                f"{budget_mb:,.0f} MB. Only the auto-cleaned result is shown."
+            )
+            cleaned_df = run_background_job(
+                f"clean_{uploaded_file.file_id}",
+                "Cleaning large upload",
+                clean_file_job,
+                spill_path(uploaded_file),
+                memory_plan,
+            )
+            st.success("✅ File streamed and auto-cleaned.")
+            show_memory_report(cleaned_df)
+            show_preview(
+                cleaned_df, f"spill_preview_{uploaded_file.file_id}", is_pro_user
+            )
+            if is_pro_user:
+                export_download(
+                    cleaned_df,
+                    "⬇ Download Full Cleaned File",
+                    "cleaned_data",
+                    f"spill_{uploaded_file.file_id}",
+                    key="download_spill_full",
+                )
+            st.stop()
+        if memory_plan["mode"] == "chunked":
+            st.caption(
+                f"🧮 Cleaning in chunks of {memory_plan['chunk_rows']:,} rows to "
+                f"stay within {budget_mb:,.0f} MB."
+            )
+
+        # 🔄 Load CSV, Excel or text (delimited / fixed-width) file
+        if filename.endswith(".csv"):
+            df = pd.read_csv(uploaded_file)
+        elif filename.endswith(".txt"):
+            df = read_text_file(uploaded_file)
+        else:
+            df = pd.read_excel(uploaded_file)
+
+        # 🏢 Known layout? Saved profiles are keyed by the header set
+        org_profile = find_profile(DEFAULT_PROFILE_DIR, df.columns)
+        render_org_profile_sidebar(df, org_profile)
+        # Cached results follow the profile, so re-saving it re-cleans the file
+        upload_key = uploaded_file.file_id
+        if org_profile is not None:
+            upload_key = f"{uploaded_file.file_id}_{org_profile['version']}"
 
         # 🔁 Auto-map known donation/volunteer columns
-        df_std = run_column_mapper(df)
+        df_std = run_column_mapper(df, org_profile)
 
         if df_std is None or df_std.empty:
             st.error(
@@ -484,7 +924,14 @@ if uploaded_file:
             st.stop()
 
         # 🧼 Clean mapped data
-        cleaned_df = clean_data(df_std)
+        cleaned_df = run_background_job(
+            f"clean_{upload_key}",
+            "Cleaning upload",
+            clean_job,
+            df_std,
+            org_profile["kind"] if org_profile else "auto",
+            chunk_rows=memory_plan["chunk_rows"],
+        )
 
         if cleaned_df is None or cleaned_df.empty:
             st.error(
@@ -493,6 +940,7 @@ if uploaded_file:
             st.stop()
 
         st.success("✅ File uploaded and auto-cleaned.")
+        show_memory_report(cleaned_df)
         st.dataframe(cleaned_df.head())
 
         filtered = cleaned_df
@@ -519,6 +967,13 @@ if uploaded_file:
         st.write("🧠 Refined donation fields:", donation_matches)
         st.write("🧠 Refined volunteer fields:", volunteer_matches)
         st.write("🔍 Final is_donation:", is_donation, " | is_volunteer:", is_volunteer)
+        if is_donation and is_volunteer and is_mixed_layout(df_std):
+            routes = route_rows(df_std)
+            st.caption(
+                f"🔀 Mixed file: {int(((routes & ROUTE_DONATION) != 0).sum()):,} rows "
+                f"go to donations, {int(((routes & ROUTE_VOLUNTEER) != 0).sum()):,} "
+                "to volunteers."
+            )
 
     except Exception as e:
         st.error(f"❌ Unexpected error during upload or processing: {e}")
@@ -527,6 +982,100 @@ if uploaded_file:
 else:
     st.info("📂 Please upload a file to begin.")
 
+# --- Compare Uploads ---
+if cleaned_df is not None:
+    with st.expander("🔀 Compare with a previous upload"):
+        previous_file = st.file_uploader(
+            "Upload the earlier version of this file",
+            type=["csv", "xlsx", "txt"],
+            key="compare_upload",
+        )
+        previous_raw = None
+        previous_plan = {"chunk_rows": None}
+        if previous_file:
+            # 🐘 The earlier file is cleaned in its own job, planned in what the
+            # current upload leaves of the session's budget
+            plan_key = f"memory_plan_{previous_file.file_id}"
+            try:
+                if plan_key not in st.session_state:
+                    held = held_result_bytes() + estimate_bytes(df)
+                    held += estimate_bytes(df_std)
+                    st.session_state[plan_key] = plan_upload(
+                        previous_file, held_bytes=held
+                    )
+                previous_plan = st.session_state[plan_key]
+            except MemoryBudgetExceeded as e:
+                st.error(f"🐘 {e}")
+            else:
+                if previous_plan["mode"] == "spill":
+                    st.error("🐘 The earlier file is too large to compare in memory.")
+                else:
+                    previous_raw = decode_file(previous_file)
+        if previous_raw is not None:
+            try:
+                previous_profile = find_profile(
+                    DEFAULT_PROFILE_DIR, previous_raw.columns
+                )
+                previous = run_background_job(
+                    f"clean_{previous_file.file_id}",
+                    "Cleaning previous upload",
+                    clean_job,
+                    run_column_mapper(previous_raw, previous_profile),
+                    previous_profile["kind"] if previous_profile else "auto",
+                    chunk_rows=previous_plan["chunk_rows"],
+                )
+                shared = [col for col in cleaned_df.columns if col in previous.columns]
+                key_columns = st.multiselect(
+                    "Columns that identify a row",
+                    shared,
+                    default=[
+                        col for col in default_key_columns(cleaned_df) if col in shared
+                    ],
+                    key="compare_keys",
+                )
+                if key_columns:
+                    diff = run_background_job(
+                        f"diff_{upload_key}_{previous_file.file_id}_"
+                        + "|".join(key_columns),
+                        "Comparing uploads",
+                        diff_job,
+                        previous,
+                        cleaned_df,
+                        key_columns,
+                    )
+                    counts = diff_summary(diff)
+                    labels = ["🆕 Added", "🗑️ Removed", "✏️ Changed", "✅ Unchanged"]
+                    for column, label, count in zip(
+                        st.columns(4), labels, counts.values()
+                    ):
+                        column.metric(label, f"{count:,}")
+                    added_tab, removed_tab, changed_tab = st.tabs(
+                        ["Added", "Removed", "Changed"]
+                    )
+                    with added_tab:
+                        show_preview(
+                            diff["added"], f"compare_added_{upload_key}", is_pro_user
+                        )
+                    with removed_tab:
+                        show_preview(
+                            diff["removed"],
+                            f"compare_removed_{upload_key}",
+                            is_pro_user,
+                        )
+                    with changed_tab:
+                        st.caption("New values; `changed_columns` lists what differs.")
+                        show_preview(
+                            diff["changed"],
+                            f"compare_changed_{upload_key}",
+                            is_pro_user,
+                        )
+                        st.caption("The same rows as they were before:")
+                        st.dataframe(diff["changed_before"].head(PREVIEW_LIMIT))
+                else:
+                    st.info("Pick at least one column that identifies a row.")
+            except Exception as e:
+                st.error(f"❌ Compare failed: {e}")
+
 # --- Donation View ---
 if is_donation:
     st.header("💵 Donation Data")
@@ -536,7 +1085,15 @@ if is_donation:
         == "Clean & Summarize"
     ):
         try:
-            cleaned_donations = clean_donations(df_std)
+            cleaned_donations, donation_summary = run_background_job(
+                f"donations_{upload_key}",
+                "Cleaning donations",
+                clean_and_summarize_job,
+                df_std,
+                "donations",
+                quarantine_path=quarantine_path(upload_key, "donations"),
+                chunk_rows=memory_plan["chunk_rows"],
+            )
 
             # Filter by selected date range
             if (
@@ -557,9 +1114,8 @@ if is_donation:
                 st.warning("⚠️ Missing or invalid date column — skipping filter.")
                 filtered = cleaned_donations
 
-            preview = filtered if is_pro_user else filtered.head(PREVIEW_LIMIT)
             st.subheader("📋 Donation Preview")
-            st.dataframe(preview)
+            show_preview(filtered, f"donations_preview_{upload_key}", is_pro_user)
 
             st.metric("💵 Total Donations", f"${filtered['amount'].sum():,.2f}")
             st.metric("🙋 Donors", filtered["donor_name"].nunique())
@@ -583,40 +1139,63 @@ if is_donation:
                 and filtered["amount"].notna().sum() > 0
             ):
                 chart_type = st.selectbox(
-                    "Chart Type", ["Bar", "Line", "Pie"], key="donation_chart"
+                    "Chart Type", CHART_TYPES, key="donation_chart"
+                )
+                # The job already totalled every campaign; regroup only when filtered
+                if len(filtered) == len(cleaned_donations):
+                    chart_data = donation_summary["campaign_totals"]
+                else:
+                    chart_data = aggregate_totals(filtered, "campaign", "amount")
+                st.image(
+                    render_chart(
+                        chart_data, chart_type, "Donations by Campaign", color="#4d4dff"
+                    )
                 )
-                chart_data = filtered.groupby("campaign")["amount"].sum().sort_values()
-                fig, ax = plt.subplots()
-
-                if chart_type == "Bar":
-                    chart_data.plot(kind="barh", ax=ax, color="#4d4dff")
-                elif chart_type == "Line":
-                    chart_data.plot(kind="line", ax=ax, marker="o", color="#4d4dff")
-                elif chart_type == "Pie":
-                    chart_data.plot(kind="pie", ax=ax, autopct="%.1f%%", startangle=90)
-                    ax.set_ylabel("")
-
-                ax.set_title("Donations by Campaign")
-                st.pyplot(fig)
             else:
                 st.info(
                     "📉 Chart skipped — missing or empty 'amount' or 'campaign' data."
                 )
 
+            if save_history:
+                _, inserted = append_cleaned_batch(
+                    get_history_store(),
+                    cleaned_donations,
+                    "donations",
+                    source_name=uploaded_file.name,
+                )
+                if inserted:
+                    st.success("🗄️ Donations saved to local history.")
+
             st.subheader("⬇️ Download Cleaned Donations")
+            show_quarantine_download(
+                quarantine_path(upload_key, "donations"), "donations"
+            )
             if is_pro_user:
 
-                st.download_button(
-                    label="⬇ Download Full Cleaned File",
-                    data=filtered.to_csv(index=False),
-                    file_name="cleaned_donations.csv",
-                    mime="text/csv",
+                export_download(
+                    filtered,
+                    "⬇ Download Full Cleaned File",
+                    "cleaned_donations",
+                    f"donations_{upload_key}",
                     key="download_donations_full",
                 )
-            if is_pro_user and st.button("🔗 Push to Salesforce (Donations)"):
-                success, message = push_to_salesforce(
-                    filtered, object_type="Opportunity"
-                )
+            sync_key = f"sync_donations_{upload_key}"
+            start_sync = is_pro_user and st.button("🔗 Push to Salesforce (Donations)")
+            if start_sync:
+                st.session_state.pop(sync_key, None)
+            sync_result = run_background_job(
+                sync_key,
+                "Syncing donations",
+                sync_job,
+                filtered,
+                "Opportunity",
+                st.session_state.get("sf_token"),
+                DEFAULT_SYNC_STATE_PATH,
+                st.session_state.get("sf_instance_url"),
+                start=start_sync,
+            )
+            if sync_result:
+                success, message, sync_log = sync_result
                 if success:
                     st.success(f"✅ {message}")
                 else:
@@ -631,12 +1210,59 @@ if is_donation:
                     help="Unlock Pro to download full dataset",
                 )
 
-            try:
-                donation_summary = generate_donation_summary(cleaned_donations)
-                st.subheader("📦 Donation Summary")
-                st.json(donation_summary)
-            except Exception as e:
-                st.error(f"❌ Donation summary failed: {e}")
+            st.subheader("🧽 Hygiene Report")
+            st.json(generate_hygiene_report(df_std, cleaned_donations, "Donations"))
+
+            st.subheader("📦 Donation Summary")
+            st.json(donation_summary)
+
+            # --- Donor retention (whole file, not the date filter) ---
+            st.subheader("🔁 Donor Retention")
+            fiscal_start = st.selectbox(
+                "Fiscal Year Starts",
+                list(range(1, 13)),
+                format_func=lambda m: pd.Timestamp(2000, m, 1).strftime("%B"),
+                key="fiscal_start_month",
+            )
+            cohorts = run_background_job(
+                f"cohorts_{upload_key}_{fiscal_start}",
+                "Building donor cohorts",
+                cohort_job,
+                cleaned_donations,
+                fiscal_start,
+            )
+            retention = cohort_summary(cohorts)
+            col1, col2 = st.columns(2)
+            col1.metric("🕰️ LYBUNT Donors", f"{retention['lybunt_donors']:,}")
+            col2.metric("💤 SYBUNT Donors", f"{retention['sybunt_donors']:,}")
+            st.caption(
+                f"As of {retention['as_of_year']}: LYBUNT gave last year but not "
+                "this year; SYBUNT gave in an earlier year but not since."
+            )
+            st.markdown("**Share of each first-gift cohort giving, by year**")
+            st.dataframe(cohorts["retention_rate"])
+            st.dataframe(cohorts["cohorts"])
+            with st.expander("📋 LYBUNT and SYBUNT Lists"):
+                for label, list_key in (("LYBUNT", "lybunt"), ("SYBUNT", "sybunt")):
+                    donors = cohorts[list_key]
+                    st.markdown(f"**{label}** — {len(donors):,} donors")
+                    st.dataframe(donors if is_pro_user else donors.head(PREVIEW_LIMIT))
+                    if is_pro_user:
+                        st.download_button(
+                            f"⬇ Download {label} List",
+                            donors.to_csv(index=False),
+                            file_name=f"{list_key}_donors.csv",
+                            mime="text/csv",
+                            key=f"download_{list_key}",
+                        )
+
+            st.download_button(
+                "📄 Download PDF Report",
+                lambda: create_pdf_report(donation_summary, None, retention),
+                file_name="donation_report.pdf",
+                mime="application/pdf",
+                key="download_donation_pdf",
+            )
 
         except Exception as e:
             st.error(f"❌ Donations failed: {e}")
@@ -650,9 +1276,19 @@ if is_volunteer:
         == "Clean & Summarize"
     ):
         try:
-            cleaned_volunteers = clean_volunteers(df_std)
+            cleaned_volunteers = run_background_job(
+                f"volunteers_{upload_key}",
+                "Cleaning volunteers",
+                clean_job,
+                df_std,
+                "volunteers",
+                quarantine_path=quarantine_path(upload_key, "volunteers"),
+                chunk_rows=memory_plan["chunk_rows"],
+            )
             st.subheader("📋 Cleaned Volunteer Preview")
-            st.dataframe(cleaned_volunteers.head())
+            show_preview(
+                cleaned_volunteers, f"volunteers_cleaned_{upload_key}", is_pro_user
+            )
 
             # 🧼 Fallback: If 'campaign' is missing but 'dept' exists
             if (
@@ -677,9 +1313,8 @@ if is_volunteer:
                 filtered = cleaned_volunteers
                 st.warning("⚠️ No 'campaign' column found — skipping campaign filter.")
 
-            preview = filtered if is_pro_user else filtered.head(PREVIEW_LIMIT)
             st.subheader("📋 Volunteer Preview")
-            st.dataframe(preview)
+            show_preview(filtered, f"volunteers_preview_{upload_key}", is_pro_user)
 
             st.metric("🙋 Volunteers", filtered["name"].nunique())
             st.metric("⏱️ Total Hours", filtered["hours"].sum())
@@ -698,28 +1333,17 @@ if is_volunteer:
                 and "hours" in filtered.columns
                 and filtered["hours"].notna().sum() > 0
             ):
-                chart = filtered.groupby("campaign")["hours"].sum().sort_values()
-                chart_type = st.selectbox(
-                    "Chart Type", ["Bar", "Line", "Pie"], key="vol_chart"
-                )
-                fig, ax = plt.subplots()
-
-                if chart_type == "Bar":
-                    chart.plot(kind="barh", ax=ax, color="#82d18e")
-                elif chart_type == "Line":
-                    chart.plot(kind="line", ax=ax, marker="o", color="#82d18e")
-                elif chart_type == "Pie":
-                    chart.plot(
-                        kind="pie",
-                        ax=ax,
-                        autopct="%1.1f%%",
-                        startangle=90,
-                        colors=plt.cm.Pastel1.colors,
+                chart = aggregate_totals(filtered, "campaign", "hours")
+                chart_type = st.selectbox("Chart Type", CHART_TYPES, key="vol_chart")
+                st.image(
+                    render_chart(
+                        chart,
+                        chart_type,
+                        "Volunteer Hours by Campaign",
+                        color="#82d18e",
+                        palette="Pastel1",
                     )
-                    ax.set_ylabel("")
-
-                ax.set_title("Volunteer Hours by Campaign")
-                st.pyplot(fig)
+                )
             else:
                 st.info(
                     "📉 Chart skipped — missing or empty 'hours' or 'campaign' data."
@@ -727,10 +1351,23 @@ if is_volunteer:
             if is_pro_user and enable_crm:
                 st.caption(f"🎯 Target CRM Object: `{selected_object}`")
 
-                if st.button("🔄 Push to Salesforce (Volunteers)"):
-                    success, message, sync_log = push_to_salesforce(
-                        filtered, object_type=selected_object
-                    )
+                sync_key = f"sync_volunteers_{upload_key}"
+                start_sync = st.button("🔄 Push to Salesforce (Volunteers)")
+                if start_sync:
+                    st.session_state.pop(sync_key, None)
+                sync_result = run_background_job(
+                    sync_key,
+                    "Syncing volunteers",
+                    sync_job,
+                    filtered,
+                    selected_object,
+                    st.session_state.get("sf_token"),
+                    DEFAULT_SYNC_STATE_PATH,
+                    st.session_state.get("sf_instance_url"),
+                    start=start_sync,
+                )
+                if sync_result:
+                    success, message, sync_log = sync_result
 
                     if success:
                         st.success(f"✅ {message}")
@@ -748,13 +1385,26 @@ if is_volunteer:
                                 file_name="sync_log.csv",
                             )
 
+            if save_history:
+                _, inserted = append_cleaned_batch(
+                    get_history_store(),
+                    cleaned_volunteers,
+                    "volunteers",
+                    source_name=uploaded_file.name,
+                )
+                if inserted:
+                    st.success("🗄️ Volunteers saved to local history.")
+
             st.subheader("⬇️ Download Cleaned Volunteers")
+            show_quarantine_download(
+                quarantine_path(upload_key, "volunteers"), "volunteers"
+            )
             if is_pro_user:
-                st.download_button(
+                export_download(
+                    filtered,
                     "📁 Download Full Cleaned File",
-                    filtered.to_csv(index=False),
-                    file_name="cleaned_volunteers.csv",
-                    mime="text/csv",
+                    "cleaned_volunteers",
+                    f"volunteers_{upload_key}",
                     key="download_volunteers_full",
                 )
             else:
@@ -767,10 +1417,25 @@ if is_volunteer:
                     help="Unlock Pro to download the full file and sync to Salesforce",
                 )
 
-            if st.button("🔄 Push to Salesforce (Volunteers)"):
-                success, message, sync_log = push_to_salesforce(
-                    filtered, object_type=selected_object
-                )
+            basic_sync_key = f"sync_volunteers_basic_{upload_key}"
+            start_basic_sync = st.button(
+                "🔄 Push to Salesforce (Volunteers)", key="push_volunteers_basic"
+            )
+            if start_basic_sync:
+                st.session_state.pop(basic_sync_key, None)
+            basic_sync_result = run_background_job(
+                basic_sync_key,
+                "Syncing volunteers",
+                sync_job,
+                filtered,
+                selected_object,
+                st.session_state.get("sf_token"),
+                DEFAULT_SYNC_STATE_PATH,
+                st.session_state.get("sf_instance_url"),
+                start=start_basic_sync,
+            )
+            if basic_sync_result:
+                success, message, sync_log = basic_sync_result
 
                 if success:
                     st.success(f"✅ {message}")
@@ -800,6 +1465,7 @@ if is_volunteer:
                     mime="text/csv",
                     disabled=True,
                     help="Unlock Pro to download the full file and sync to Salesforce",
+                    key="download_volunteers_sample_sync",
                 )
 
             try:
@@ -835,7 +1501,7 @@ if df_std is not None and not is_donation and not is_volunteer:
             st.warning("⚠️ Fallback cleaning returned no usable data.")
         else:
             st.subheader("🧼 Fallback Cleaned Preview")
-            st.dataframe(fallback.head(PREVIEW_LIMIT))
+            show_preview(fallback, f"fallback_preview_{upload_key}", is_pro_user)
 
             st.subheader("🧼 Missing Value Overview")
             hygiene = missing_value_report(
@@ -843,11 +1509,11 @@ if df_std is not None and not is_donation and not is_volunteer:
             )
             st.json(hygiene)
 
-            st.download_button(
+            export_download(
+                fallback,
                 "⬇ Download Cleaned Fallback File",
-                fallback.to_csv(index=False),
-                file_name="cleaned_fallback.csv",
-                mime="text/csv",
+                "cleaned_fallback",
+                f"fallback_{upload_key}",
                 key="fallback_download",
             )
 
@@ -855,6 +1521,43 @@ if df_std is not None and not is_donation and not is_volunteer:
         st.error(f"❌ Fallback cleaning failed: {e}")
 
 
+# --- History View (SQL aggregates over every saved batch) ---
+if save_history:
+    history = get_history_store()
+    first_gift, last_gift = query_donation_date_range(history)
+
+    if first_gift is not None:
+        st.header("📚 Donation History")
+        s, e = st.date_input(
+            "History Date Range",
+            [first_gift.date(), last_gift.date()],
+            min_value=first_gift.date(),
+            max_value=last_gift.date(),
+            key="history_range",
+        )
+        history_campaigns = st.multiselect(
+            "Campaigns", query_campaigns(history), key="history_campaigns"
+        )
+        history_summary = query_donation_summary(
+            history, start=s, end=e, campaigns=history_campaigns
+        )
+
+        st.metric(
+            "💵 Total Donations (History)",
+            f"${history_summary['total_donations']:,.2f}",
+        )
+        st.metric("🙋 Donors (History)", history_summary["unique_donors"])
+        if history_summary["campaign_totals"]:
+            st.bar_chart(pd.Series(history_summary["campaign_totals"], name="amount"))
+        st.json(history_summary)
+
+    volunteer_history = query_volunteer_summary(history)
+    if volunteer_history["volunteers_count"]:
+        st.header("📚 Volunteer History")
+        st.metric("⏱️ Total Hours (History)", volunteer_history["total_hours"])
+        st.json(volunteer_history)
+
+
 # --- Combined View ---
 
 st.markdown("---")
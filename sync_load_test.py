@@ -0,0 +1,109 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+from mock_salesforce import MockSalesforce
+from non_profit import push_to_salesforce
+
+# --- CRM sync load test ---
+# Pushes a synthetic roster to the local mock server under each scenario and
+# reports throughput and request latency, e.g.:
+#     python sync_load_test.py --rows 2000 --scenario all
+
+SCENARIOS = {
+    "baseline": {},
+    "latency": {"latency": 0.02, "jitter": 0.01},
+    "rate_limited": {"rate_limit_every": 25, "retry_after": 0.05},
+    "flaky": {"failure_rate": 0.05},
+    # Second push of a store-backed sync after 10% of rows changed
+    "delta_resync": {"latency": 0.02, "changed_fraction": 0.1},
+}
+
+
+class TimedSession:
+    # requests.Session with a stopwatch on every call
+    def __init__(self):
+        self.session = requests.Session()
+        self.samples = []
+
+    def _timed(self, method, url, **kwargs):
+        start = time.perf_counter()
+        response = getattr(self.session, method)(url, **kwargs)
+        self.samples.append((response.status_code, time.perf_counter() - start))
+        return response
+
+    def post(self, url, **kwargs):
+        return self._timed("post", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._timed("patch", url, **kwargs)
+
+
+def synthetic_roster(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "name": [f"Volunteer {i}" for i in range(rows)],
+            "phone": [f"313555{i:04d}" for i in range(rows)],
+            "hours": rng.integers(1, 40, rows).astype(float),
+            "campaign": rng.choice(["Pantry", "Kitchen", "Drive"], rows),
+        }
+    )
+
+
+def run_scenario(name, rows=1000, seed=0):
+    options = dict(SCENARIOS[name])
+    changed_fraction = options.pop("changed_fraction", None)
+    df = synthetic_roster(rows, seed)
+
+    with tempfile.TemporaryDirectory() as tmp, MockSalesforce(**options) as mock:
+        push = dict(token="load-test", instance_url=mock.url)
+        if changed_fraction is not None:
+            push["sync_state"] = os.path.join(tmp, "sync.db")
+            push_to_salesforce(df, "Volunteer__c", session=requests.Session(), **push)
+            changed = np.random.default_rng(seed).random(rows) < changed_fraction
+            df.loc[changed, "hours"] += 1
+
+        session = TimedSession()
+        start = time.perf_counter()
+        ok, summary, log = push_to_salesforce(
+            df, "Volunteer__c", session=session, **push
+        )
+        elapsed = time.perf_counter() - start
+
+    statuses = [status for status, _ in session.samples]
+    latencies = np.array([seconds for _, seconds in session.samples] or [0.0])
+    return {
+        "scenario": name,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "records_per_sec": round(rows / elapsed, 1) if elapsed else None,
+        "requests": len(statuses),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+        "retried_429": statuses.count(429),
+        "synced": sum(entry["status"] != "Failed" for entry in log),
+        "failed": sum(entry["status"] == "Failed" for entry in log),
+        "ok": ok,
+        "summary": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Salesforce sync.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = pd.DataFrame([run_scenario(name, args.rows) for name in names])
+    print(results.drop(columns="summary").to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import numbers
+import sqlite3
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SYNC_STATE_PATH = "data_laundry_sync.db"
+# Columns that identify a record, used in this order when present
+KEY_COLUMNS = ("name", "donor_name", "contact", "phone", "date", "amount")
+
+SYNC_ACTIONS = ("create", "update", "skip")
+
+# --- Delta sync state ---
+# One row per record ever pushed: its stable key, the hash of the payload
+# last sent, and the id the CRM gave it. A later push only sends rows whose
+# key is new (create) or whose payload hash changed (update by remote id).
+SYNC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_records (
+    object_type TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    remote_id TEXT,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (object_type, record_key)
+);
+"""
+
+
+def open_sync_state(path=DEFAULT_SYNC_STATE_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SYNC_SCHEMA)
+    return conn
+
+
+def _key_text(series):
+    # Keys must not depend on the dtype finalize picked this week: int8 vs
+    # float32 hours, category vs str, s vs ns datetimes all key the same
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.as_unit("ns").astype(str)
+    elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(
+        series
+    ):
+        text = series.astype("float64").round(6).astype(str)
+    else:
+        text = series.astype(str)
+    return text.where(series.notna(), "").str.strip().str.lower()
+
+
+def record_keys(df, key_columns=None):
+    key_columns = list(key_columns or [c for c in KEY_COLUMNS if c in df.columns])
+    if not key_columns:
+        raise ValueError("No columns to build a sync key from.")
+
+    joined = None
+    for col in key_columns:
+        text = _key_text(df[col])
+        joined = text if joined is None else joined + "\x1f" + text
+    # Identical rows (two equal gifts on one day) are told apart by order
+    occurrence = joined.groupby(joined, sort=False).cumcount().astype(str)
+    return [
+        hashlib.sha1(key.encode("utf-8")).hexdigest()
+        for key in joined + "\x1f#" + occurrence
+    ]
+
+
+def _canonical_value(value):
+    # Same idea for payload values: 2, np.int8(2) and np.float32(2.0) hash alike
+    if value is None:
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, numbers.Number):
+        return round(float(value), 6)
+    if isinstance(value, (datetime, date)):
+        return pd.Timestamp(value).isoformat()
+    return str(value)
+
+
+def content_hash(payload):
+    canonical = {field: _canonical_value(value) for field, value in payload.items()}
+    text = json.dumps(canonical, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def load_sync_state(conn, object_type):
+    rows = conn.execute(
+        "SELECT record_key, content_hash, remote_id FROM sync_records "
+        "WHERE object_type = ?",
+        (object_type,),
+    )
+    return {key: (digest, remote_id) for key, digest, remote_id in rows}
+
+
+def plan_action(state, record_key, digest):
+    known = state.get(record_key)
+    if known is None or known[1] is None:
+        return "create"
+    return "skip" if known[0] == digest else "update"
+
+
+def record_synced(conn, object_type, synced):
+    # synced: [(record_key, content_hash, remote_id)]
+    if not synced:
+        return
+    now = datetime.now().isoformat(timespec="seconds")
+    with conn:
+        conn.executemany(
+            "INSERT INTO sync_records "
+            "(object_type, record_key, content_hash, remote_id, synced_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(object_type, record_key) DO UPDATE SET "
+            "content_hash = excluded.content_hash, "
+            "remote_id = COALESCE(excluded.remote_id, sync_records.remote_id), "
+            "synced_at = excluded.synced_at",
+            [(object_type, key, digest, rid, now) for key, digest, rid in synced],
+        )
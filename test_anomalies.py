@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from anomalies import SKETCH_K, QuantileSketch
+from non_profit import (
+    clean_data,
+    clean_data_chunked,
+    clean_data_partitioned,
+    generate_hygiene_report,
+)
+
+
+def test_merged_sketches_stay_small_and_close_to_exact():
+    values = np.random.default_rng(0).lognormal(4, 1, 200_000)
+    merged = QuantileSketch()
+    for part in np.array_split(values, 8):
+        merged.merge(QuantileSketch().update(part))
+
+    assert merged.count == len(values)
+    assert sum(len(level) for level in merged.levels) <= SKETCH_K * len(merged.levels)
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ranks = np.searchsorted(np.sort(values), merged.quantile(qs)) / len(values)
+    assert np.abs(ranks - qs).max() < 0.02
+
+
+def test_fat_finger_rows_are_flagged_in_every_mode():
+    rng = np.random.default_rng(1)
+    amounts = rng.uniform(20, 150, 400).round(2)
+    amounts[[17, 250]] = [100000.0, 95000.0]  # keyed without the decimal point
+    raw = pd.DataFrame(
+        {
+            "donor_name": [f"donor {i}" for i in range(400)],
+            "amount": amounts,
+            "date": "2024-05-01",
+            "campaign": np.where(np.arange(400) % 2, "Gala", "Spring Appeal"),
+        }
+    )
+
+    full = clean_data(raw)
+    chunked = clean_data_chunked(raw, chunk_rows=90)
+    with ThreadPoolExecutor(2) as backend:
+        parted = clean_data_partitioned(raw, partitions=3, backend=backend)
+
+    flags = full.attrs["hygiene"]["anomalies"]["amount"]
+    assert flags["flagged"] == 2 and flags["rows"] == [17, 250]
+    assert flags["by_group"] == {"Spring Appeal": 1, "Gala": 1}
+    assert chunked.attrs["hygiene"] == parted.attrs["hygiene"] == full.attrs["hygiene"]
+    assert "sketches" not in full.attrs and "sketches" not in chunked.attrs
+
+    report = generate_hygiene_report(raw, full, "Donations")
+    assert report["Possible Outliers (flagged, not removed)"]["amount"]["flagged"] == 2
+    assert len(full) == 400
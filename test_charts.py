@@ -0,0 +1,28 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+from charts import _render_png, render_chart, top_n_with_other
+
+
+def test_long_tail_folds_into_other():
+    totals = pd.Series({f"Campaign {i}": float(i) for i in range(1, 1001)})
+
+    folded = top_n_with_other(totals, n=5)
+
+    assert len(folded) == 6
+    assert "Campaign 1000" in folded.index and "Campaign 995" not in folded.index
+    assert folded["Other"] == sum(range(1, 996))
+    assert folded.sum() == totals.sum()
+
+
+def test_charts_are_cached_and_leave_no_open_figures():
+    _render_png.cache_clear()
+    totals = {"Food": 120.0, "Shelter": 80.0}
+
+    for chart_type in ("Bar", "Line", "Pie"):
+        png = render_chart(totals, chart_type, "Totals", color="#4d4dff")
+        assert png.startswith(b"\x89PNG")
+    again = render_chart(pd.Series(totals), "Bar", "Totals", color="#4d4dff")
+
+    assert _render_png.cache_info().hits == 1
+    assert again == render_chart(totals, "Bar", "Totals", color="#4d4dff")
+    assert plt.get_fignums() == []
@@ -1,5 +1,24 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from non_profit import clean_donations, clean_volunteers
+import pytest
+from non_profit import (
+    ProcessingCancelled,
+    clean_data,
+    clean_data_chunked,
+    clean_data_partitioned,
+    clean_donations,
+    clean_volunteers,
+    finalize_cleaned_frame,
+    generate_donation_summary,
+    generate_hygiene_report,
+    generate_volunteer_summary,
+    route_rows,
+    summarize_chunked,
+)
+from job_queue import clean_job
+from quarantine import QuarantineSink
 
 
 def test_clean_donations():
@@ -35,10 +54,225 @@ def test_clean_volunteers():
 
     assert "name" in cleaned.columns
     assert cleaned.shape[0] == 2  # drops row with missing name or hours
-    assert cleaned["phone"].iloc[0] == "5551234567"
+    assert cleaned["phone"].tolist() == ["+15551234567", "+15557894321"]
+    assert cleaned["phone_valid"].all()
     assert cleaned["name"].tolist() == ["Alice", "Bob"]
 
 
+def test_chunked_clean_matches_full_clean():
+    raw_data = pd.DataFrame(
+        {
+            "amount": ["$100", "$0", "$25.00", "$75.5", "12", "$1,200"],
+            "date": [
+                "2024-01-01",
+                "2024-02-10",
+                "bad",
+                "2024-03-15",
+                "2024-03-16",
+                "2024-04-01",
+            ],
+            "donor_name": ["jane", "john", "amy", "amy", None, "bo"],
+            "campaign": ["Holiday", None, "Health", "Health", "Food", "Food"],
+        }
+    )
+    calls = []
+
+    chunked = clean_data_chunked(
+        raw_data, chunk_rows=4, progress=lambda *args: calls.append(args)
+    )
+
+    pd.testing.assert_frame_equal(chunked, clean_data(raw_data))
+    assert calls == [(4, 6, "clean"), (6, 6, "clean")]
+    assert summarize_chunked(chunked, "donations", chunk_rows=2) == (
+        generate_donation_summary(chunked)
+    )
+
+
+def test_chunked_fallback_renumbers_rows():
+    raw_data = pd.DataFrame({"Notes": list("abcde"), "Empty": [None] * 5})
+
+    chunked = clean_data_chunked(raw_data, chunk_rows=2)
+
+    pd.testing.assert_frame_equal(chunked, clean_data(raw_data))
+    assert chunked["row"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_chunked_clean_can_be_cancelled():
+    raw_data = pd.DataFrame({"notes": list("abcde")})
+    checks = iter([False, True])
+
+    with pytest.raises(ProcessingCancelled):
+        clean_data_chunked(raw_data, chunk_rows=2, should_cancel=lambda: next(checks))
+
+
+def test_finalize_cleaned_frame_is_lossless_and_smaller():
+    cleaned = clean_volunteers(
+        pd.DataFrame(
+            {
+                "Name": ["alice", "bob", "carol", "dan"] * 250,
+                "Dept": ["health", "food"] * 500,
+                "Phone": ["(555)-123-4567", "555-789-4321"] * 500,
+                "Hours": [2, 4.5, 1, 3] * 250,
+            }
+        )
+    )
+
+    compact, report = finalize_cleaned_frame(cleaned)
+
+    assert compact["dept"].dtype == "category"
+    assert compact["phone"].dtype == "category"
+    assert compact["phone"].iloc[0] == "+15551234567"
+    assert compact["hours"].dtype == "float32"
+    assert report["memory_after_bytes"] * 3 < report["memory_before_bytes"]
+    assert generate_volunteer_summary(compact) == generate_volunteer_summary(cleaned)
+
+
+def test_finalize_keeps_amount_float64():
+    cleaned = clean_donations(
+        pd.DataFrame(
+            {
+                "donor_name": ["a", "b"],
+                "amount": ["0.1", "19.99"],
+                "date": ["2024-01-01"] * 2,
+            }
+        )
+    )
+
+    compact, _ = finalize_cleaned_frame(cleaned)
+
+    assert compact["amount"].dtype == "float64"
+    assert compact["amount"].tolist() == [0.1, 19.99]
+
+
+def test_hygiene_report_explains_dropped_rows():
+    raw_data = pd.DataFrame(
+        {
+            "Donor Name": ["jane", None, "amy", "bo", None],
+            "Amount": ["$100", "$5", "$0", "lots", "$-3"],
+            "Date": ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "soon"],
+        }
+    )
+
+    cleaned = clean_donations(raw_data)
+    report = generate_hygiene_report(raw_data, cleaned, "Donations")
+
+    assert report["Rows Removed"] == 4
+    assert report["Rows Removed (by reason)"] == {
+        "missing name": 2,
+        "missing or unreadable amount": 1,
+        "zero or negative amount": 2,
+        "missing or invalid date": 1,
+    }
+    assert report["Unreadable Values (by column)"] == {"amount": 1, "date": 1}
+
+
+def test_chunked_hygiene_profile_matches_full_clean():
+    raw_data = pd.DataFrame(
+        {
+            "amount": ["$100", "$0", "x", "$75.5", "12", "$1,200"],
+            "date": [
+                "2024-01-01",
+                "bad",
+                "2024-02-10",
+                "2024-03-15",
+                None,
+                "2024-04-01",
+            ],
+            "donor_name": ["jane", "john", "amy", "amy", "bo", "bo"],
+        }
+    )
+
+    chunked = clean_data_chunked(raw_data, chunk_rows=4)
+
+    assert chunked.attrs["hygiene"] == clean_data(raw_data).attrs["hygiene"]
+
+
+def test_partitioned_clean_matches_full_clean_and_quarantine():
+    raw_data = pd.DataFrame(
+        {
+            "amount": ["$100", "$0", "x", "$75.5", "12", "$1,200", "$5"],
+            "date": [
+                "2024-01-01",
+                "bad",
+                "2024-02-10",
+                "2024-03-15",
+                None,
+                "2024-04-01",
+                "2024-04-02",
+            ],
+            "donor_name": ["jane", "john", "amy", "amy", "bo", "bo", None],
+        }
+    )
+    full_rejects, part_rejects = io.StringIO(), io.StringIO()
+    with QuarantineSink(full_rejects) as sink:
+        full = clean_data(raw_data, quarantine=sink)
+    calls = []
+    with ThreadPoolExecutor(2) as backend, QuarantineSink(part_rejects) as sink:
+        parted = clean_data_partitioned(
+            raw_data,
+            partitions=3,
+            backend=backend,
+            quarantine=sink,
+            progress=lambda *args: calls.append(args),
+        )
+
+    pd.testing.assert_frame_equal(parted, full)
+    assert parted.attrs["hygiene"] == full.attrs["hygiene"]
+    assert part_rejects.getvalue() == full_rejects.getvalue()
+    assert calls == [(2, 7, "clean"), (4, 7, "clean"), (7, 7, "clean")]
+
+
+def test_partitioned_clean_runs_in_worker_processes():
+    raw_data = pd.DataFrame(
+        {
+            "name": ["ann", "bob", None, "cy"],
+            "hours": ["2", "3.5", "1", "x"],
+            "dept": ["Kitchen", None, "Pantry", "Pantry"],
+            "phone": ["313-555-0100", None, "5550101", "(313) 555-0102"],
+        }
+    )
+
+    parted = clean_data_partitioned(raw_data, workers=2, partitions=2)
+
+    full = clean_data(raw_data)
+    pd.testing.assert_frame_equal(parted, full)
+    assert parted.attrs["hygiene"] == full.attrs["hygiene"]
+
+
+def _engagement_export():
+    return pd.DataFrame(
+        {
+            "name": ["ann", "bob", "cy", "dee", "eve", "fay"],
+            "amount": ["$50", None, "$20", "", None, "$5"],
+            "date": ["2024-01-05", None, "bad", None, None, "2024-02-01"],
+            "hours": [None, "3", None, None, "2", "1"],
+            "dept": [None, "Pantry", None, None, "Kitchen", "Pantry"],
+            "phone": [None, "313-555-0100", None, None, "313-555-0101", None],
+        }
+    )
+
+
+def test_mixed_rows_are_routed_to_their_own_cleaner(tmp_path):
+    raw_data = _engagement_export()
+    # gift, shift, gift, neither (both cleaners), shift, both (both cleaners)
+    assert route_rows(raw_data).tolist() == [1, 2, 1, 3, 2, 3]
+    typed = raw_data.assign(activity=["Gift", "Gift", "", "", "Volunteer shift", ""])
+    assert route_rows(typed).tolist() == [1, 1, 1, 3, 2, 3]
+
+    # Clean jobs on a mixed file only see the rows routed to their kind
+    rejects = tmp_path / "rejected_donations.csv"
+    donations = clean_job(
+        raw_data, "donations", finalize=False, quarantine_path=str(rejects)
+    )
+    volunteers = clean_job(raw_data, "volunteers", finalize=False)
+
+    assert donations["donor_name"].tolist() == ["Ann", "Fay"]
+    assert volunteers["name"].tolist() == ["Bob", "Eve", "Fay"]
+    # Shifts aren't counted as gifts with a missing amount
+    assert donations.attrs["hygiene"]["rows_in"] == 4
+    assert len(pd.read_csv(rejects)) == 2  # cy (bad date), dee (no amount)
+
+
 if __name__ == "__main__":
     test_clean_donations()
     test_clean_volunteers()
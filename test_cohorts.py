@@ -0,0 +1,64 @@
+import pandas as pd
+
+from cohorts import cohort_summary, donor_cohorts
+from non_profit import create_pdf_report
+
+
+def _gifts(rows):
+    return pd.DataFrame(rows, columns=["donor_name", "date", "amount"]).assign(
+        date=lambda df: pd.to_datetime(df["date"])
+    )
+
+
+def test_lybunt_sybunt_and_retention_matrix():
+    gifts = _gifts(
+        [
+            ("Ann Lee", "2022-03-01", 50.0),
+            (" ann lee", "2023-03-01", 60.0),  # same donor, messier spelling
+            ("Ann Lee", "2024-03-01", 70.0),
+            ("Bo", "2022-05-01", 20.0),
+            ("Bo", "2023-05-01", 25.0),  # LYBUNT
+            ("Cy", "2022-07-01", 500.0),  # SYBUNT
+            ("Dee", "2023-01-01", 10.0),
+            ("Dee", "2024-01-01", 10.0),
+            ("Eve", "2024-02-01", 5.0),
+        ]
+    )
+
+    report = donor_cohorts(gifts)
+
+    assert report["as_of"] == 2024
+    assert report["lybunt"]["donor_name"].tolist() == ["Bo"]
+    assert report["sybunt"].iloc[0][["donor_name", "lifetime_giving"]].tolist() == [
+        "Cy",
+        500.0,
+    ]
+    assert report["retention"].loc[2022].tolist() == [3, 2, 1]
+    assert report["retention"].loc[2023].tolist() == [0, 1, 1]
+    assert report["retention_rate"].loc[2022].tolist() == [1.0, 0.667, 0.333]
+    assert report["cohorts"]["donors"].to_dict() == {2022: 3, 2023: 1, 2024: 1}
+    assert report["cohorts"].loc[2022, "lifetime_giving"] == 725.0
+    # 2 of 3 donors from 2022 gave in 2023; 2 of 3 from 2023 gave in 2024
+    assert report["yoy_retention"].to_dict() == {2023: 0.667, 2024: 0.667}
+
+
+def test_fiscal_years_as_of_and_pdf():
+    gifts = _gifts(
+        [
+            ("Ann", "2023-06-30", 10.0),  # FY2023
+            ("Ann", "2023-07-01", 10.0),  # FY2024
+            ("Bo", "2023-08-01", 40.0),  # FY2024
+            ("Bo", "2024-08-01", 40.0),  # FY2025, after the as_of year
+        ]
+    )
+
+    report = donor_cohorts(gifts, as_of=2024, fiscal_start_month=7)
+    summary = cohort_summary(report)
+
+    assert summary["lybunt_donors"] == 0 and summary["sybunt_donors"] == 0
+    assert summary["first_gift_cohorts"] == {"2023": 1, "2024": 1}
+    assert summary["retention_by_year"] == {"2024": 1.0}
+    assert cohort_summary(donor_cohorts(gifts.iloc[:0]))["lybunt_donors"] == 0
+
+    pdf = create_pdf_report({"total_donations": 100.0}, None, summary)
+    assert pdf.startswith(b"%PDF")
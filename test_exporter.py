@@ -0,0 +1,60 @@
+import gzip
+import os
+import zipfile
+
+import pandas as pd
+from exporter import cached_export, export_callable, iter_csv_chunks, write_export
+from openpyxl import load_workbook
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "donor_name": ["Ann", "Bo", None, "Di", "Ed"],
+            "amount": [10.5, 20.0, 3.25, None, 7.0],
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-02", "2024-01-03 09:30", None, "2024-01-05"],
+                format="ISO8601",
+            ),
+            "campaign": pd.Categorical(["Food", "Food", "Shelter", "Food", None]),
+        }
+    )
+
+
+def test_chunked_csv_and_compressed_formats_match_to_csv(tmp_path):
+    df = _frame()
+    expected = df.to_csv(index=False).encode("utf-8")
+
+    assert b"".join(iter_csv_chunks(df, chunk_rows=2)) == expected
+
+    write_export(df, tmp_path / "d.csv.gz", "csv.gz", chunk_rows=2)
+    assert gzip.open(tmp_path / "d.csv.gz").read() == expected
+    write_export(df, tmp_path / "d.zip", "zip", chunk_rows=2, inner_name="d.csv")
+    assert zipfile.ZipFile(tmp_path / "d.zip").read("d.csv") == expected
+
+
+def test_xlsx_export_keeps_types_and_blanks(tmp_path):
+    write_export(_frame(), tmp_path / "d.xlsx", "xlsx", chunk_rows=2)
+
+    rows = list(load_workbook(tmp_path / "d.xlsx").active.values)
+    assert rows[0] == ("donor_name", "amount", "date", "campaign")
+    assert rows[1][1] == 10.5
+    assert rows[3][0] is None and rows[4][2] is None
+    assert rows[3][2] == pd.Timestamp("2024-01-03 09:30")
+
+
+def test_export_runs_on_demand_and_is_cached_per_dataset_version(tmp_path):
+    df = _frame()
+    build = export_callable(df, "csv", "upload-1", cache_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+    data = build()
+    path = cached_export(df, "csv", "upload-1", cache_dir=str(tmp_path))
+    written = os.path.getmtime(path)
+
+    assert data == df.to_csv(index=False).encode("utf-8")
+    assert cached_export(df, "csv", "upload-1", cache_dir=str(tmp_path)) == path
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    filtered = cached_export(df.iloc[:2], "csv", "upload-1", cache_dir=str(tmp_path))
+    assert filtered != path
+    assert os.path.getmtime(path) >= written
@@ -0,0 +1,87 @@
+import pandas as pd
+from non_profit import clean_donations, clean_volunteers, generate_donation_summary
+from history_store import (
+    open_history_store,
+    append_cleaned_batch,
+    list_batches,
+    query_donation_summary,
+    query_volunteer_summary,
+)
+
+
+def _donations():
+    return clean_donations(
+        pd.DataFrame(
+            {
+                "Donor Name": ["jane doe", "john smith", "amy", "jane doe"],
+                "Method": ["credit", "paypal", "cash", "credit"],
+                "Campaign": ["Holiday Fund", "Health", "Health", "Holiday Fund"],
+                "Amount": ["$100", "$20", "$75.5", "$50"],
+                "Date": ["2023-01-01", "2023-02-10", "2024-03-15", "2024-03-31"],
+            }
+        )
+    )
+
+
+def test_donation_history_matches_pandas_summary():
+    conn = open_history_store(":memory:")
+    cleaned = _donations()
+    batch_id, inserted = append_cleaned_batch(conn, cleaned, "donations", "gifts.csv")
+
+    assert inserted
+    assert query_donation_summary(conn) == generate_donation_summary(cleaned)
+
+    # Re-appending the same cleaned batch is a no-op
+    assert append_cleaned_batch(conn, cleaned, "donations") == (batch_id, False)
+    assert list_batches(conn)["row_count"].tolist() == [4]
+
+
+def test_edited_reupload_replaces_its_earlier_batch():
+    conn = open_history_store(":memory:")
+    cleaned = _donations()
+    append_cleaned_batch(conn, cleaned, "donations", "gifts.csv")
+
+    # One amount fixed and the file saved again: every gift still counts once
+    fixed = cleaned.copy()
+    fixed.loc[fixed.index[1], "amount"] = 25.0
+    batch_id, inserted = append_cleaned_batch(conn, fixed, "donations", "gifts.csv")
+
+    assert inserted
+    assert query_donation_summary(conn) == generate_donation_summary(fixed)
+    assert list_batches(conn)["batch_id"].tolist() == [batch_id]
+
+    # A different file adds to the history
+    append_cleaned_batch(conn, cleaned, "donations", "other.csv")
+    assert query_donation_summary(conn)["total_donations"] == 245.5 + 250.5
+
+
+def test_donation_history_filters_by_date_and_campaign():
+    conn = open_history_store(":memory:")
+    append_cleaned_batch(conn, _donations(), "donations")
+
+    summary = query_donation_summary(conn, start="2024-01-01", end="2024-03-31")
+    assert summary["total_donations"] == 125.5
+    assert summary["unique_donors"] == 2
+
+    health = query_donation_summary(conn, campaigns=["Health"])
+    assert health["campaign_totals"] == {"Health": 95.5}
+
+
+def test_volunteer_history_summary():
+    conn = open_history_store(":memory:")
+    cleaned = clean_volunteers(
+        pd.DataFrame(
+            {
+                "Name": ["alice", "bob", "alice"],
+                "Dept": ["health", "food", "health"],
+                "Phone": ["555-123-4567", "555-789-4321", "555-123-4567"],
+                "Hours": [2, 4, 3],
+            }
+        )
+    )
+    append_cleaned_batch(conn, cleaned, "volunteers")
+
+    summary = query_volunteer_summary(conn)
+    assert summary["total_hours"] == 9
+    assert summary["volunteers_count"] == 2
+    assert summary["hours_by_department"] == {"Health": 5.0, "Food": 4.0}
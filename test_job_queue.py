@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+import job_queue
+from job_queue import (
+    JobContext,
+    JobQueue,
+    JobCancelled,
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    clean_and_summarize_job,
+    clean_job,
+    clean_workers_per_job,
+)
+from non_profit import clean_data_partitioned
+
+
+def _wait(queue, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = queue.status(job_id)
+        if status["state"] in (JOB_DONE, JOB_FAILED, JOB_CANCELLED):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.fixture(scope="module")
+def queue():
+    queue = JobQueue(max_workers=1)
+    yield queue
+    queue.shutdown()
+
+
+def test_clean_job_runs_in_background(queue):
+    raw = pd.DataFrame(
+        {
+            "Donor Name": ["jane doe", "amy"],
+            "Amount": ["$100", "$75.5"],
+            "Date": ["2024-01-01", "2024-03-15"],
+        }
+    )
+    job_id = queue.submit(clean_and_summarize_job, raw, "donations", label="Clean")
+
+    status = _wait(queue, job_id)
+    cleaned, summary = queue.result(job_id)
+
+    assert status["state"] == JOB_DONE
+    assert status["progress"] == 1.0
+    assert cleaned["donor_name"].tolist() == ["Jane Doe", "Amy"]
+    assert summary["total_donations"] == 175.5
+
+    # Collecting the result drops the finished job from the shared queue
+    assert queue.pop_result(job_id)[1] == summary
+    assert job_id not in queue and job_id not in queue._jobs
+
+
+def test_queued_job_can_be_cancelled(queue):
+    blocker = queue.submit(time.sleep, 1)
+    job_id = queue.submit(clean_job, pd.DataFrame({"amount": [1]}))
+    queue.cancel(job_id)
+
+    assert _wait(queue, job_id)["state"] == JOB_CANCELLED
+    with pytest.raises(JobCancelled):
+        queue.result(job_id)
+    assert _wait(queue, blocker)["state"] == JOB_DONE
+
+
+def test_failed_job_reports_error(queue):
+    job_id = queue.submit(clean_job, pd.DataFrame({"amount": [1]}), "donations")
+
+    status = _wait(queue, job_id)
+    assert status["state"] == JOB_FAILED
+    assert "Missing expected column" in status["error"]
+
+
+def test_big_clean_jobs_run_partition_parallel_on_their_core_share(monkeypatch):
+    # Jobs running at once times workers per job never exceeds the cores
+    assert clean_workers_per_job(2, cpus=8) == 4
+    assert clean_workers_per_job(4, cpus=2) == 1
+
+    calls = []
+
+    def threaded(df, workers, **kwargs):
+        calls.append(workers)
+        with ThreadPoolExecutor(workers) as pool:
+            return clean_data_partitioned(df, workers=workers, backend=pool, **kwargs)
+
+    monkeypatch.setattr(job_queue, "clean_data_partitioned", threaded)
+    rows = 60_000
+    raw = pd.DataFrame(
+        {
+            "Donor Name": [f"donor {i % 900}" for i in range(rows)],
+            "Amount": [f"${i % 90}" for i in range(rows)],
+            "Date": ["2024-01-05"] * rows,
+        }
+    )
+    job = JobContext("job", {}, {}, clean_workers=2)
+
+    parallel = clean_job(raw, "donations", job=job)
+    assert calls == [2]
+    # A chunked memory plan means memory is tight: that clean stays inline
+    inline = clean_job(raw, "donations", chunk_rows=20_000, job=job)
+    assert calls == [2]
+    pd.testing.assert_frame_equal(parallel, inline)
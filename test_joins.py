@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from joins import (
+    DEFAULT_PARTITIONS,
+    JOIN_MEMORY_FACTOR,
+    estimate_bytes,
+    iter_partitioned_merge,
+    partitions_for_budget,
+)
+from non_profit import merge_donor_volunteer_data
+
+
+def _frames():
+    donors = pd.DataFrame(
+        {
+            "donor_name": ["Ann Lee", " bob ray", "Cy Dee", "ann lee", "Eve", None],
+            "amount": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+        }
+    )
+    volunteers = pd.DataFrame(
+        {
+            "name": ["ANN LEE", "Bob Ray", "Zed", "Bob Ray"],
+            "hours": [1.0, 2.0, 3.0, 4.0],
+            "amount": [0.0, 0.0, 0.0, 0.0],
+        }
+    )
+    return donors, volunteers
+
+
+def _sorted(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_partitioned_merge_matches_in_memory(how):
+    donors, volunteers = _frames()
+    expected = merge_donor_volunteer_data(donors, volunteers, how=how)
+
+    # A tiny budget forces the out-of-core path, with chunked inputs and threads
+    spilled = merge_donor_volunteer_data(
+        donors, volunteers, how=how, memory_budget_bytes=1, workers=2
+    )
+    chunked = pd.concat(
+        iter_partitioned_merge(
+            (donors.iloc[i : i + 2] for i in range(0, len(donors), 2)),
+            [volunteers.iloc[:1], volunteers.iloc[1:]],
+            left_on="donor_name",
+            right_on="name",
+            how=how,
+            partitions=3,
+            suffixes=("_donor", "_volunteer"),
+        ),
+        ignore_index=True,
+    )
+
+    assert list(spilled.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(_sorted(spilled), _sorted(expected))
+    pd.testing.assert_frame_equal(_sorted(chunked), _sorted(expected))
+
+
+def test_partitioned_merge_streams_to_file_and_sizes_partitions(tmp_path):
+    donors, volunteers = _frames()
+    out = merge_donor_volunteer_data(
+        donors,
+        volunteers,
+        memory_budget_bytes=1,
+        output=str(tmp_path / "merged.csv"),
+    )
+    merged = pd.read_csv(out)
+    assert sorted(merged["donor_name"]) == ["ann lee", "ann lee", "bob ray", "bob ray"]
+
+    # No matches still yields the column layout
+    none = merge_donor_volunteer_data(
+        donors.iloc[4:5], volunteers.iloc[2:3], memory_budget_bytes=1
+    )
+    assert none.empty and "hours" in none.columns
+
+    # Chunked inputs can't be sized up front: oversized partitions are split
+    many = pd.DataFrame({"donor_name": [f"Donor {i}" for i in range(2_000)]})
+    shifts = many.rename(columns={"donor_name": "name"}).assign(hours=1.0)
+    budget = estimate_bytes(many) // 20
+    parts = list(
+        iter_partitioned_merge(
+            (many.iloc[i : i + 500] for i in range(0, len(many), 500)),
+            [shifts],
+            left_on="donor_name",
+            right_on="name",
+            memory_budget_bytes=budget,
+        )
+    )
+    assert sum(map(len, parts)) == 2_000
+    limit = budget / JOIN_MEMORY_FACTOR
+    assert len(parts) > DEFAULT_PARTITIONS
+    assert max(estimate_bytes(part[["donor_name"]]) for part in parts) <= limit
+
+    assert partitions_for_budget(10_000, 40_000) == 1
+    assert partitions_for_budget(10_000, 4_000, workers=2) == 20
+    with pytest.raises(ValueError):
+        next(iter_partitioned_merge(donors, volunteers, "donor_name", "name", "outer"))
@@ -0,0 +1,73 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from memory_governor import (
+    MemoryBudgetExceeded,
+    estimate_working_set,
+    plan_execution,
+    plan_upload,
+)
+from non_profit import clean_data, clean_file_spilled
+
+
+def _gifts(rows):
+    return pd.DataFrame(
+        {
+            "donor_name": [f"Donor {i % 700}" for i in range(rows)],
+            "amount": [float(10 + i % 90) for i in range(rows)],
+            "date": [f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(rows)],
+            "campaign": ["Gala", "Spring", "Online"] * (rows // 3),
+        }
+    )
+
+
+def test_plan_picks_mode_from_the_estimated_frame(tmp_path):
+    path = tmp_path / "gifts.csv"
+    gifts = _gifts(60_000)
+    gifts.to_csv(path, index=False)
+
+    estimate = estimate_working_set(str(path))
+    actual = pd.read_csv(path).memory_usage(deep=True).sum()
+    assert estimate["rows"] == pytest.approx(60_000, rel=0.05)
+    assert estimate["frame_bytes"] == pytest.approx(actual, rel=0.1)
+
+    frame = estimate["frame_bytes"]
+    assert plan_execution(estimate, frame * 10)["mode"] == "in_memory"
+    chunked = plan_execution(estimate, frame * 8)
+    assert chunked["mode"] == "chunked" and chunked["chunk_rows"] >= 1_000
+    # The app's own copies count: the job alone would fit in frame * 5
+    assert plan_execution(estimate, frame * 6)["mode"] == "spill"
+    # ...and so do results the session already holds
+    held = plan_execution(estimate, frame * 10, held_bytes=frame * 2)
+    assert held["mode"] == "chunked" and held["budget_bytes"] == frame * 8
+    spill = plan_execution(estimate, frame * 1.5)
+    assert spill["mode"] == "spill" and spill["chunk_rows"] < estimate["rows"]
+    with pytest.raises(MemoryBudgetExceeded):
+        plan_execution(estimate, 100_000)
+    # Excel can't be sampled or streamed: too big is refused outright
+    with pytest.raises(MemoryBudgetExceeded):
+        plan_upload(io.BytesIO(b"x" * 100_000), name="gifts.xlsx", budget_bytes=10)
+
+
+def test_spilled_clean_matches_clean_data_and_refuses_past_budget(tmp_path):
+    path = tmp_path / "gifts.csv"
+    gifts = _gifts(6_000)
+    gifts.to_csv(path, index=False)
+    plan = {**estimate_working_set(str(path)), "budget_bytes": 2**30}
+    plan.update(mode="spill", chunk_rows=1_000)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        spilled = clean_file_spilled(str(path), plan)
+        eager = clean_data(pd.read_csv(path))
+
+    pd.testing.assert_frame_equal(
+        spilled.reset_index(drop=True), eager.reset_index(drop=True)
+    )
+    assert spilled.attrs["hygiene"]["rows_out"] == eager.attrs["hygiene"]["rows_out"]
+
+    with pytest.raises(MemoryBudgetExceeded):
+        with contextlib.redirect_stdout(io.StringIO()):
+            clean_file_spilled(str(path), {**plan, "budget_bytes": 50_000})
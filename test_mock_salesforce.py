@@ -0,0 +1,35 @@
+import pandas as pd
+import requests
+
+from mock_salesforce import MockSalesforce
+from non_profit import push_to_salesforce
+from sync_load_test import run_scenario, synthetic_roster
+
+
+def test_push_retries_429s_and_reports_failures(monkeypatch):
+    roster = synthetic_roster(40)
+    with MockSalesforce(rate_limit_every=7, failure_rate=0.1, seed=3) as mock:
+        # No instance_url argument: the environment variable points at the mock
+        monkeypatch.setenv("SALESFORCE_INSTANCE_URL", mock.url + "/")
+        ok, summary, log = push_to_salesforce(
+            roster, "Volunteer__c", token="t", session=requests.Session()
+        )
+        counts = dict(mock.counts)
+
+    log = pd.DataFrame(log)
+    assert ok and counts["rate_limited"] > 0
+    # Every 429 was retried; only the injected 500s count as failures
+    assert (log["status"] == "Failed").sum() == counts["failed"]
+    assert (
+        (log["status"] == "Synced").sum() == counts["created"] == 40 - counts["failed"]
+    )
+    assert f"{counts['failed']} errors" in summary
+
+
+def test_load_test_reports_throughput_and_delta_cost():
+    baseline = run_scenario("baseline", rows=30)
+    assert baseline["requests"] == 30 and baseline["synced"] == 30
+    assert baseline["records_per_sec"] > 0 and baseline["p99_ms"] >= baseline["p50_ms"]
+
+    resync = run_scenario("delta_resync", rows=30, seed=1)
+    assert 0 < resync["requests"] < 30 and resync["failed"] == 0
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from org_profiles import (
+    apply_profile,
+    delete_profile,
+    find_profile,
+    header_signature,
+    list_profiles,
+    save_profile,
+)
+
+
+def test_profile_is_found_by_header_set_and_applied(tmp_path):
+    export = pd.DataFrame(
+        {"Giver": ["ann"], "Gift Total": ["$5"], "Posted On": ["2024-01-01"]}
+    )
+    save_profile(
+        tmp_path,
+        export.columns,
+        "Eastside Food Bank",
+        {"Giver": "donor_name", "Gift Total": "amount", "Posted On": "date"},
+        kind="donations",
+    )
+
+    # Same headers in another order and casing still hit the profile
+    repeat = export[["Posted On", "Giver", "Gift Total"]].rename(
+        columns={"Giver": " GIVER "}
+    )
+    profile = find_profile(tmp_path, repeat.columns)
+
+    assert profile["name"] == "Eastside Food Bank"
+    assert profile["kind"] == "donations"
+    assert apply_profile(repeat, profile).columns.tolist() == [
+        "date",
+        "donor_name",
+        "amount",
+    ]
+    assert find_profile(tmp_path, ["Giver", "Gift Total"]) is None
+
+
+def test_resaving_replaces_profile_and_bumps_version(tmp_path):
+    columns = ["Name", "Hrs"]
+    first = save_profile(tmp_path, columns, "Shelter", {"Hrs": "hours"})
+    second = save_profile(tmp_path, columns, "Shelter", {"Hrs": "hours"}, "volunteers")
+
+    assert first["signature"] == second["signature"] == header_signature(columns)
+    assert first["version"] != second["version"]
+    assert [p["kind"] for p in list_profiles(tmp_path)] == ["volunteers"]
+
+    with pytest.raises(ValueError, match="not in the upload"):
+        save_profile(tmp_path, columns, "Shelter", {"Minutes": "hours"})
+
+    assert delete_profile(tmp_path, second["signature"])
+    assert find_profile(tmp_path, columns) is None
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from pagination import page_count, page_slice, sort_positions
+
+
+def test_pages_follow_sort_order_with_missing_values_last():
+    df = pd.DataFrame(
+        {"donor_name": ["cy", "ann", None, "bo", "di"], "amount": [5, 1, 3, 2, 4]}
+    )
+
+    positions = sort_positions(df, "donor_name")
+
+    assert page_count(len(df), 2) == 3
+    assert page_slice(df, 0, 2, positions)["donor_name"].tolist() == ["ann", "bo"]
+    assert page_slice(df, 9, 2, positions)["amount"].tolist() == [3]
+    desc = sort_positions(df, "amount", descending=True)
+    assert page_slice(df, 0, 3, desc)["amount"].tolist() == [5, 4, 3]
+
+
+def test_cached_order_tracks_the_filtered_rows():
+    df = pd.DataFrame({"amount": np.arange(100, 0, -1)})
+
+    full = sort_positions(df, "amount", cache_key="upload-1")
+    assert sort_positions(df, "amount", cache_key="upload-1") is full
+
+    filtered = df[df["amount"] % 2 == 0]
+    page = page_slice(
+        filtered, 0, 3, sort_positions(filtered, "amount", cache_key="upload-1")
+    )
+    assert page["amount"].tolist() == [2, 4, 6]
@@ -0,0 +1,68 @@
+import pandas as pd
+from phones import normalize_phone_numbers
+from non_profit import (
+    clean_volunteers,
+    generate_hygiene_report,
+    generate_volunteer_summary,
+    summarize_chunked,
+)
+
+
+def test_normalize_phone_numbers():
+    phones = pd.Series(
+        [
+            "(555)-123-4567",
+            "+1-555-789-4321",
+            "555.222.1111 x12",
+            "+44 20 7946 0958",
+            "011 44 20 7946 0958",
+            "12345",
+            None,
+        ]
+    )
+
+    normalized = normalize_phone_numbers(phones)
+
+    assert normalized["e164"].tolist()[:5] == [
+        "+15551234567",
+        "+15557894321",
+        "+15552221111",
+        "+442079460958",
+        "+442079460958",
+    ]
+    assert normalized["extension"].iloc[2] == "12"
+    assert normalized["valid"].tolist() == [True] * 5 + [False, False]
+
+
+def test_float_phone_column_and_national_trunk_prefix():
+    assert normalize_phone_numbers(pd.Series([5551234567.0]))["e164"].iloc[0] == (
+        "+15551234567"
+    )
+    uk = normalize_phone_numbers(
+        pd.Series(["020 7946 0958"]), default_country_code="44"
+    )
+    assert uk["e164"].iloc[0] == "+442079460958"
+    mixed = normalize_phone_numbers(pd.Series(["555-123-4567", 5552221111.0, None]))
+    assert mixed["e164"].tolist()[:2] == ["+15551234567", "+15552221111"]
+    assert mixed["e164"].isna().iloc[2]
+
+
+def test_phone_validity_feeds_summary_and_hygiene():
+    raw = pd.DataFrame(
+        {
+            "Name": ["alice", "bob", "carol"],
+            "Dept": ["health", "food", "food"],
+            "Phone": ["555-123-4567", "123", "555-222-1111 ext 7"],
+            "Hours": [2, 4, 1],
+        }
+    )
+    cleaned = clean_volunteers(raw)
+
+    summary = generate_volunteer_summary(cleaned)
+    assert summary["phone_numbers"] == {"valid": 2, "invalid": 1}
+    assert summarize_chunked(cleaned, "volunteers", chunk_rows=2) == summary
+    assert cleaned["phone"].tolist() == ["+15551234567", "123", "+15552221111"]
+    assert cleaned["phone_extension"].iloc[2] == "7"
+
+    report = generate_hygiene_report(raw, cleaned, "Volunteers")
+    assert report["Invalid Phone Numbers"] == 1
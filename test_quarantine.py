@@ -0,0 +1,51 @@
+import io
+
+import pandas as pd
+from non_profit import clean_data_chunked, clean_donations
+from quarantine import QuarantineSink
+
+
+def _donations():
+    return pd.DataFrame(
+        {
+            "donor_name": ["alice", None, "carol", "dave", "erin", "frank"],
+            "amount": ["$10", "$20", "-5", "oops", "$15", "$30"],
+            "date": [
+                "2024-01-01",
+                "2024-01-02",
+                "2024-01-03",
+                "2024-01-04",
+                "not a date",
+                "2024-01-06",
+            ],
+        }
+    )
+
+
+def test_rejected_rows_keep_raw_values_and_reasons():
+    buffer = io.StringIO()
+    with QuarantineSink(buffer) as sink:
+        cleaned = clean_donations(_donations(), quarantine=sink)
+
+    buffer.seek(0)
+    rejected = pd.read_csv(buffer)
+    assert sink.rows_written == 4 == len(_donations()) - len(cleaned)
+    assert rejected["source_row"].tolist() == [2, 3, 4, 5]
+    assert rejected["reason"].tolist() == [
+        "missing name",
+        "zero or negative amount",
+        "missing or unreadable amount",
+        "missing or invalid date",
+    ]
+    # The raw text survives, not the coerced NaN
+    assert rejected["amount"].tolist() == ["$20", "-5", "oops", "$15"]
+
+
+def test_chunked_quarantine_uses_upload_row_numbers(tmp_path):
+    path = tmp_path / "rejected.parquet"
+    with QuarantineSink(path) as sink:
+        clean_data_chunked(_donations(), chunk_rows=2, quarantine=sink)
+
+    rejected = pd.read_parquet(path)
+    assert rejected["source_row"].tolist() == [2, 3, 4, 5]
+    assert rejected["reason_code"].tolist() == [1, 4, 2, 8]
@@ -0,0 +1,103 @@
+import pandas as pd
+
+from history_store import (
+    append_cleaned_batch,
+    open_history_store,
+    query_donation_summary,
+    query_donor_gift_stats,
+)
+from non_profit import generate_donation_summary
+from recurring import classify_donors, donor_gift_stats
+
+
+def _gifts():
+    rows = []
+    # Monthly sustainer who skipped June
+    for month in [1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12]:
+        rows.append(("Ann", f"2024-{month:02d}-15", 25.0))
+    for month in [1, 4, 7, 10]:
+        rows.append(("Bo", f"2024-{month:02d}-01", 100.0))
+    rows += [("Cy", "2022-12-01", 500.0), ("Cy", "2023-12-03", 500.0)]
+    rows += [("Cy", "2024-12-02", 550.0)]
+    rows += [("Dee", "2024-03-08", 40.0)]
+    # Three gifts a month apart, but wildly different amounts
+    rows += [("Eve", "2024-01-10", 5.0), ("Eve", "2024-02-10", 900.0)]
+    rows += [("Eve", "2024-03-10", 60.0)]
+    # Monthly in 2023, then stopped
+    for month in range(1, 7):
+        rows.append(("Fay", f"2023-{month:02d}-20", 10.0))
+    return pd.DataFrame(rows, columns=["donor_name", "date", "amount"]).assign(
+        date=lambda df: pd.to_datetime(df["date"])
+    )
+
+
+def test_donors_are_classified_by_cadence_with_confidence():
+    donors = classify_donors(_gifts()).set_index("donor_name")
+
+    assert donors["cadence"].to_dict() == {
+        "Ann": "monthly",
+        "Bo": "quarterly",
+        "Cy": "annual",
+        "Dee": "one-time",
+        "Eve": "irregular",
+        "Fay": "monthly",
+    }
+    # One 61-day gap out of ten costs Ann a tenth of her confidence
+    assert donors.loc["Ann", "confidence"] == round(0.9 * 10 / 11, 3)
+    assert donors.loc["Dee", "confidence"] == 1.0
+    assert donors.loc["Cy", "confidence"] < donors.loc["Bo", "confidence"]
+    assert donors["active"].to_dict() == {
+        "Ann": True,
+        "Bo": True,
+        "Cy": True,
+        "Dee": False,
+        "Eve": False,
+        "Fay": False,
+    }
+
+
+def test_recurring_revenue_section_in_donation_summary():
+    gifts = _gifts().assign(campaign="General", method="card")
+
+    recurring = generate_donation_summary(gifts)["recurring_revenue"]
+
+    assert recurring["donors_by_cadence"] == {
+        "monthly": 2,
+        "quarterly": 1,
+        "annual": 1,
+        "one-time": 1,
+        "irregular": 1,
+    }
+    assert recurring["active_recurring_donors"] == 3
+    # Ann 25 x 12 + Bo 100 x 4 + Cy 500 x 1 (typical = median gift)
+    assert recurring["annualized_recurring_revenue"] == 1200.0
+    assert recurring["monthly_recurring_revenue"] == 100.0
+    assert 0 < recurring["recurring_share_of_giving"] < 1
+
+
+def test_history_store_gift_stats_match_pandas():
+    gifts = _gifts().assign(campaign="General", method="card")
+    # Stray non-breaking spaces and non-ASCII capitals still name one donor
+    gifts.loc[gifts["date"] == "2024-12-15", "donor_name"] = "ANN\u00a0"
+    emile = pd.DataFrame(
+        {
+            "donor_name": ["Émile", "\u00a0ÉMILE"],
+            "date": pd.to_datetime(["2024-01-05", "2024-02-05"]),
+            "amount": [30.0, 30.0],
+        }
+    )
+    gifts = pd.concat([gifts, emile.assign(campaign="General", method="card")])
+    conn = open_history_store(":memory:")
+    append_cleaned_batch(conn, gifts, "donations")
+
+    from_sql = query_donor_gift_stats(conn).sort_values("donor_name")
+    from_pandas = donor_gift_stats(gifts).sort_values("donor_name")
+
+    pd.testing.assert_frame_equal(
+        from_sql.reset_index(drop=True),
+        from_pandas.reset_index(drop=True),
+        check_dtype=False,
+    )
+    assert query_donation_summary(conn)["recurring_revenue"] == (
+        generate_donation_summary(gifts)["recurring_revenue"]
+    )
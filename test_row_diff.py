@@ -0,0 +1,113 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from non_profit import clean_volunteers, finalize_cleaned_frame
+from row_diff import diff_frames, diff_summary
+
+
+def _roster():
+    return pd.DataFrame(
+        {
+            "name": ["Ann", "Bo", "Cy", "Dee"],
+            "phone": ["+13135550100", "+13135550101", None, "+13135550103"],
+            "dept": ["Kitchen", "Pantry", "Pantry", "Drive"],
+            "hours": [2.1, 3.5, 1.0, 4.0],
+        }
+    )
+
+
+def test_diff_finds_added_removed_and_changed_rows_across_dtypes():
+    old = _roster()
+    # The corrected file: Cy dropped, Dee's hours fixed, Eve new, rows shuffled,
+    # and finalize picked category/float32 this time
+    new = pd.concat(
+        [
+            old.drop(index=2),
+            pd.DataFrame({"name": ["Eve"], "phone": [None], "dept": ["Drive"]}),
+        ]
+    ).iloc[::-1]
+    new.loc[new["name"] == "Dee", "hours"] = 5.0
+    new = new.astype({"dept": "category", "hours": "float32"})
+    new["row"] = range(1, len(new) + 1)  # renumbered rows are not a change
+
+    diff = diff_frames(old, new, key_columns=["name", "phone"])
+
+    assert diff_summary(diff) == {
+        "added": 1,
+        "removed": 1,
+        "changed": 1,
+        "unchanged": 2,
+    }
+    assert diff["added"]["name"].tolist() == ["Eve"]
+    assert diff["removed"]["name"].tolist() == ["Cy"]
+    assert diff["changed"][["name", "hours", "changed_columns"]].values.tolist() == [
+        ["Dee", 5.0, "hours"]
+    ]
+    assert diff["changed_before"]["hours"].tolist() == [4.0]
+
+
+def test_repeated_keys_pair_up_in_order_and_keys_are_required():
+    old = pd.DataFrame(
+        {
+            "donor_name": ["Ann", "Ann", "Bo"],
+            "date": pd.to_datetime(["2024-01-01"] * 3),
+            "amount": [10.0, 10.0, 20.0],
+            "campaign": ["Gala", "Gala", "Gala"],
+        }
+    )
+    new = old.copy()
+    new.loc[1, ["amount", "campaign"]] = [15.0, "Spring"]
+    new["date"] = new["date"].dt.as_unit("s")
+
+    diff = diff_frames(old, new)  # defaults to donor_name + date
+
+    assert diff["key_columns"] == ["donor_name", "date"]
+    assert diff_summary(diff) == {
+        "added": 0,
+        "removed": 0,
+        "changed": 1,
+        "unchanged": 2,
+    }
+    assert diff["changed"]["changed_columns"].tolist() == ["amount, campaign"]
+    with pytest.raises(ValueError):
+        diff_frames(old[["amount"]], new[["amount"]])
+
+
+def test_diff_of_two_finalized_uploads_matches_on_phone():
+    week1 = pd.DataFrame(
+        {
+            "Name": ["Ann Lee", "Bob Ray"],
+            "Dept": ["Pantry", "Kitchen"],
+            "Phone": ["313-555-0100", "313-555-0101"],
+            "Hours": [2, 3],
+        }
+    )
+    # Cy's bad phone makes finalize pick other dtypes for the whole file
+    week2 = pd.concat(
+        [
+            week1,
+            pd.DataFrame(
+                {
+                    "Name": ["Cy Dee"],
+                    "Dept": ["Drive"],
+                    "Phone": ["0123"],
+                    "Hours": [2.5],
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        old, _ = finalize_cleaned_frame(clean_volunteers(week1))
+        new, _ = finalize_cleaned_frame(clean_volunteers(week2))
+    assert old["hours"].dtype != new["hours"].dtype
+
+    expected = {"added": 1, "removed": 0, "changed": 0, "unchanged": 2}
+    assert diff_summary(diff_frames(old, new)) == expected
+    # A categorical phone column lines up with a string one
+    assert diff_summary(diff_frames(old.astype({"phone": "category"}), new)) == (
+        expected
+    )
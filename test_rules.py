@@ -0,0 +1,80 @@
+import json
+
+import pandas as pd
+import pytest
+from non_profit import clean_donations, clean_with_rules
+from rules import DONATION_RULES, compile_rule_spec
+
+CHURCH_GIVING_RULES = {
+    "name": "church_giving",
+    "aliases": {
+        "donor_name": ["member", "donor_name"],
+        "amount": ["offering"],
+        "date": ["sunday"],
+    },
+    "required": ["donor_name", "amount", "date"],
+    "defaults": {"campaign": "General Fund"},
+    "fields": {
+        "donor_name": {"type": "text", "case": "title"},
+        "amount": {"type": "currency"},
+        "date": {"type": "date"},
+    },
+    "reject": [
+        {"column": "amount", "if": "nonpositive", "reason": "nonpositive_amount"},
+        {"column": "date", "if": "missing", "reason": "bad_date"},
+    ],
+}
+
+
+def test_json_spec_cleans_a_new_format(tmp_path):
+    path = tmp_path / "church.json"
+    path.write_text(json.dumps(CHURCH_GIVING_RULES))
+    raw = pd.DataFrame(
+        {
+            "Member": [" ann lee", "bo", "cy"],
+            "Offering": ["$1,000", "$0", "$20"],
+            "Sunday": ["2024-03-03", "2024-03-10", "someday"],
+        }
+    )
+
+    cleaned = clean_with_rules(raw, str(path))
+
+    assert cleaned.columns.tolist() == ["donor_name", "amount", "date", "campaign"]
+    assert cleaned["donor_name"].tolist() == ["Ann Lee"]
+    assert cleaned["amount"].tolist() == [1000.0]
+    assert cleaned.attrs["hygiene"]["dropped_by_reason"] == {
+        "zero or negative amount": 1,
+        "missing or invalid date": 1,
+    }
+
+
+def test_builtin_spec_matches_clean_donations_and_compiles_once():
+    raw = pd.DataFrame(
+        {
+            "Name": ["jane", "jane", "john", None],
+            "Amount": ["$5", "$5", "bad", "$7"],
+            "Date": ["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03"],
+        }
+    )
+
+    pd.testing.assert_frame_equal(
+        clean_with_rules(raw, "donations"), clean_donations(raw)
+    )
+    assert compile_rule_spec("donations") is compile_rule_spec(dict(DONATION_RULES))
+
+
+def test_invalid_specs_fail_at_compile_time():
+    with pytest.raises(ValueError, match="field type"):
+        compile_rule_spec({"fields": {"amount": {"type": "money"}}})
+    with pytest.raises(ValueError, match="spec key"):
+        compile_rule_spec({"columns": []})
+    with pytest.raises(ValueError, match="reject reason"):
+        clean_with_rules(
+            pd.DataFrame({"a": [1]}),
+            {"reject": [{"column": "a", "if": "missing", "reason": "nope"}]},
+        )
+    with pytest.raises(ValueError, match="Missing expected column"):
+        clean_with_rules(
+            pd.DataFrame({"a": [1]}),
+            {"reject": [{"column": "date", "if": "missing", "reason": "bad_date"}]},
+        )
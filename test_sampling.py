@@ -0,0 +1,84 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from non_profit import clean_data
+from sampling import estimate_distinct, fast_preview
+
+
+def _clean(sample):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return clean_data(sample)
+
+
+def test_fast_preview_estimates_cover_the_full_clean(tmp_path):
+    rng = np.random.default_rng(7)
+    rows = 40_000
+    amounts = rng.gamma(2, 50, rows).round(2).astype(object)
+    amounts[rng.random(rows) < 0.1] = "n/a"  # dropped by the cleaner
+    gifts = pd.DataFrame(
+        {
+            "donor_name": [f"Donor {i}" for i in rng.integers(0, 3_000, rows)],
+            "amount": amounts,
+            "date": "2024-03-01",
+            "campaign": rng.choice(["Gala", "Spring", "Online"], rows),
+        }
+    )
+    path = tmp_path / "gifts.csv"
+    gifts.to_csv(path, index=False)
+    full = _clean(pd.read_csv(path))
+
+    preview = fast_preview(str(path), _clean, rows=1_000)
+
+    assert preview["sampled_rows"] == 1_000
+    assert len(preview["cleaned"]) < 1_000  # cleaned sample, not the file
+    rows_in, rows_out = preview["rows_in"], preview["rows_out"]
+    assert rows_in["low"] <= rows <= rows_in["high"]
+    assert rows_out["low"] <= len(full) <= rows_out["high"]
+    amount = preview["totals"]["amount"]
+    assert amount["low"] <= full["amount"].sum() <= amount["high"]
+    donors = preview["distinct"]["donor_name"]
+    assert donors["low"] <= full["donor_name"].nunique() <= donors["high"]
+
+
+def test_distinct_estimate_bounds_and_unsampleable_files(tmp_path):
+    # Every value seen once: anything from the sample count to the row count
+    unique = estimate_distinct(pd.Series([f"d{i}" for i in range(100)]), 10_000)
+    assert unique == {"estimate": 1_000.0, "low": 100.0, "high": 10_000}
+    # Every value repeated: the sample has likely seen them all
+    repeated = estimate_distinct(pd.Series(["Ann", "ann ", "Bo", "Bo"]), 10_000)
+    assert repeated == {"estimate": 2.0, "low": 2.0, "high": 2.0}
+
+    path = tmp_path / "notes.csv"
+    path.write_text("donor_name,note\n" + '"Ann","line one\nline two"\n' * 500)
+    with pytest.raises(ValueError):
+        fast_preview(str(path), _clean, rows=200)
+    with pytest.raises(ValueError):
+        fast_preview(io.BytesIO(b"x"), _clean, name="gifts.xlsx")
+
+
+def test_fast_preview_counts_every_row_an_exploded_line_becomes(tmp_path):
+    # Invoice lines pack two items into one cell; the generic cleaner splits
+    # them and renumbers the rows
+    rows = 30_000
+    invoices = pd.DataFrame(
+        {
+            "order": range(rows),
+            "category": "Books|Music",
+            "amount": "10|20",
+        }
+    )
+    path = tmp_path / "invoices.csv"
+    invoices.to_csv(path, index=False)
+
+    preview = fast_preview(str(path), _clean, rows=500)
+
+    assert "_sample_row" not in preview["cleaned"].columns
+    rows_out, amount = preview["rows_out"], preview["totals"]["amount"]
+    assert rows_out["low"] <= 2 * rows <= rows_out["high"]
+    assert rows_out["estimate"] == pytest.approx(2 * rows, rel=0.05)
+    assert amount["low"] <= 30 * rows <= amount["high"]
+    assert amount["estimate"] == pytest.approx(30 * rows, rel=0.05)
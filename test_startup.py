@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+
+import pandas as pd
+
+from non_profit import GUESS_FIELDS, guess_columns
+
+HEAVY = ("matplotlib", "fpdf", "requests", "openpyxl", "streamlit")
+
+
+def test_library_import_leaves_heavy_modules_unloaded():
+    code = (
+        "import json, sys\n"
+        "import non_profit, job_queue, charts, exporter, history_store\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
+
+
+def test_guess_columns_uses_the_module_table():
+    df = pd.DataFrame(columns=["volunteer_name", "logged_hours", "ministry"])
+    assert set(GUESS_FIELDS) == {"name", "hours", "amount", "department", "date"}
+    assert guess_columns(df) == {
+        "name": "volunteer_name",
+        "hours": "logged_hours",
+        "department": "ministry",
+    }
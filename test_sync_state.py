@@ -0,0 +1,145 @@
+import json
+
+import pandas as pd
+
+from non_profit import clean_volunteers, finalize_cleaned_frame, push_to_salesforce
+from sync_state import load_sync_state, open_sync_state, record_keys
+
+
+class FakeResponse:
+    def __init__(self, status, body=None):
+        self.ok = status < 400
+        self.status_code = status
+        self.text = json.dumps(body or {})
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    # Stands in for requests.Session; fails any payload named in fail_names
+    def __init__(self, fail_names=()):
+        self.calls = []
+        self.fail_names = set(fail_names)
+
+    def _send(self, method, url, data):
+        payload = json.loads(data)
+        self.calls.append((method, url, payload))
+        if payload["Name"] in self.fail_names:
+            return FakeResponse(500, {"error": "boom"})
+        if method == "POST":
+            return FakeResponse(201, {"id": f"a0{len(self.calls):03d}"})
+        return FakeResponse(204)
+
+    def post(self, url, headers=None, data=None):
+        return self._send("POST", url, data)
+
+    def patch(self, url, headers=None, data=None):
+        return self._send("PATCH", url, data)
+
+
+def _roster():
+    return pd.DataFrame(
+        {
+            "name": ["Ann Lee", "Bob Ray", "Cy Dee"],
+            "phone": ["3135550100", "3135550101", None],
+            "hours": [2.0, 3.5, 1.0],
+            "campaign": ["Pantry", "Kitchen", "Pantry"],
+        }
+    )
+
+
+def test_only_new_and_changed_rows_are_sent(tmp_path):
+    path = str(tmp_path / "sync.db")
+    session = FakeSession(fail_names={"Cy Dee"})
+    ok, summary, log = push_to_salesforce(
+        _roster(), "Volunteer__c", token="t", sync_state=path, session=session
+    )
+    assert ok and "2 new" in summary and "1 errors" in summary
+    assert [call[0] for call in session.calls] == ["POST"] * 3
+
+    # Next week: Bob's hours changed, Dana joined, Cy's failed push retries
+    roster = pd.concat(
+        [_roster(), pd.DataFrame({"name": ["Dana"], "hours": [4.0]})],
+        ignore_index=True,
+    )
+    roster.loc[1, "hours"] = 6.0
+    session = FakeSession()
+    ok, summary, log = push_to_salesforce(
+        roster, "Volunteer__c", token="t", sync_state=path, session=session
+    )
+    assert "2 new and 1 changed" in summary and "skipped 1 unchanged" in summary
+    sent = {(method, payload["Name"]) for method, _, payload in session.calls}
+    assert sent == {("PATCH", "Bob Ray"), ("POST", "Cy Dee"), ("POST", "Dana")}
+    patch_url = [url for method, url, _ in session.calls if method == "PATCH"][0]
+    assert patch_url.endswith("/Volunteer__c/a0002")
+
+    # Nothing changed: no requests at all
+    session = FakeSession()
+    push_to_salesforce(
+        roster, "Volunteer__c", token="t", sync_state=path, session=session
+    )
+    assert session.calls == []
+    state = load_sync_state(open_sync_state(path), "Volunteer__c")
+    assert len(state) == 4 and all(remote_id for _, remote_id in state.values())
+
+
+def test_record_keys_are_stable_and_tell_duplicates_apart():
+    gifts = pd.DataFrame(
+        {
+            "donor_name": ["Ann Lee", " ann lee", "Bob"],
+            "date": ["2024-01-05"] * 3,
+            "amount": [25.0, 25.0, 25.0],
+            "campaign": ["Gala", "Spring", "Gala"],
+        }
+    )
+    keys = record_keys(gifts)
+    assert len(set(keys)) == 3
+    # Campaign isn't part of the key, so editing it is an update, not a new row
+    edited = gifts.assign(campaign="Other")
+    assert record_keys(edited) == keys
+    assert record_keys(gifts.iloc[[2, 0, 1]]) == [keys[2], keys[0], keys[1]]
+
+
+def test_finalized_dtype_changes_do_not_resend_records(tmp_path):
+    path = str(tmp_path / "sync.db")
+    week1 = pd.DataFrame(
+        {
+            "Name": ["Ann Lee", "Bob Ray"] * 10,
+            "Dept": ["Pantry", "Kitchen"] * 10,
+            "Phone": ["313-555-0100", "313-555-0101"] * 10,
+            "Hours": [2, 3] * 10,
+        }
+    ).drop_duplicates()
+    # One odd row makes finalize pick other dtypes for phone and hours
+    week2 = pd.concat(
+        [
+            week1,
+            pd.DataFrame(
+                {
+                    "Name": ["Cy Dee"],
+                    "Dept": ["Drive"],
+                    "Phone": ["0123"],
+                    "Hours": [2.5],
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    first, _ = finalize_cleaned_frame(clean_volunteers(week1))
+    second, _ = finalize_cleaned_frame(clean_volunteers(week2))
+    assert first["hours"].dtype != second["hours"].dtype
+
+    push_to_salesforce(
+        first, "Volunteer__c", token="t", sync_state=path, session=FakeSession()
+    )
+    session = FakeSession()
+    ok, summary, log = push_to_salesforce(
+        second, "Volunteer__c", token="t", sync_state=path, session=session
+    )
+
+    assert "1 new and 0 changed" in summary and "skipped 2 unchanged" in summary
+    assert [(method, payload["Name"]) for method, _, payload in session.calls] == [
+        ("POST", "Cy Dee")
+    ]
@@ -0,0 +1,74 @@
+import io
+
+import pandas as pd
+
+from non_profit import clean_data
+from text_loader import detect_text_layout, iter_text_file, read_text_file
+
+FIXED_WIDTH = (
+    "donor_name      amount  date        campaign\n"
+    "Ann Lee          12.50  2024-01-05  Spring Gala\n"
+    "Bob Ray         100.00  2024-02-11\n"
+    "Cy Dee            7.25  2024-03-02  Food Drive\n"
+    "                  3.00  2024-03-04  Food Drive\n"
+)
+
+
+def test_fixed_width_boundaries_and_blocks():
+    lines = FIXED_WIDTH.splitlines()
+    assert detect_text_layout(lines) == {
+        "kind": "fixed",
+        "colspecs": [(0, 16), (16, 24), (24, 36), (36, None)],
+    }
+
+    df = read_text_file(io.BytesIO(FIXED_WIDTH.encode()))
+    assert list(df.columns) == ["donor_name", "amount", "date", "campaign"]
+    assert df["amount"].tolist() == [12.5, 100.0, 7.25, 3.0]
+    assert df["donor_name"].tolist()[:3] == ["Ann Lee", "Bob Ray", "Cy Dee"]
+    assert pd.isna(df.loc[1, "campaign"]) and pd.isna(df.loc[3, "donor_name"])
+
+    # Tiny blocks (several per file) and padded equal-length lines agree
+    blocks = list(iter_text_file(io.BytesIO(FIXED_WIDTH.encode()), block_bytes=60))
+    assert len(blocks) > 1
+    pd.testing.assert_frame_equal(pd.concat(blocks, ignore_index=True), df)
+    width = max(map(len, lines))
+    padded = "".join(line.ljust(width) + "\r\n" for line in lines)
+    pd.testing.assert_frame_equal(read_text_file(io.BytesIO(padded.encode())), df)
+
+    cleaned = clean_data(df)
+    assert cleaned["amount"].sum() == 119.75
+
+
+def test_fixed_width_with_multibyte_names_slices_by_character():
+    lines = [
+        "donor_name  amount  campaign",
+        "Zoë Núñez    12.50  Gala",
+        "Ann Lee      20.00  Spring",
+        "Bo Ray        7.25  Drive",
+    ]
+    # Trailing spaces pad every line to the same byte length, which used to
+    # send the block down the byte-sliced fast path
+    width = max(len(line.encode()) for line in lines)
+    data = b"".join(line.encode().ljust(width) + b"\n" for line in lines)
+
+    df = read_text_file(io.BytesIO(data))
+
+    assert df.values.tolist() == [
+        ["Zoë Núñez", 12.5, "Gala"],
+        ["Ann Lee", 20.0, "Spring"],
+        ["Bo Ray", 7.25, "Drive"],
+    ]
+    ragged = "".join(line + "\n" for line in lines).encode()
+    pd.testing.assert_frame_equal(read_text_file(io.BytesIO(ragged)), df)
+
+
+def test_delimited_text_is_sniffed(tmp_path):
+    path = tmp_path / "roster.txt"
+    path.write_text("name\thours\tdept\nAnn Lee\t3\tKitchen\nBob Ray\t2.5\tPantry\n")
+    assert detect_text_layout(path.read_text().splitlines())["sep"] == "\t"
+    df = read_text_file(str(path))
+    assert df.shape == (2, 3) and df["hours"].sum() == 5.5
+
+    piped = "name | hours | dept\nAnn Lee | 3 | Kitchen\nBob Ray | 2 | Pantry\n"
+    df = read_text_file(io.BytesIO(piped.encode()))
+    assert list(df.columns) == ["name", "hours", "dept"]
@@ -0,0 +1,195 @@
+import csv
+import io
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+TEXT_SAMPLE_BYTES = 64 * 1024
+TEXT_CHUNK_BYTES = 16 * 1024 * 1024
+TEXT_CHUNK_ROWS = 200_000
+DELIMITERS = ("\t", "|", ";", ",")
+# Share of sampled lines that must agree on the field count
+DELIMITER_AGREEMENT = 0.9
+# Unit separator: inserted at fixed-width boundaries so the C parser can split
+FIELD_SEP = 0x1F
+
+# --- .txt ingestion ---
+# A sample of lines decides the layout: a delimiter whose field count is
+# steady across lines, or fixed-width columns found where every sampled line
+# has a space. Fixed-width blocks are cut with numpy and handed to the C CSV
+# parser, so both layouts parse at read_csv speed, one block at a time.
+
+
+def _sample_lines(sample):
+    lines = sample.decode("utf-8", errors="replace").splitlines()
+    if len(sample) == TEXT_SAMPLE_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # the last line may be cut off mid-way
+    return [line.rstrip("\r") for line in lines if line.strip()]
+
+
+def _delimited_fields(lines):
+    # Best (delimiter, field count) among the candidates, or (None, 1)
+    best = (None, 1)
+    for sep in DELIMITERS:
+        counts = Counter(len(row) for row in csv.reader(lines, delimiter=sep))
+        fields, agreeing = counts.most_common(1)[0]
+        if agreeing >= DELIMITER_AGREEMENT * len(lines) and fields > best[1]:
+            best = (sep, fields)
+    return best
+
+
+def fixed_width_colspecs(lines):
+    # One row per line, one uint32 code point per character, padded with spaces
+    width = max(len(line) for line in lines)
+    padded = "".join(line.ljust(width) for line in lines)
+    grid = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32)
+    grid = grid.reshape(len(lines), width)
+
+    blank = (grid == ord(" ")).all(axis=0)
+    starts = np.flatnonzero(~blank & np.r_[True, blank[:-1]])
+    if len(starts) == 0:
+        return [(0, None)]
+    bounds = [0, *starts[1:].tolist()]
+    return [(a, b) for a, b in zip(bounds, bounds[1:])] + [(bounds[-1], None)]
+
+
+def detect_text_layout(lines):
+    if not lines:
+        raise ValueError("The text file is empty.")
+    sep, fields = _delimited_fields(lines)
+    colspecs = fixed_width_colspecs(lines)
+    if sep is not None and fields >= len(colspecs):
+        return {"kind": "delimited", "sep": sep}
+    return {"kind": "fixed", "colspecs": colspecs}
+
+
+def _header_names(header, colspecs):
+    names = [header[a:b].strip() for a, b in colspecs]
+    return [name or f"column_{i + 1}" for i, name in enumerate(names)]
+
+
+def _parse_grid(grid, colspecs, names):
+    # Insert a separator at every boundary, then let read_csv type it. A grid
+    # is one byte per character (ASCII) or one code point (uint32) per cell.
+    cuts = [a for a, _ in colspecs[1:]]
+    joined = np.insert(grid, cuts, FIELD_SEP, axis=1).tobytes()
+    if grid.dtype == np.uint32:
+        joined = joined.decode("utf-32-le").encode("utf-8")
+    df = pd.read_csv(
+        io.BytesIO(joined),
+        sep=chr(FIELD_SEP),
+        header=None,
+        names=names,
+        quoting=csv.QUOTE_NONE,
+        skipinitialspace=True,
+        encoding_errors="replace",
+    )
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].str.rstrip().replace("", np.nan)
+    return df
+
+
+def _parse_fixed_block(block, colspecs, names):
+    # Boundaries are character positions (the sample is decoded text), so
+    # blocks are cut by character too. Equal-length ASCII lines (the usual
+    # fixed-width export) reshape in place; anything else is padded first,
+    # one code point per cell when a line has multibyte characters.
+    if not block:
+        return None
+    ascii_block = block.isascii()
+    line_len = block.index(b"\n") + 1
+    if ascii_block and len(block) % line_len == 0 and line_len > colspecs[-1][0]:
+        grid = np.frombuffer(block, dtype=np.uint8).reshape(-1, line_len)
+        if (grid[:, -1] == ord("\n")).all():
+            return _parse_grid(grid, colspecs, names)
+
+    if ascii_block:
+        lines = [line.rstrip(b"\r") for line in block.split(b"\n") if line.strip()]
+    else:
+        text = block.decode("utf-8", errors="replace")
+        lines = [line.rstrip("\r") for line in text.split("\n") if line.strip()]
+    if not lines:
+        return None
+    width = max(max(len(line) for line in lines), colspecs[-1][0]) + 1
+    if ascii_block:
+        padded = b"".join(line.ljust(width - 1) + b"\n" for line in lines)
+        grid = np.frombuffer(padded, dtype=np.uint8)
+    else:
+        padded = "".join(line.ljust(width - 1) + "\n" for line in lines)
+        grid = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32)
+    return _parse_grid(grid.reshape(-1, width), colspecs, names)
+
+
+def _align_dtypes(chunk, first):
+    # A column that is blank throughout one block parses as float; give it
+    # the first block's dtype so the blocks concatenate cleanly
+    for col in chunk.columns:
+        if col in first and chunk[col].dtype != first[col] and chunk[col].isna().all():
+            chunk[col] = chunk[col].astype(first[col])
+    return chunk
+
+
+def _iter_blocks(handle, block_bytes):
+    # Whole lines only: the tail after the last newline waits for the next read
+    carry = b""
+    while True:
+        data = handle.read(block_bytes)
+        if not data:
+            break
+        data = carry + data
+        cut = data.rfind(b"\n") + 1
+        carry = data[cut:]
+        if cut:
+            yield data[:cut]
+    if carry.strip():
+        yield carry + b"\n"
+
+
+def iter_text_file(
+    source, chunk_rows=TEXT_CHUNK_ROWS, block_bytes=TEXT_CHUNK_BYTES, layout=None
+):
+    # source: a path or a binary file object (e.g. a Streamlit upload).
+    # Yields DataFrames; the first line holds the column names.
+    handle = open(source, "rb") if isinstance(source, str) else source
+    try:
+        handle.seek(0)
+        if layout is None:
+            layout = detect_text_layout(_sample_lines(handle.read(TEXT_SAMPLE_BYTES)))
+            handle.seek(0)
+
+        if layout["kind"] == "delimited":
+            reader = pd.read_csv(
+                handle,
+                sep=layout["sep"],
+                chunksize=chunk_rows,
+                skipinitialspace=True,
+                encoding_errors="replace",
+            )
+            first = None
+            for chunk in reader:
+                chunk.columns = [str(col).strip() for col in chunk.columns]
+                first = chunk.dtypes if first is None else first
+                yield _align_dtypes(chunk, first)
+            return
+
+        colspecs = layout["colspecs"]
+        header = handle.readline().decode("utf-8", errors="replace").rstrip("\r\n")
+        names = _header_names(header, colspecs)
+        first = None
+        for block in _iter_blocks(handle, block_bytes):
+            chunk = _parse_fixed_block(block, colspecs, names)
+            if chunk is not None:
+                first = chunk.dtypes if first is None else first
+                yield _align_dtypes(chunk, first)
+    finally:
+        if isinstance(source, str):
+            handle.close()
+
+
+def read_text_file(source, **kwargs):
+    parts = list(iter_text_file(source, **kwargs))
+    if not parts:
+        raise ValueError("The text file has a header but no rows.")
+    return pd.concat(parts, ignore_index=True)